@@ -0,0 +1,5 @@
+"""
+Benchmarks for the main code paths in papis.
+
+See ``benchmarks/README.rst`` for how to run them.
+"""
@@ -0,0 +1,178 @@
+"""
+Generate a synthetic papis library for benchmarking.
+
+Each document is stored in its own folder with a realistic ``info.yaml``
+(authors, tags, journal, DOI, metadata citations, etc.), a dummy PDF file and,
+for some of the documents, a ``citations.yaml`` file.
+
+.. code:: sh
+
+    python -m benchmarks.generate -n 10000 /tmp/papis-bench-10k
+"""
+
+import os
+import random
+import hashlib
+from typing import Any, Dict, List
+
+import click
+import yaml
+
+try:
+    from yaml import CSafeDumper as Dumper
+except ImportError:
+    from yaml import SafeDumper as Dumper  # type: ignore[assignment]
+
+#: Contents of the dummy document files
+DUMMY_PDF = b"%PDF-1.5\n%" + b"\x00" * 1024
+
+FIRST_NAMES = [
+    "Albert", "Marie", "Niels", "Erwin", "Paul", "Lise", "Emmy", "Richard",
+    "Alan", "Ada", "Kurt", "John", "Grace", "Werner", "Max", "Enrico",
+    "Srinivasa", "Sofia", "Carl", "Hedy", "Chien-Shiung", "Rosalind", "Subrahmanyan",
+    "Jürgen", "Zoë", "Ángel", "Søren", "Dmitri", "Hideki", "Wolfgang",
+    ]
+
+LAST_NAMES = [
+    "Einstein", "Curie", "Bohr", "Schrödinger", "Dirac", "Meitner", "Noether",
+    "Feynman", "Turing", "Lovelace", "Gödel", "von Neumann", "Hopper",
+    "Heisenberg", "Planck", "Fermi", "Ramanujan", "Kovalevskaya", "Gauss",
+    "Lamarr", "Wu", "Franklin", "Chandrasekhar", "Schmidhuber", "Pauli",
+    "Yukawa", "Mendeleev", "Kierkegaard", "García", "O'Neil",
+    ]
+
+WORDS = [
+    "quantum", "theory", "electron", "dynamics", "algorithm", "computation",
+    "field", "lattice", "gauge", "symmetry", "network", "neural", "entropy",
+    "statistical", "mechanics", "coupled", "cluster", "perturbation",
+    "relativistic", "general", "spectral", "analysis", "method", "approach",
+    "efficient", "parallel", "scalable", "density", "functional", "wave",
+    "function", "many-body", "problem", "numerical", "simulation", "model",
+    "on", "the", "of", "a", "for", "with", "and", "in",
+    ]
+
+JOURNALS = [
+    "Physical Review Letters", "Physical Review B", "Nature", "Science",
+    "The Journal of Chemical Physics", "Journal of Computational Physics",
+    "Communications of the ACM", "Annalen der Physik",
+    "Proceedings of the London Mathematical Society",
+    ]
+
+TAGS = [
+    "physics", "chemistry", "math", "cs", "review", "toread", "classic",
+    "numerics", "hpc", "ml", "thesis", "important",
+    ]
+
+TYPES = ["article", "article", "article", "book", "inproceedings", "phdthesis"]
+
+
+def _words(rng: random.Random, k: int) -> str:
+    # NOTE: random.choices is only available in Python 3.6+
+    return " ".join(rng.choice(WORDS) for _ in range(k))
+
+
+def _title(rng: random.Random) -> str:
+    return _words(rng, rng.randint(4, 12)).capitalize()
+
+
+def _doi(i: int) -> str:
+    return "10.{}/bench.{}".format(1000 + i % 9000, i)
+
+
+def generate_document_data(i: int, n: int, rng: random.Random) -> Dict[str, Any]:
+    """Generate the data of the *i*-th document in a library of *n* documents.
+    """
+    author_list = [
+        {"given": rng.choice(FIRST_NAMES), "family": rng.choice(LAST_NAMES)}
+        for _ in range(rng.randint(1, 8))
+        ]
+    year = rng.randint(1900, 2022)
+
+    data = {
+        "type": rng.choice(TYPES),
+        "title": _title(rng),
+        "author_list": author_list,
+        "author": " and ".join(
+            "{a[family]}, {a[given]}".format(a=a) for a in author_list),
+        "year": year,
+        "month": rng.randint(1, 12),
+        "journal": rng.choice(JOURNALS),
+        "volume": rng.randint(1, 120),
+        "pages": "{}--{}".format(*sorted(rng.sample(range(1, 2000), 2))),
+        "doi": _doi(i),
+        "ref": "{}{}{}".format(author_list[0]["family"].replace(" ", ""),
+                               year, i),
+        "tags": rng.sample(TAGS, rng.randint(0, 4)),
+        "abstract": _words(rng, rng.randint(50, 200)),
+        "files": ["document.pdf"],
+        # NOTE: the database adds a papis_id to every document that does not
+        # have one on the first indexing, so add one to avoid rewriting files
+        "papis_id": hashlib.md5("bench-{}".format(i).encode()).hexdigest(),
+        }  # type: Dict[str, Any]
+
+    # add metadata citations to some other documents in the library
+    if n > 1 and rng.random() < 0.5:
+        data["citations"] = [
+            {"doi": _doi(j)} for j in rng.sample(range(n), min(n, 20))]
+
+    return data
+
+
+def generate_library(path: str,
+                     n: int,
+                     seed: int = 42,
+                     with_files: bool = True,
+                     with_citations: bool = True) -> List[str]:
+    """Generate a synthetic library with *n* documents in *path*.
+
+    :param seed: seed for the random number generator, so that the same
+        library is generated every time.
+    :returns: a list of the created document folders.
+    """
+    rng = random.Random(seed)
+    folders = []
+
+    for i in range(n):
+        data = generate_document_data(i, n, rng)
+        # NOTE: split the library in subfolders, like many real libraries
+        folder = os.path.join(path, "{:03d}".format(i % 997), "doc-{}".format(i))
+        os.makedirs(folder, exist_ok=True)
+
+        if with_files:
+            with open(os.path.join(folder, "document.pdf"), "wb") as fd:
+                fd.write(DUMMY_PDF)
+        else:
+            data["files"] = []
+
+        with open(os.path.join(folder, "info.yaml"), "w") as fd:
+            yaml.dump(data, fd, Dumper=Dumper,
+                      allow_unicode=True, default_flow_style=False)
+
+        if with_citations and "citations" in data:
+            citations = [{"doi": c["doi"], "title": _title(rng)}
+                         for c in data["citations"]]
+            with open(os.path.join(folder, "citations.yaml"), "w") as fd:
+                yaml.dump_all(citations, fd, Dumper=Dumper, allow_unicode=True)
+
+        folders.append(folder)
+
+    return folders
+
+
+@click.command()
+@click.help_option("--help", "-h")
+@click.argument("path", type=click.Path())
+@click.option("-n", "--number", "n", type=int, default=1000,
+              help="Number of documents to generate")
+@click.option("--seed", type=int, default=42,
+              help="Seed for the random number generator")
+@click.option("--no-files", is_flag=True, default=False,
+              help="Do not create dummy document files")
+def cli(path: str, n: int, seed: int, no_files: bool) -> None:
+    """Generate a synthetic library with N documents in PATH"""
+    generate_library(path, n, seed=seed, with_files=not no_files)
+    click.echo("Generated {} documents in '{}'".format(n, path))
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,290 @@
+"""
+Run the papis benchmarks and store the results as JSON.
+
+For every library size, a synthetic library is generated (see
+:mod:`benchmarks.generate`) and the following operations are timed:
+
+- indexing the library without a cache and loading it from the cache,
+- simple and field queries,
+- sorting with :func:`papis.document.sort`,
+- exporting to ``bibtex``, ``json`` and ``yaml``,
+- parsing the exported ``bibtex`` file with :func:`papis.bibtex.bibtex_to_dict`,
+- filtering in the ``OptionsList`` widget used by the TUI picker,
+- rendering the main page of ``papis serve``.
+
+.. code:: sh
+
+    python -m benchmarks.run --size 1000 --size 10000 -o results.json
+    python -m benchmarks.run --size 1000 --compare results.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import statistics
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import click
+
+import papis
+import papis.config
+import papis.library
+import papis.database
+import papis.document
+import papis.format
+import papis.bibtex
+import papis.commands.export
+import papis.web.search
+from papis.tui.widgets.list import OptionsList
+
+from benchmarks.generate import generate_library
+
+State = Dict[str, Any]
+Benchmark = NamedTuple("Benchmark", [
+    ("name", str),
+    ("run", Callable[[State], Any]),
+    ("setup", Optional[Callable[[State], None]]),
+    ])
+
+BENCHMARKS = []  # type: List[Benchmark]
+
+
+def benchmark(name: str,
+              setup: Optional[Callable[[State], None]] = None
+              ) -> Callable[[Callable[[State], Any]], Callable[[State], Any]]:
+    """Register a benchmark. The *setup* function is called before every
+    repetition of the benchmark and is not timed.
+    """
+    def decorator(fn: Callable[[State], Any]) -> Callable[[State], Any]:
+        BENCHMARKS.append(Benchmark(name=name, run=fn, setup=setup))
+        return fn
+
+    return decorator
+
+
+def _clear_cache(state: State) -> None:
+    papis.database.clear_cached()
+    db = papis.database.get()
+    db.clear()
+
+
+def _drop_database(state: State) -> None:
+    papis.database.clear_cached()
+
+
+@benchmark("index.cold", setup=_clear_cache)
+def bench_index_cold(state: State) -> Any:
+    return papis.database.get().get_all_documents()
+
+
+@benchmark("index.cached", setup=_drop_database)
+def bench_index_cached(state: State) -> Any:
+    return papis.database.get().get_all_documents()
+
+
+@benchmark("query.simple")
+def bench_query_simple(state: State) -> Any:
+    return papis.database.get().query("einstein quantum")
+
+
+@benchmark("query.field")
+def bench_query_field(state: State) -> Any:
+    return papis.database.get().query("author : curie year : 19")
+
+
+@benchmark("sort")
+def bench_sort(state: State) -> Any:
+    return papis.document.sort(state["documents"], "year", False)
+
+
+@benchmark("export.bibtex")
+def bench_export_bibtex(state: State) -> Any:
+    return papis.commands.export.run(state["documents"], "bibtex")
+
+
+@benchmark("export.json")
+def bench_export_json(state: State) -> Any:
+    return papis.commands.export.run(state["documents"], "json")
+
+
+@benchmark("export.yaml")
+def bench_export_yaml(state: State) -> Any:
+    return papis.commands.export.run(state["documents"], "yaml")
+
+
+@benchmark("bibtex.parse")
+def bench_bibtex_parse(state: State) -> Any:
+    return papis.bibtex.bibtex_to_dict(state["bibfile"])
+
+
+@benchmark("tui.options_list")
+def bench_options_list(state: State) -> Any:
+    header_format = papis.config.getstring("header-format")
+    match_format = papis.config.getstring("match-format")
+    options = OptionsList(
+        state["documents"],
+        header_filter=lambda d: papis.format.format(header_format, d),
+        match_filter=lambda d: papis.format.format(match_format, d))
+    options.search_buffer.text = "quantum"
+    options.search_buffer.text = "quantum theory"
+
+    return options.indices
+
+
+@benchmark("serve.page")
+def bench_serve_page(state: State) -> Any:
+    page = papis.web.search.html(pretitle="HOME",
+                                 libname=state["libname"],
+                                 libfolder=state["libdir"],
+                                 query="einstein",
+                                 documents=state["documents"])
+    return str(page)
+
+
+def _setup_library(libdir: str, cachedir: str) -> State:
+    papis.config.set("cache-dir", cachedir)
+    library = papis.library.from_paths([libdir])
+    papis.config.set_lib(library)
+    papis.database.clear_cached()
+
+    db = papis.database.get()
+    db.clear()
+    documents = db.get_all_documents()
+
+    bibfile = os.path.join(cachedir, "library.bib")
+    with open(bibfile, "w") as fd:
+        fd.write(papis.commands.export.run(documents, "bibtex"))
+
+    return {
+        "libdir": libdir,
+        "libname": library.name,
+        "documents": documents,
+        "bibfile": bibfile,
+        }
+
+
+def run_benchmarks(size: int,
+                   repeat: int = 3,
+                   names: Optional[List[str]] = None,
+                   workdir: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Run all benchmarks on a synthetic library of *size* documents.
+
+    :param names: if given, only benchmarks with these names (or names
+        starting with these prefixes) are run.
+    :param workdir: folder where the library is generated. If it already
+        contains a library of the same size, it is reused.
+    :returns: a dictionary from the benchmark name to its timings in seconds.
+    """
+    tmpdir = tempfile.mkdtemp(prefix="papis-bench-")
+    libdir = os.path.join(workdir or tmpdir, "library-{}".format(size))
+    cachedir = os.path.join(tmpdir, "cache")
+    os.makedirs(cachedir)
+
+    try:
+        if not os.path.exists(libdir):
+            click.echo("Generating library with {} documents".format(size),
+                       err=True)
+            generate_library(libdir, size)
+
+        state = _setup_library(libdir, cachedir)
+
+        results = {}  # type: Dict[str, Dict[str, float]]
+        for bench in BENCHMARKS:
+            if names and not any(bench.name.startswith(n) for n in names):
+                continue
+
+            timings = []
+            for _ in range(repeat):
+                if bench.setup is not None:
+                    bench.setup(state)
+
+                t_start = time.perf_counter()
+                bench.run(state)
+                timings.append(time.perf_counter() - t_start)
+
+            results[bench.name] = {
+                "min": min(timings),
+                "median": statistics.median(timings),
+                "max": max(timings),
+                }
+            click.echo("{:>8} {:<20} {:10.4f}s".format(
+                size, bench.name, results[bench.name]["min"]), err=True)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    return results
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """Print the ratio between the timings of two result files."""
+    click.echo("{:>8} {:<20} {:>10} {:>10} {:>8}".format(
+        "size", "benchmark", "old", "new", "ratio"))
+    for size, results in new["results"].items():
+        old_results = old["results"].get(size, {})
+        for name, timings in results.items():
+            if name not in old_results:
+                continue
+
+            t_old = old_results[name]["min"]
+            t_new = timings["min"]
+            click.echo("{:>8} {:<20} {:10.4f} {:10.4f} {:8.2f}".format(
+                size, name, t_old, t_new, t_new / t_old if t_old else 0.0))
+
+
+@click.command()
+@click.help_option("--help", "-h")
+@click.option("-s", "--size", "sizes", type=int, multiple=True,
+              help="Number of documents in the library (can be repeated), "
+                   "defaults to 1000, 10000 and 100000")
+@click.option("-r", "--repeat", type=int, default=3,
+              help="Number of repetitions of each benchmark")
+@click.option("-b", "--bench", "names", multiple=True,
+              help="Only run benchmarks starting with this name "
+                   "(can be repeated)")
+@click.option("-w", "--workdir", type=click.Path(), default=None,
+              help="Folder where the generated libraries are kept between "
+                   "runs")
+@click.option("-o", "--out", type=click.Path(), default=None,
+              help="File to write the JSON results to")
+@click.option("--compare", "compare_file", type=click.Path(exists=True),
+              default=None,
+              help="JSON results from a previous run to compare against")
+def cli(sizes: List[int],
+        repeat: int,
+        names: List[str],
+        workdir: Optional[str],
+        out: Optional[str],
+        compare_file: Optional[str]) -> None:
+    """Run the papis benchmarks"""
+    sizes = list(sizes) or [1000, 10000, 100000]
+
+    data = {
+        "papis": papis.__version__,
+        "python": sys.version,
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "results": {
+            str(size): run_benchmarks(size, repeat=repeat, names=list(names),
+                                      workdir=workdir)
+            for size in sizes
+            },
+        }
+
+    if out is not None:
+        with open(out, "w") as fd:
+            json.dump(data, fd, indent=2)
+    else:
+        click.echo(json.dumps(data, indent=2))
+
+    if compare_file is not None:
+        with open(compare_file) as fd:
+            compare(json.load(fd), data)
+
+
+if __name__ == "__main__":
+    cli()
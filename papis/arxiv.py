@@ -17,16 +17,22 @@
 """
 import os
 import re
-import sys
-from typing import Optional, List, Dict, Any
+import collections
+from typing import (Any, Deque, Dict, IO, Iterator, List, NamedTuple, Optional,
+                    Tuple, TYPE_CHECKING)
 
 import click
 
+import papis.config
 import papis.filetype
 import papis.downloaders.base
-import papis.config
+import papis.httpclient
 import papis.logging
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from xml.etree import ElementTree
+
 logger = papis.logging.get_logger(__name__)
 
 ARXIV_API_URL = "http://arxiv.org/api/query"
@@ -34,6 +40,225 @@ ARXIV_ABS_URL = "https://arxiv.org/abs"
 ARXIV_PDF_URL = "https://arxiv.org/pdf"
 
 
+#: Namespaces used by the Atom feeds of the arXiv API.
+ARXIV_NAMESPACES = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+    }
+#: Maximum number of results returned by the arXiv API in a single request.
+ARXIV_MAX_PAGE_SIZE = 2000
+
+ArxivPage = NamedTuple("ArxivPage", [
+    ("total", Optional[int]),
+    ("entries", List[Dict[str, Any]]),
+    ])
+
+_LIMITER = None  # type: Optional[papis.httpclient.RateLimiter]
+
+
+def _get_limiter() -> papis.httpclient.RateLimiter:
+    global _LIMITER
+
+    if _LIMITER is None:
+        delay = papis.config.getfloat("arxiv-delay") or 0.0
+        _LIMITER = papis.httpclient.RateLimiter(1.0 / delay if delay > 0 else 0.0)
+
+    return _LIMITER
+
+
+def _get_text(elem: "ElementTree.Element", path: str) -> str:
+    text = elem.findtext(path, default="", namespaces=ARXIV_NAMESPACES)
+    return " ".join(text.split())
+
+
+def _entry_to_data(entry: "ElementTree.Element") -> Dict[str, Any]:
+    data = {}   # type: Dict[str, Any]
+    data["abstract"] = _get_text(entry, "atom:summary")
+    data["url"] = _get_text(entry, "atom:id")
+    data["published"] = _get_text(entry, "atom:published")
+    if data["published"]:
+        data["year"] = data["published"][0:4]
+    data["title"] = _get_text(entry, "atom:title")
+    data["author"] = ", ".join(
+        _get_text(author, "atom:name")
+        for author in entry.findall("atom:author", ARXIV_NAMESPACES))
+
+    return data
+
+
+def parse_feed(fd: IO[bytes]) -> Iterator[Tuple[str, Any]]:
+    """Parse an Atom feed from the arXiv API incrementally.
+
+    The entries are converted to papis data as soon as they are parsed and
+    their elements are then discarded, so the parsed feed is never kept in
+    memory.
+
+    :param fd: a binary file-like object with the feed.
+    :returns: an iterator over ``("total", int)`` (the total number of
+        results of the query) and ``("entry", dict)`` items.
+    """
+    from xml.etree import ElementTree
+
+    entry_tag = "{{{}}}entry".format(ARXIV_NAMESPACES["atom"])
+    total_tag = "{{{}}}totalResults".format(ARXIV_NAMESPACES["opensearch"])
+
+    depth = 0
+    for event, elem in ElementTree.iterparse(fd, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            continue
+
+        depth -= 1
+        if elem.tag == total_tag:
+            yield "total", int(elem.text or 0)
+        elif elem.tag == entry_tag:
+            yield "entry", _entry_to_data(elem)
+            elem.clear()
+        elif depth == 1:
+            # NOTE: drop the other children of the feed as well
+            elem.clear()
+
+
+def _get_search_query(**kwargs: str) -> str:
+    prefixes = {
+        "query": "all",
+        "title": "ti",
+        "author": "au",
+        "category": "cat",
+        "abstract": "abs",
+        "comment": "co",
+        "journal": "jr",
+        "report_number": "rn",
+        }
+
+    return "+AND+".join(
+        "{}:{}".format(prefixes[key], value)
+        for key, value in kwargs.items() if value)
+
+
+def _fetch_page(search_query: str, id_list: str,
+                start: int, max_results: int) -> ArxivPage:
+    import io
+    import urllib.parse
+
+    params = urllib.parse.urlencode({
+        key: value for key, value in (
+            ("search_query", search_query),
+            ("id_list", id_list),
+            ("start", start),
+            ("max_results", max_results),
+            ) if value != ""})
+    url = "{}?{}".format(ARXIV_API_URL, params)
+    logger.debug("url = '%s'", url)
+
+    # NOTE: the response is not streamed, so that it can be stored in the
+    # HTTP cache (see papis.httpcache)
+    _get_limiter().wait()
+    response = papis.httpclient.get(url)
+    response.raise_for_status()
+
+    total = None
+    entries = []
+    for key, value in parse_feed(io.BytesIO(response.content)):
+        if key == "total":
+            total = value
+        else:
+            entries.append(value)
+
+    return ArxivPage(total=total, entries=entries)
+
+
+def iter_data(
+        query: str = "",
+        author: str = "",
+        title: str = "",
+        abstract: str = "",
+        comment: str = "",
+        journal: str = "",
+        report_number: str = "",
+        category: str = "",
+        id_list: str = "",
+        page: int = 0,
+        max_results: int = 30,
+        page_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        ) -> Iterator[Dict[str, Any]]:
+    """Query the arXiv API and yield the results as they arrive.
+
+    The results are requested in pages of *page_size* entries. After the
+    first page, the remaining pages are fetched in the background by
+    *max_workers* threads, so that the next pages are downloaded while the
+    previous ones are consumed. The requests are spaced out by
+    :ref:`arxiv-delay <config-settings-arxiv-delay>` seconds, as requested by
+    the arXiv API terms of use.
+
+    :param page: index of the first result.
+    :param max_results: maximum number of results.
+    :param page_size: number of results in each request, defaults to
+        :ref:`arxiv-page-size <config-settings-arxiv-page-size>`.
+    :param max_workers: maximum number of pages fetched concurrently,
+        defaults to :ref:`arxiv-max-workers <config-settings-arxiv-max-workers>`.
+    :returns: an iterator over the data of the results in order.
+    """
+    if page_size is None:
+        page_size = papis.config.getint("arxiv-page-size") or ARXIV_MAX_PAGE_SIZE
+    page_size = max(1, min(page_size, ARXIV_MAX_PAGE_SIZE, max_results))
+
+    if max_workers is None:
+        max_workers = papis.config.getint("arxiv-max-workers") or 1
+
+    search_query = _get_search_query(
+        query=query, title=title, author=author, category=category,
+        abstract=abstract, comment=comment, journal=journal,
+        report_number=report_number)
+    logger.debug("query = '%s'", search_query)
+
+    if max_results <= 0:
+        return
+
+    first = _fetch_page(search_query, id_list, page, page_size)
+    yield from first.entries
+
+    end = page + max_results
+    if first.total is not None:
+        end = min(end, first.total)
+
+    if len(first.entries) < page_size or page + page_size >= end:
+        return
+
+    starts = iter(range(page + page_size, end, page_size))
+    logger.debug("Fetching %d more results with %d workers",
+                 end - page - page_size, max_workers)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # NOTE: only a few pages are in flight at any time, so that memory
+        # stays bounded and stopping early does not fetch all the pages
+        pending = collections.deque()   # type: Deque[Future[ArxivPage]]
+
+        def submit_next() -> None:
+            start = next(starts, None)
+            if start is not None:
+                pending.append(executor.submit(
+                    _fetch_page, search_query, id_list,
+                    start, min(page_size, end - start)))
+
+        for _ in range(max_workers):
+            submit_next()
+
+        try:
+            while pending:
+                result = pending.popleft().result()
+                if not result.entries:
+                    break
+
+                submit_next()
+                yield from result.entries
+        finally:
+            for future in pending:
+                future.cancel()
+
+
 def get_data(
         query: str = "",
         author: str = "",
@@ -47,82 +272,28 @@ def get_data(
         page: int = 0,
         max_results: int = 30
         ) -> List[Dict[str, Any]]:
-    dict_params = {
-        "all": query,
-        "ti": title,
-        "au": author,
-        "cat": category,
-        "abs": abstract,
-        "co": comment,
-        "jr": journal,
-        "id_list": id_list,
-        "rn": report_number
-    }
-    result = []
-    clean_params = {x: dict_params[x] for x in dict_params if dict_params[x]}
-    search_query = "+AND+".join(
-        ["{}:{}".format(key, clean_params[key]) for key in clean_params]
-    )
-    logger.debug("query = '%s'", search_query)
-
-    import urllib.parse
-    params = urllib.parse.urlencode(
-        {
-            "search_query": search_query,
-            "start": page,
-            "max_results": max_results
-        }
-    )
-    req_url = "{}?{}".format(ARXIV_API_URL, params)
-    logger.debug("url = '%s'", req_url)
-
-    import urllib.request
-    url = urllib.request.Request(
-        req_url,
-        headers={
-            "User-Agent": papis.config.getstring("user-agent")
-        }
-    )
-    xmldoc = urllib.request.urlopen(url).read()
-
-    import bs4
-    soup = bs4.BeautifulSoup(
-        xmldoc,
-        features="html.parser" if sys.version_info.minor < 6 else "lxml-xml")
-
-    entries = soup.find_all("entry")
-    for entry in entries:
-        data = {}
-        data["abstract"] = entry.find("summary").get_text().replace("\n", " ")
-        data["url"] = entry.find("id").get_text()
-        data["published"] = entry.find("published").get_text()
-        published = data.get("published")
-        if published:
-            assert isinstance(published, str)
-            data["year"] = published[0:4]
-        data["title"] = entry.find("title").get_text().replace("\n", " ")
-        data["author"] = ", ".join(
-            [
-                author.get_text().replace("\n", "")
-                for author in entry.find_all("author")
-            ]
-        )
-        result.append(data)
-    return result
+    """
+    :returns: a list with all the results of :func:`iter_data`.
+    """
+    return list(iter_data(
+        query=query, author=author, title=title, abstract=abstract,
+        comment=comment, journal=journal, report_number=report_number,
+        category=category, id_list=id_list, page=page,
+        max_results=max_results))
 
 
 def validate_arxivid(arxivid: str) -> None:
-    import urllib.request
-    url = "{}/{}".format(ARXIV_ABS_URL, arxivid)
-    request = urllib.request.Request(url)
+    import requests
 
-    from urllib.error import HTTPError, URLError
+    url = "{}/{}".format(ARXIV_ABS_URL, arxivid)
     try:
-        urllib.request.urlopen(request)
-    except HTTPError:
-        raise ValueError("HTTP 404: '{}' not an arxivid".format(arxivid))
-    except URLError:
-        pass
+        response = papis.httpclient.get(url)
+    except requests.RequestException:
+        return
+
+    if not response.ok:
+        raise ValueError("HTTP {}: '{}' not an arxivid"
+                         .format(response.status_code, arxivid))
 
 
 def pdf_to_arxivid(
@@ -213,7 +384,7 @@ def explorer(
     """
     logger.info("Looking up...")
 
-    data = get_data(
+    data = iter_data(
         query=query,
         author=author,
         title=title,
@@ -225,10 +396,10 @@ def explorer(
         id_list=id_list,
         page=page or 0,
         max_results=max)
-    docs = [papis.document.from_data(data=d) for d in data]
-    ctx.obj["documents"] += docs
+    ndocs = len(ctx.obj["documents"])
+    ctx.obj["documents"].extend(papis.document.from_data(data=d) for d in data)
 
-    logger.info("%s documents found", len(docs))
+    logger.info("%s documents found", len(ctx.obj["documents"]) - ndocs)
 
 
 class Downloader(papis.downloaders.Downloader):
@@ -41,16 +41,12 @@ def get_data(query: str = "", hits: int = 20) -> List[Dict[str, Any]]:
     req_url = base_baseurl + "search?" + params
     logger.debug("url = '%s'", req_url)
 
-    import urllib.request
-    url = urllib.request.Request(
-        req_url,
-        headers={
-            "User-Agent": "papis"
-        }
-    )
+    import papis.httpclient
+    response = papis.httpclient.get(req_url, headers={"User-Agent": "papis"})
+    response.raise_for_status()
 
     import json
-    jsondoc = json.loads(urllib.request.urlopen(url).read().decode())
+    jsondoc = json.loads(response.content.decode())
     docs = jsondoc.get("response").get("docs")
 
     logger.info("Retrieved %d documents", len(docs))
@@ -1,6 +1,13 @@
 import os
+import re
+import sys
+import time
 import string
-from typing import Optional, List, FrozenSet, Dict, Any, Iterator
+import functools
+import itertools
+from typing import (
+    Optional, List, FrozenSet, Dict, Any, Iterable, Iterator, NamedTuple, Set,
+    Tuple)
 
 import click
 
@@ -8,6 +15,7 @@ import papis.config
 import papis.importer
 import papis.filetype
 import papis.document
+import papis.exporter
 import papis.format
 import papis.logging
 
@@ -120,8 +128,10 @@ bibtex_ignore_keys = (
 )  # type: FrozenSet[str]
 
 
-def exporter(documents: List[papis.document.Document]) -> str:
-    return "\n\n".join(to_bibtex_multiple(documents))
+@papis.exporter.streaming
+def exporter(documents: Iterable[papis.document.Document]) -> Iterator[str]:
+    for i, bib in enumerate(to_bibtex_multiple(documents)):
+        yield bib if i == 0 else "\n\n" + bib
 
 
 class Importer(papis.importer.Importer):
@@ -144,7 +154,7 @@ class Importer(papis.importer.Importer):
     def fetch(self: papis.importer.Importer) -> Any:
         self.logger.info("Reading input file = '%s'", self.uri)
         try:
-            bib_data = bibtex_to_dict(self.uri)
+            bib_data = list(itertools.islice(iter_bibtex_entries(self.uri), 2))
             if len(bib_data) > 1:
                 self.logger.warning(
                     "The bibtex file contains more than one entry, "
@@ -170,12 +180,12 @@ def explorer(ctx: click.core.Context, bibfile: str) -> None:
     """
     logger.info("Reading in bibtex file '%s'", bibfile)
 
-    docs = [
+    ndocs = len(ctx.obj["documents"])
+    ctx.obj["documents"].extend(
         papis.document.from_data(d)
-        for d in bibtex_to_dict(bibfile)]
-    ctx.obj["documents"] += docs
+        for d in iter_bibtex_entries(bibfile))
 
-    logger.info("%d documents found", len(docs))
+    logger.info("%d documents found", len(ctx.obj["documents"]) - ndocs)
 
 
 def bibtexparser_entry_to_papis(entry: Dict[str, str]) -> Dict[str, str]:
@@ -215,6 +225,80 @@ def bibtex_to_dict(bibtex: str) -> List[Dict[str, str]]:
     :returns: Dictionary with bibtex information with keys that bibtex
         formally recognizes.
     """
+    return list(iter_bibtex_entries(bibtex))
+
+
+#: Approximate size (in characters) of the chunks parsed by
+#: :func:`iter_bibtex_entries`.
+BIBTEX_CHUNK_SIZE = 1024 * 1024
+
+_BIBTEX_ENTRY_START_RE = re.compile(
+    r"^[ \t]*@[ \t]*([a-zA-Z]+)[ \t]*[{(]", re.MULTILINE)
+
+
+def _iter_bibtex_blocks(parts: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Split the text given in *parts* on the ``@entry`` markers that are at
+    the top level, i.e. outside of any braces.
+
+    The text is scanned incrementally, so *parts* can be the chunks read
+    from a large file and only the current (incomplete) entry is kept in
+    memory.
+
+    :returns: an iterator over tuples ``(entry_type, block)``, where each
+        block of text contains a single entry. Any text before the first
+        entry is part of a first block with an empty type.
+    """
+    buf = ""
+    entry_type = ""
+    begin = last = depth = 0
+    for part in itertools.chain(parts, [None]):
+        if part is None:
+            end = len(buf)
+        else:
+            # NOTE: entry markers do not span lines, so only complete lines
+            # are scanned and the rest is kept for the next part
+            buf += part
+            end = max(last, buf.rfind("\n", last) + 1)
+
+        for m in _BIBTEX_ENTRY_START_RE.finditer(buf, last, end):
+            depth += buf.count("{", last, m.start()) - buf.count("}", last, m.start())
+            last = m.start()
+            if depth <= 0:
+                depth = 0
+                if last > begin:
+                    yield entry_type, buf[begin:last]
+                begin, entry_type = last, m.group(1).lower()
+
+        depth += buf.count("{", last, end) - buf.count("}", last, end)
+        buf, last, begin = buf[begin:], end - begin, 0
+
+    if buf:
+        yield entry_type, buf
+
+
+def _iter_bibtex_chunks(parts: Iterable[str], chunk_size: int) -> Iterator[str]:
+    """Group the entries in *parts* into chunks of roughly *chunk_size*
+    characters, each prefixed by the ``@string`` definitions seen so far.
+    """
+    strings = []  # type: List[str]
+    chunk = []  # type: List[str]
+    size = 0
+    for entry_type, block in _iter_bibtex_blocks(parts):
+        if entry_type == "string":
+            strings.append(block)
+            continue
+
+        chunk.append(block)
+        size += len(block)
+        if size >= chunk_size:
+            yield "".join(strings) + "".join(chunk)
+            chunk, size = [], 0
+
+    if chunk:
+        yield "".join(strings) + "".join(chunk)
+
+
+def _parse_bibtex_chunk(text: str) -> List[Dict[str, str]]:
     from bibtexparser.bparser import BibTexParser
     parser = BibTexParser(
         common_strings=True,
@@ -226,17 +310,66 @@ def bibtex_to_dict(bibtex: str) -> List[Dict[str, str]]:
     import logging
     logging.getLogger("bibtexparser.bparser").setLevel(logging.WARNING)
 
-    if os.path.exists(bibtex):
-        with open(bibtex) as fd:
-            logger.debug("Reading in file '%s'", bibtex)
-            text = fd.read()
-    else:
-        text = bibtex
     entries = parser.parse(text, partial=True).entries
     # Clean entries
     return [bibtexparser_entry_to_papis(entry) for entry in entries]
 
 
+def iter_bibtex_entries(
+        bibtex: str, *,
+        chunk_size: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """Parse the entries in a BibTeX file (see :func:`bibtex_to_dict`).
+
+    Large inputs are read incrementally and split into chunks of roughly
+    *chunk_size* characters at top-level ``@entry`` boundaries. Every chunk
+    is prefixed by the ``@string`` definitions that precede it, so that the
+    macros can be expanded, and the chunks are parsed in a process pool.
+
+    :param bibtex: Bibtex file path or bibtex information in string format.
+    :param chunk_size: approximate size of each chunk, which defaults to
+        :data:`BIBTEX_CHUNK_SIZE`.
+    :returns: an iterator over the entries in the same order as in the input.
+    """
+    if chunk_size is None:
+        chunk_size = BIBTEX_CHUNK_SIZE
+
+    if os.path.exists(bibtex):
+        logger.debug("Reading in file '%s'", bibtex)
+        with open(bibtex) as fd:
+            if os.path.getsize(bibtex) <= chunk_size:
+                yield from _parse_bibtex_chunk(fd.read())
+            else:
+                parts = iter(functools.partial(fd.read, chunk_size), "")
+                yield from _parse_bibtex_chunks(
+                    _iter_bibtex_chunks(parts, chunk_size))
+    elif len(bibtex) <= chunk_size:
+        yield from _parse_bibtex_chunk(bibtex)
+    else:
+        yield from _parse_bibtex_chunks(
+            _iter_bibtex_chunks([bibtex], chunk_size))
+
+
+def _parse_bibtex_chunks(chunks: Iterator[str]) -> Iterator[Dict[str, str]]:
+    first = next(chunks, None)
+    if first is None:
+        return
+
+    second = next(chunks, None)
+    if second is None:
+        yield from _parse_bibtex_chunk(first)
+        return
+
+    chunks = itertools.chain([first, second], chunks)
+    if sys.platform != "win32":
+        import papis.utils
+        results = papis.utils.parmap_iter(_parse_bibtex_chunk, chunks)
+    else:
+        results = map(_parse_bibtex_chunk, chunks)
+
+    for entries in results:
+        yield from entries
+
+
 def ref_cleanup(ref: str) -> str:
     """
     Function to cleanup references to be acceptable for latex
@@ -279,9 +412,155 @@ def create_reference(doc: Dict[str, Any], force: bool = False) -> str:
     return ref_cleanup(ref)
 
 
-def to_bibtex_multiple(documents: List[papis.document.Document]) -> Iterator[str]:
+#: Version of the entries stored in the export cache. This needs to be
+#: increased whenever the output of :func:`to_bibtex` changes.
+EXPORT_CACHE_VERSION = 1
+#: Entries in the export cache that were not used for this many seconds are
+#: removed when the cache is saved.
+EXPORT_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+#: Number of documents that are rendered at once by :func:`to_bibtex_multiple`.
+EXPORT_BATCH_SIZE = 1024
+#: Minimum number of exported documents for which the export cache is used.
+#: Smaller exports are faster to render than to load the cache.
+EXPORT_CACHE_MIN_DOCUMENTS = 128
+#: Minimum number of new or refreshed entries for which the export cache is
+#: written back to disk.
+EXPORT_CACHE_MIN_CHANGES = 16
+#: Minimum number of changed documents that are rendered in a process pool.
+EXPORT_PARALLEL_THRESHOLD = 256
+
+ExportSettings = NamedTuple("ExportSettings", [
+    ("unicode", bool),
+    ("journal_key", str),
+    ("zotero_file", bool),
+    ])
+
+
+def get_export_settings() -> ExportSettings:
+    """
+    :returns: the configuration settings used by :func:`to_bibtex` for the
+        current library.
+    """
+    return ExportSettings(
+        unicode=papis.config.getboolean("bibtex-unicode") or False,
+        journal_key=papis.config.getstring("bibtex-journal-key"),
+        zotero_file=(
+            papis.config.getboolean("bibtex-export-zotero-file") or False),
+        )
+
+
+def _get_export_settings_key(settings: ExportSettings) -> str:
+    import hashlib
+    import papis
+
+    key = repr((
+        papis.__version__, EXPORT_CACHE_VERSION, tuple(settings),
+        papis.config.get("ref-format"), papis.config.get("formater"),
+        sorted(bibtex_types), sorted(bibtex_keys), sorted(bibtex_ignore_keys),
+        ))
+
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _get_document_key(doc: papis.document.Document, settings_key: str) -> str:
+    import json
+    import hashlib
+
+    data = json.dumps(
+        [settings_key, doc.get_info_file(), papis.document.to_dict(doc)],
+        sort_keys=True, default=str)
+
+    return hashlib.md5(data.encode()).hexdigest()
+
+
+def get_export_cache_path() -> str:
+    """
+    :returns: the path to the file storing the cache of rendered BibTeX
+        entries used by :func:`to_bibtex_multiple`.
+    """
+    import papis.utils
+    return os.path.join(papis.utils.get_cache_home(), "bibtex-export")
+
+
+def _load_export_cache() -> Dict[str, Tuple[str, float]]:
+    import pickle
+
+    path = get_export_cache_path()
+    if not os.path.exists(path):
+        return {}
+
+    try:
+        with open(path, "rb") as fd:
+            cache = pickle.load(fd)
+    except Exception as exc:
+        logger.debug("Could not load BibTeX export cache '%s': %s", path, exc)
+        return {}
+
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_export_cache(cache: Dict[str, Tuple[str, float]]) -> None:
+    import pickle
+
+    now = time.time()
+    cache = {key: value for key, value in cache.items()
+             if now - value[1] < EXPORT_CACHE_MAX_AGE}
+
+    path = get_export_cache_path()
+    tmp_path = "{}.{}".format(path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as fd:
+            pickle.dump(cache, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.debug("Could not save BibTeX export cache '%s': %s", path, exc)
+
+
+def clear_export_cache() -> None:
+    """Remove all the cached BibTeX entries."""
+    path = get_export_cache_path()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _to_bibtex_with_settings(settings: ExportSettings,
+                             document: papis.document.Document) -> str:
+    return to_bibtex(document, settings=settings)
+
+
+def _to_bibtex_batch(documents: List[papis.document.Document],
+                     settings: ExportSettings) -> List[str]:
+    render = functools.partial(_to_bibtex_with_settings, settings)
+    if len(documents) < EXPORT_PARALLEL_THRESHOLD or sys.platform == "win32":
+        return [render(doc) for doc in documents]
+
+    import papis.utils
+    return papis.utils.parmap(render, documents)
+
+
+def _batched(documents: Iterable[papis.document.Document],
+             size: int) -> Iterator[List[papis.document.Document]]:
+    batch = []  # type: List[papis.document.Document]
     for doc in documents:
-        bib = to_bibtex(doc)
+        batch.append(doc)
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def to_bibtex_multiple(
+        documents: Iterable[papis.document.Document]) -> Iterator[str]:
+    """Create BibTeX entries for all the *documents* (see
+    :func:`to_bibtex_entries`).
+
+    :param documents: an iterable of documents, which is consumed in batches.
+    :returns: an iterator over the BibTeX entries of the *documents* that
+        could be exported.
+    """
+    for doc, bib in to_bibtex_entries(documents):
         if not bib:
             logger.warning("Skipping document export: '%s'",
                            doc.get_info_file())
@@ -290,12 +569,84 @@ def to_bibtex_multiple(documents: List[papis.document.Document]) -> Iterator[str
         yield bib
 
 
-def to_bibtex(document: papis.document.Document, *, indent: int = 2) -> str:
+def to_bibtex_entries(
+        documents: Iterable[papis.document.Document]
+        ) -> Iterator[Tuple[papis.document.Document, str]]:
+    """Create BibTeX entries for all the *documents* (see :func:`to_bibtex`).
+
+    Unless ``bibtex-export-cache`` is disabled, the rendered entries are
+    cached on disk, keyed by the content of the document and the export
+    settings, so that only new or modified documents are rendered again.
+    These are rendered in a process pool when there are many of them. The
+    cache is not used for exports of less than
+    :data:`EXPORT_CACHE_MIN_DOCUMENTS` documents and it is only written back
+    when at least :data:`EXPORT_CACHE_MIN_CHANGES` entries changed.
+
+    :param documents: an iterable of documents, which is consumed in batches.
+    :returns: an iterator over tuples of each document and its BibTeX entry,
+        which is empty if the document could not be exported.
+    """
+    settings = get_export_settings()
+    use_cache = papis.config.getboolean("bibtex-export-cache")
+    cache = None  # type: Optional[Dict[str, Tuple[str, float]]]
+
+    nhits = nmisses = nrefreshed = 0
+    try:
+        for batch in _batched(documents, EXPORT_BATCH_SIZE):
+            # NOTE: a batch smaller than the threshold is also the last one
+            if (use_cache and cache is None
+                    and len(batch) >= EXPORT_CACHE_MIN_DOCUMENTS):
+                cache = _load_export_cache()
+                settings_key = _get_export_settings_key(settings)
+            use_cache = cache is not None
+
+            if cache is None:
+                bibs = _to_bibtex_batch(batch, settings)
+            else:
+                now = time.time()
+                keys = [_get_document_key(doc, settings_key) for doc in batch]
+                bibs = [cache[key][0] if key in cache else "" for key in keys]
+
+                missing = [i for i, key in enumerate(keys) if key not in cache]
+                rendered = _to_bibtex_batch([batch[i] for i in missing],
+                                            settings)
+                for i, bib in zip(missing, rendered):
+                    bibs[i] = bib
+
+                for key, bib in zip(keys, bibs):
+                    if key in cache and now - cache[key][1] > 24 * 60 * 60:
+                        nrefreshed += 1
+
+                    if bib:
+                        cache[key] = (bib, now)
+
+                nhits += len(batch) - len(missing)
+                nmisses += len(missing)
+
+            yield from zip(batch, bibs)
+    finally:
+        if cache is not None:
+            logger.debug("BibTeX export cache: %d hits and %d misses",
+                         nhits, nmisses)
+            # NOTE: the cache is also saved to refresh the time stamps of the
+            # used entries, so that they do not expire
+            if nmisses + nrefreshed >= max(EXPORT_CACHE_MIN_CHANGES, 1):
+                _save_export_cache(cache)
+
+
+def to_bibtex(document: papis.document.Document, *,
+              indent: int = 2,
+              settings: Optional[ExportSettings] = None) -> str:
     """Create a bibtex string from document's information
 
     :param document: Papis document
+    :param settings: export settings, which are read from the configuration
+        when not given (see :func:`get_export_settings`).
     :returns: String containing bibtex formatting
     """
+    if settings is None:
+        settings = get_export_settings()
+
     bibtex_type = ""
 
     # determine bibtex type
@@ -326,8 +677,8 @@ def to_bibtex(document: papis.document.Document, *, indent: int = 2) -> str:
     from bibtexparser.latexenc import string_to_latex
 
     # process keys
-    supports_unicode = papis.config.getboolean("bibtex-unicode")
-    journal_key = papis.config.getstring("bibtex-journal-key")
+    supports_unicode = settings.unicode
+    journal_key = settings.journal_key
     lines = ["{}".format(ref)]
 
     for key in sorted(document):
@@ -357,14 +708,106 @@ def to_bibtex(document: papis.document.Document, *, indent: int = 2) -> str:
         lines.append("{} = {{{}}}".format(bib_key, bib_value))
 
     # Handle file for zotero exporting
-    if (papis.config.getboolean("bibtex-export-zotero-file")
-            and document.get_files()):
+    if settings.zotero_file and document.get_files():
         lines.append("{} = {{{}}}".format("file", ";".join(document.get_files())))
 
     separator = ",\n" + " " * indent
     return "@{type}{{{keys},\n}}".format(type=bibtex_type, keys=separator.join(lines))
 
 
+_TEX_COMMENT_RE = re.compile(r"(?<!\\)%.*$", re.MULTILINE)
+# NOTE: matches \cite, \citep, \citet*, \autocite, \parencite, \textcite,
+# \footcite, \nocite, \citeauthor, the multicite \cites commands, etc. and
+# the \citation lines in .aux files
+_CITE_COMMAND_RE = re.compile(
+    r"\\(?P<command>[a-zA-Z]*[cC]ite[a-zA-Z]*|citation)\*?"
+    r"(?P<args>(?:\s*(?:\[[^\]]*\]|\([^)]*\)))*"
+    r"(?:\s*\{[^}]*\}(?:\s*\[[^\]]*\])*)+)")
+_CITE_ARGUMENT_RE = re.compile(r"\{([^}]*)\}")
+# NOTE: biblatex writes \abx@aux@cite{key} or \abx@aux@cite{refsection}{key}
+_BIBLATEX_AUX_CITE_RE = re.compile(r"\\abx@aux@cite((?:\{[^}]*\})+)")
+_REF_TOKEN_RE = re.compile(r"[^\s,;{}()\[\]\\%~\"'`]+")
+
+
+def get_cited_keys(text: str) -> Set[str]:
+    """Extract the keys cited in a LaTeX document or ``.aux`` file.
+
+    This finds the arguments of all the commands containing ``cite`` (e.g.
+    ``\\cite``, ``\\citep``, ``\\autocite``, ``\\parencite``, ``\\cites``
+    and ``\\nocite``), of the ``\\citation`` lines written by BibTeX in
+    ``.aux`` files and of the ``\\abx@aux@cite`` lines written by biblatex.
+    Commented out citations are ignored.
+
+    :param text: contents of the LaTeX or ``.aux`` file.
+    :returns: a set of all the cited keys. Note that this contains ``*`` if
+        all the entries are cited with ``\\nocite{*}``.
+    """
+    text = _TEX_COMMENT_RE.sub("", text)
+
+    keys = set()  # type: Set[str]
+    for m in _CITE_COMMAND_RE.finditer(text):
+        args = _CITE_ARGUMENT_RE.findall(m.group("args"))
+        # NOTE: only the multicite commands take several key arguments
+        if not m.group("command").endswith("s"):
+            args = args[:1]
+
+        for arg in args:
+            keys.update(key.strip() for key in arg.split(","))
+
+    for m in _BIBLATEX_AUX_CITE_RE.finditer(text):
+        keys.add(_CITE_ARGUMENT_RE.findall(m.group(1))[-1].strip())
+
+    keys.discard("")
+    return keys
+
+
+def find_keys_in_text(keys: Iterable[str], text: str) -> Set[str]:
+    """Find which of the *keys* appear as words in *text*.
+
+    This is a fallback for files that do not use the standard citation
+    commands (see :func:`get_cited_keys`). The text is scanned once and each
+    word is looked up in a set of the *keys*.
+
+    :returns: the subset of *keys* that were found.
+    """
+    keys = set(keys)
+    found = set()
+    for m in _REF_TOKEN_RE.finditer(text):
+        token = m.group()
+        for candidate in (token, token.rstrip(".:;!?")):
+            if candidate in keys:
+                found.add(candidate)
+
+    return found
+
+
+def get_cited_keys_from_files(
+        filenames: Iterable[str],
+        keys: Optional[Iterable[str]] = None) -> Set[str]:
+    """Extract the keys cited in all the given files with
+    :func:`get_cited_keys`.
+
+    :param keys: if given, files without any citation commands are searched
+        for these keys with :func:`find_keys_in_text` instead.
+    :returns: a set of all the cited keys.
+    """
+    result = set()  # type: Set[str]
+    for filename in filenames:
+        with open(filename) as fd:
+            text = fd.read()
+
+        cited = get_cited_keys(text)
+        if not cited and keys is not None:
+            logger.debug("No citation commands found in '%s': searching "
+                         "for the keys in the text", filename)
+            cited = find_keys_in_text(keys, text)
+
+        logger.debug("Found %d cited keys in '%s'", len(cited), filename)
+        result |= cited
+
+    return result
+
+
 def unicode_to_latex(text: str) -> str:
     """
     unicode_to_latex - what it says
@@ -380,6 +823,15 @@ def unicode_to_latex(text: str) -> str:
        unicode_to_latex(u) = unicode_to_latex_string(u).encode('ascii').
 
     """
+    return text.translate(_get_unicode_to_latex_table())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_unicode_to_latex_table() -> Dict[int, str]:
+    """
+    :returns: the table used by :func:`unicode_to_latex`, which is only
+        built on first use.
+    """
     # Adapted from
     # https://github.com/pkgw/bibtools/master/bibtools/unicode_to_latex.py
     # Thank you pkgw!
@@ -2819,8 +3271,4 @@ def unicode_to_latex(text: str) -> str:
     #    u"\u2AC6\u0338": r"\nsupseteqq",
     #    u"\u2AFD\u20E5": r"{\rlap{\textbackslash}{{/}\!\!{/}}}",
 
-    unicode_to_latex_table = dict(
-        (ord(k), v)
-        for k, v in unicode_to_latex_table_base.items()
-    )
-    return text.translate(unicode_to_latex_table)
+    return {ord(k): v for k, v in unicode_to_latex_table_base.items()}
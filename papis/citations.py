@@ -1,5 +1,6 @@
 import os
-from typing import Dict, Any, List, Optional, Sequence, Tuple
+from typing import (Dict, Any, Iterable, List, NamedTuple, Optional, Sequence,
+                    Set, Tuple)
 
 import tqdm
 import colorama
@@ -10,7 +11,9 @@ import papis.crossref
 import papis.yaml
 import papis.utils
 import papis.logging
+import papis.document
 from papis.document import Document, to_dict
+from papis.utils import normalize_doi
 
 logger = papis.logging.get_logger(__name__)
 
@@ -48,40 +51,82 @@ def fetch_citations(doc: Document) -> List[Dict[str, Any]]:
                              "in '{}' due to lack of doi "
                              .format(doc))
 
-    dois = [str(d.get("doi")).lower() for d in metadata_citations
-            if "doi" in d]
+    dois = list(dict.fromkeys(str(d.get("doi")).lower()
+                              for d in metadata_citations if "doi" in d))
     logger.info("%d citations found to query", len(dois))
 
-    dois_with_data = [
-    ]  # type: List[Dict[str, Any]]
-    found_in_lib_dois = [
-    ]  # type: List[Dict[str, Any]]
-
     logger.info("Checking which citations are already in the library")
-    dois_with_data = get_citations_from_database(dois)
-
-    for data in dois_with_data:
-        doi = data.get("doi", "").lower()
-        if doi:
-            dois.remove(doi)
+    found = get_documents_by_doi(dois)
+    dois_with_data = [to_dict(found[doi]) for doi in dois if doi in found]
+    dois = [doi for doi in dois if doi not in found]
 
-    logger.info("Found %d DOIs in library", len(found_in_lib_dois))
+    logger.info("Found %d DOIs in library", len(found))
     logger.info("Fetching %d citations from crossref", len(dois))
 
-    with tqdm.tqdm(iterable=dois) as progress:
-        for doi in progress:
-            _data = papis.crossref.get_data(dois=[doi])
-            progress.set_description("{c.Fore.GREEN}{c.Back.BLACK}"
+    with tqdm.tqdm(total=len(dois)) as progress:
+        def update(doi: str, _data: Optional[Dict[str, Any]]) -> None:
+            color = colorama.Fore.GREEN if _data else colorama.Fore.RED
+            progress.set_description("{color}{c.Back.BLACK}"
                                      "{0: <22.22}{c.Style.RESET_ALL}"
-                                     .format(doi, c=colorama))
+                                     .format(doi, c=colorama, color=color))
+            progress.update(1)
+
+        # NOTE: the results are in the order of the DOIs, so that the citations
+        # are always saved in the same order
+        for _, _data in papis.crossref.dois_to_data(dois, callback=update):
             if _data:
-                dois_with_data.extend(_data)
+                dois_with_data.append(_data)
 
     _delete_citations_key(dois_with_data)
 
     return dois_with_data
 
 
+def get_doi_index(
+        documents: Optional[Iterable[Document]] = None) -> Dict[str, Document]:
+    """Build an index of the documents by their normalized DOI (see
+    :func:`papis.utils.normalize_doi`).
+
+    :param documents: the documents to index, defaults to all the documents
+        in the current library.
+    :returns: a dictionary from the normalized DOIs to the documents. If
+        several documents have the same DOI, the first one is kept.
+    """
+    if documents is None:
+        documents = papis.database.get().get_all_documents()
+
+    index = {}  # type: Dict[str, Document]
+    for doc in documents:
+        doi = normalize_doi(doc.get("doi"))
+        if doi and doi not in index:
+            index[doi] = doc
+
+    return index
+
+
+def get_documents_by_doi(
+        dois: Iterable[str],
+        index: Optional[Dict[str, Document]] = None) -> Dict[str, Document]:
+    """Look up several DOIs in the library at once.
+
+    :param dois: a list of DOIs, which are normalized before the lookup.
+    :param index: an index from :func:`get_doi_index`, which is built from
+        the current library if not given.
+    :returns: a dictionary from each DOI in *dois* that is found in the
+        library to its document.
+    """
+    if index is None:
+        index = get_doi_index()
+
+    result = {}  # type: Dict[str, Document]
+    for doi in dois:
+        doc = index.get(normalize_doi(doi) or "")
+        if doc is not None:
+            result[doi] = doc
+
+    return result
+
+
 def get_citations_from_database(
         dois: Sequence[str]) -> List[Dict[str, Any]]:
     """
@@ -89,23 +134,10 @@ def get_citations_from_database(
     and return a sequence of data from the database
     with the information of these documents.
     """
-    db = papis.database.get()
-    dois_with_data = []  # type: List[Dict[str, Any]]
-    with tqdm.tqdm(iterable=dois) as progress:
-        for doi in progress:
-            citation = db.query_dict({"doi": doi})
-            if citation:
-                progress.set_description("{c.Fore.GREEN}{c.Back.BLACK}"
-                                         "{0: <22.22}"
-                                         "{c.Style.RESET_ALL}"
-                                         .format(doi, c=colorama))
-                data = to_dict(citation[0])
-                dois_with_data.append(data)
-            else:
-                progress.set_description("{c.Fore.RED}{c.Back.BLACK}"
-                                         "{0: <22.22}{c.Style.RESET_ALL}"
-                                         .format(doi, c=colorama))
-    return dois_with_data
+    found = get_documents_by_doi(dois)
+    logger.debug("Found %d of %d DOIs in the library", len(found), len(dois))
+
+    return [to_dict(found[doi]) for doi in dois if doi in found]
 
 
 def update_and_save_citations_from_database_from_doc(doc: Document) -> None:
@@ -114,21 +146,24 @@ def update_and_save_citations_from_database_from_doc(doc: Document) -> None:
     save_citations(doc, new_citations)
 
 
-def update_citations_from_database(citations: Citations) -> Citations:
+def update_citations_from_database(
+        citations: Citations,
+        index: Optional[Dict[str, Document]] = None) -> Citations:
+    """Replace the citations that are in the library with the data of the
+    corresponding documents.
+
+    :param index: an index from :func:`get_doi_index`, which is built from
+        the current library if not given.
+    """
+    found = get_documents_by_doi(
+        [str(c["doi"]) for c in citations if c.get("doi")],
+        index=index)
+
     new_citations = []  # type: List[Dict[str, Any]]
-    dois = [str(c.get("doi")).lower() for c in citations
-            if "doi" in c]
-    new_data_list = get_citations_from_database(dois)
-    for data in new_data_list:
-        doi = data.get("doi", "").lower()
-        if doi:
-            dois.remove(doi)
-    new_citations.extend(new_data_list)
     for citation in citations:
-        doi = citation.get("doi")
-        if doi and doi not in dois:
-            continue
-        new_citations.append(citation)
+        doc = found.get(str(citation.get("doi")))
+        new_citations.append(to_dict(doc) if doc is not None else citation)
+
     _delete_citations_key(new_citations)
     return new_citations
 
@@ -138,6 +173,7 @@ def save_citations(doc: Document, citations: Citations) -> None:
     if not file_path:
         return
     papis.yaml.list_to_path(citations, file_path)
+    update_citation_graph(doc, citations)
 
 
 def fetch_and_save_citations(doc: Document) -> None:
@@ -190,38 +226,227 @@ def has_cited_by(doc: Document) -> bool:
 
 
 def save_cited_by(doc: Document, citations: Citations) -> None:
-    file_path = get_citations_file(doc)
+    file_path = get_cited_by_file(doc)
     if not file_path:
         return
     papis.yaml.list_to_path(citations, file_path)
 
 
-def _cites_me_p(doi_doc: Tuple[str, Document]) -> Optional[Citation]:
-    doi, doc = doi_doc
-    if not has_citations(doc):
-        return None
-    citations = get_citations(doc)
-    found = [c for c in citations
-             if c.get("doi", "").lower() == doi]
-    if found:
-        return to_dict(doc)
-    return None
+# =============================================================================
+# CITATION GRAPH
+# =============================================================================
+
+#: Version of the format of the stored citation graph.
+CITATION_GRAPH_VERSION = 1
+#: Minimum number of citation files that are parsed in a process pool.
+CITATION_GRAPH_PARALLEL_THRESHOLD = 256
+
+# NOTE: the graph is stored as {"version": int, "documents": {folder: (key,
+# dois)}}, where key is the stat of the citations file and dois are the
+# normalized DOIs cited by the document in folder
+_GRAPH = {}  # type: Dict[str, Any]
+_GRAPH_PATH = None  # type: Optional[str]
+_CITED_BY = None  # type: Optional[Dict[str, List[str]]]
+
+
+def get_citation_graph_path() -> str:
+    """
+    :returns: the path to the file storing the citation graph of the current
+        library.
+    """
+    import hashlib
+
+    lib = papis.config.get_lib()
+    name = hashlib.md5("{}:{}".format(lib.name, lib.paths).encode()).hexdigest()
+    return os.path.join(papis.utils.get_cache_home(), "citations", name)
+
+
+def clear_citation_graph() -> None:
+    """Remove the stored citation graph of the current library."""
+    global _GRAPH, _GRAPH_PATH, _CITED_BY
+
+    path = get_citation_graph_path()
+    if os.path.exists(path):
+        os.remove(path)
+
+    _GRAPH, _GRAPH_PATH, _CITED_BY = {}, None, None
+
+
+def _get_citations_file_key(file_path: str) -> Tuple[int, ...]:
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return ()
+
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _get_cited_dois(citations: Citations) -> List[str]:
+    return sorted({doi for doi in (normalize_doi(c.get("doi"))
+                                   for c in citations if isinstance(c, dict))
+                   if doi})
+
+
+def _read_cited_dois(file_path: str) -> List[str]:
+    return _get_cited_dois(papis.yaml.yaml_to_list(file_path))
+
+
+def _load_citation_graph() -> Dict[str, Any]:
+    global _GRAPH, _GRAPH_PATH, _CITED_BY
+
+    path = get_citation_graph_path()
+    if path == _GRAPH_PATH:
+        return _GRAPH
+
+    import pickle
+
+    graph = {}  # type: Dict[str, Any]
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as fd:
+                graph = pickle.load(fd)
+        except Exception as exc:
+            logger.debug("Could not load citation graph '%s': %s", path, exc)
+
+    if graph.get("version") != CITATION_GRAPH_VERSION:
+        graph = {"version": CITATION_GRAPH_VERSION, "documents": {}}
+
+    _GRAPH, _GRAPH_PATH, _CITED_BY = graph, path, None
+    return graph
+
+
+def _save_citation_graph(graph: Dict[str, Any]) -> None:
+    import pickle
+
+    path = get_citation_graph_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = "{}.{}".format(path, os.getpid())
+    with open(tmp_path, "wb") as fd:
+        pickle.dump(graph, fd, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def get_citation_graph(
+        documents: Optional[Sequence[Document]] = None
+        ) -> Dict[str, List[str]]:
+    """Get the reverse citation graph of the library.
+
+    The DOIs cited by each document are stored in the cache directory, keyed
+    on the modification time and size of its citations file, so that only
+    new or modified citation files are parsed (in a process pool if there are
+    many of them). The stored graph is also updated by :func:`save_citations`,
+    so it only needs to be checked against the library once per process (see
+    :func:`fetch_cited_by_from_database`).
+
+    :param documents: all the documents in the library, which are retrieved
+        from the database if not given.
+    :returns: a dictionary from the normalized DOI of each cited document to
+        the folders of the documents citing it.
+    """
+    global _CITED_BY
+
+    if documents is None:
+        documents = papis.database.get().get_all_documents()
+
+    graph = _load_citation_graph()
+    entries = graph["documents"]  # type: Dict[str, Tuple[Tuple[int, ...], List[str]]]
+
+    folders = set()  # type: Set[str]
+    todo = []  # type: List[Tuple[str, str, Tuple[int, ...]]]
+    for doc in documents:
+        folder = doc.get_main_folder()
+        file_path = get_citations_file(doc)
+        if not folder or not file_path:
+            continue
+
+        folders.add(folder)
+        key = _get_citations_file_key(file_path)
+        entry = entries.get(folder)
+        if entry is None or entry[0] != key:
+            todo.append((folder, file_path, key))
+
+    removed = set(entries) - folders
+    for folder in removed:
+        del entries[folder]
+
+    logger.debug("Updating the citation graph from %d files (%d up to date)",
+                 len(todo), len(folders) - len(todo))
+
+    file_paths = [file_path for _, file_path, key in todo if key]
+    if len(file_paths) >= CITATION_GRAPH_PARALLEL_THRESHOLD:
+        cited = papis.utils.parmap(_read_cited_dois, file_paths)
+    else:
+        cited = [_read_cited_dois(file_path) for file_path in file_paths]
+
+    cited_by_path = dict(zip(file_paths, cited))
+    for folder, file_path, key in todo:
+        entries[folder] = (key, cited_by_path.get(file_path, []))
+
+    if todo or removed:
+        _save_citation_graph(graph)
+        _CITED_BY = None
+
+    if _CITED_BY is None:
+        cited_by = {}  # type: Dict[str, List[str]]
+        for folder, (_, dois) in entries.items():
+            for doi in dois:
+                cited_by.setdefault(doi, []).append(folder)
+
+        _CITED_BY = cited_by
+
+    return _CITED_BY
+
+
+def update_citation_graph(doc: Document, citations: Citations) -> None:
+    """Update the stored citation graph with the *citations* of *doc*.
+
+    This is a no-op if the graph has not been built yet, since it will be
+    built from all the citation files when it is first needed.
+    """
+    folder = doc.get_main_folder()
+    file_path = get_citations_file(doc)
+    if not folder or not file_path:
+        return
+
+    if not os.path.exists(get_citation_graph_path()):
+        return
+
+    graph = _load_citation_graph()
+    entry = graph["documents"].get(folder)
+    dois = _get_cited_dois(citations)
+    graph["documents"][folder] = (_get_citations_file_key(file_path), dois)
+    _save_citation_graph(graph)
+
+    if _CITED_BY is not None:
+        for doi in (entry[1] if entry is not None else []):
+            folders = _CITED_BY.get(doi, [])
+            if folder in folders:
+                folders.remove(folder)
+
+        for doi in dois:
+            _CITED_BY.setdefault(doi, []).append(folder)
 
 
 def fetch_cited_by_from_database(cit: Citation) -> Citations:
-    doi = str(cit.get("doi", "")).lower()
+    """Find the documents in the library that cite *cit*.
+
+    The citation graph is built (see :func:`get_citation_graph`) on the first
+    call and later calls are answered from the graph alone. Citation files
+    that are modified outside of papis in the meantime are only picked up
+    when the graph is built again, e.g. in a new process.
+    """
+    doi = normalize_doi(cit.get("doi"))
     if not doi:
         return []
 
-    result = []  # type: List[Citation]
-    db = papis.database.get()
-    documents = db.get_all_documents()
+    if _CITED_BY is not None and _GRAPH_PATH == get_citation_graph_path():
+        cited_by = _CITED_BY
+    else:
+        cited_by = get_citation_graph()
 
-    # NOTE: using parmap makes it around 2.5x faster with an ssd
-    # in a 2k documents library
-    result = [d for d in papis.utils.parmap(_cites_me_p,
-                                            [(doi, x) for x in documents])
-              if d is not None]
+    result = [to_dict(papis.document.from_folder(folder))
+              for folder in cited_by.get(doi, [])
+              if os.path.isdir(folder)]
 
     _delete_citations_key(result)
     return result
@@ -229,9 +454,88 @@ def fetch_cited_by_from_database(cit: Citation) -> Citations:
 
 def fetch_and_save_cited_by_from_database(doc: Document) -> None:
     citations = fetch_cited_by_from_database(doc)
-    file_path = get_cited_by_file(doc)
-    if citations and file_path:
-        papis.yaml.list_to_path(citations, file_path)
+    if citations:
+        save_cited_by(doc, citations)
+
+
+CitationsUpdate = NamedTuple("CitationsUpdate", [
+    ("documents", int),
+    ("citations", int),
+    ("cited_by", int),
+    ])
+
+
+def _read_citation_files(file_paths: List[str]) -> List[Citations]:
+    if len(file_paths) >= CITATION_GRAPH_PARALLEL_THRESHOLD:
+        return papis.utils.parmap(papis.yaml.yaml_to_list, file_paths)
+    else:
+        return [papis.yaml.yaml_to_list(file_path) for file_path in file_paths]
+
+
+def update_library_citations(
+        documents: Sequence[Document],
+        cited_by: bool = False,
+        force: bool = False) -> CitationsUpdate:
+    """Update the citations of many documents from the library at once.
+
+    All the citation files are read once (in a process pool if there are
+    many of them) and all the cited DOIs are resolved against a single DOI
+    index of the library (see :func:`get_doi_index`). Only the files whose
+    contents change are written.
+
+    :param documents: the documents to update, usually the whole library.
+    :param cited_by: if *True*, the cited-by files of the *documents* are
+        also updated from the citation graph (see :func:`get_citation_graph`).
+    :param force: if *False*, existing cited-by files are not updated.
+    :returns: the number of documents, citation files and cited-by files
+        that were written.
+    """
+    all_documents = papis.database.get().get_all_documents()
+    index = get_doi_index(all_documents)
+
+    docs = [doc for doc in documents if has_citations(doc)]
+    file_paths = [str(get_citations_file(doc)) for doc in docs]
+    logger.info("Updating citations of %d documents from %d in the library",
+                len(docs), len(all_documents))
+
+    ncitations = 0
+    for doc, file_path, citations in zip(
+            docs, file_paths, _read_citation_files(file_paths)):
+        new_citations = update_citations_from_database(citations, index=index)
+        if new_citations != citations:
+            papis.yaml.list_to_path(new_citations, file_path)
+            ncitations += 1
+
+    ncited_by = 0
+    if cited_by:
+        graph = get_citation_graph(all_documents)
+        folder_to_doc = {doc.get_main_folder(): doc for doc in all_documents}
+
+        docs = [doc for doc in documents
+                if doc.get("doi") and (force or not has_cited_by(doc))]
+        file_paths = [str(get_cited_by_file(doc)) for doc in docs]
+        existing = [file_path for file_path in file_paths
+                    if os.path.exists(file_path)]
+        old_cited_by = dict(zip(existing, _read_citation_files(existing)))
+
+        for doc, file_path in zip(docs, file_paths):
+            folders = graph.get(normalize_doi(doc.get("doi")) or "", [])
+            new_cited_by = [to_dict(folder_to_doc[folder])
+                            for folder in folders if folder in folder_to_doc]
+            _delete_citations_key(new_cited_by)
+
+            # NOTE: an existing cited-by file is emptied if the documents
+            # citing this one were removed from the library
+            if file_path not in old_cited_by and not new_cited_by:
+                continue
+
+            if new_cited_by != old_cited_by.get(file_path):
+                papis.yaml.list_to_path(new_cited_by, file_path)
+                ncited_by += 1
+
+    return CitationsUpdate(documents=len(documents),
+                           citations=ncitations,
+                           cited_by=ncited_by)
 
 
 def get_cited_by(doc: Document) -> Citations:
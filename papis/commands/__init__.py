@@ -1,7 +1,6 @@
 import os
 import re
-import glob
-from typing import Dict, Optional, Union, NamedTuple
+from typing import Dict, List, Optional, Union, NamedTuple
 import difflib
 
 import click.core
@@ -48,14 +47,13 @@ def get_external_scripts() -> Dict[str, Script]:
     scripts = {}
     paths.append(papis.config.get_scripts_folder())
     paths += os.environ["PATH"].split(":")
-    for path in paths:
-        for script in glob.glob(os.path.join(path, "papis-*")):
-            m = regex.match(script)
-            if m is not None:
-                name = m.group(1)
-                scripts[name] = Script(command_name=name,
-                                       path=script,
-                                       plugin=None)
+    for script in papis.plugin.get_executables(paths, "papis-*"):
+        m = regex.match(script)
+        if m is not None:
+            name = m.group(1)
+            scripts[name] = Script(command_name=name,
+                                   path=script,
+                                   plugin=None)
     return scripts
 
 
@@ -64,14 +62,30 @@ def _extension_name() -> str:
 
 
 def get_scripts() -> Dict[str, Script]:
-    commands_mgr = papis.plugin.get_extension_manager(_extension_name())
+    """Get all the commands declared as plugins.
+
+    The commands are not loaded, i.e. the ``plugin`` of the scripts is
+    *None*, and can be loaded with :func:`get_command`.
+    """
+    return {
+        name: Script(command_name=name, path=None, plugin=None)
+        for name in get_command_names()
+        }
+
+
+def get_command_names() -> List[str]:
+    """Get the names of all the commands declared as plugins.
+
+    This does not load any of the commands.
+    """
+    return papis.plugin.get_available_entrypoints(_extension_name())
 
-    scripts_dict = {}
-    for command_name in commands_mgr.names():
-        scripts_dict[command_name] = Script(
-            command_name=command_name,
-            path=None,
-            plugin=commands_mgr[command_name].plugin
-        )
 
-    return scripts_dict
+def get_command(name: str) -> Union[click.core.Command, AliasedGroup]:
+    """Load the command *name* declared as a plugin.
+
+    :raises KeyError: if no command *name* is declared.
+    """
+    cmd = papis.plugin.get_plugin(
+        _extension_name(), name)  # type: Union[click.core.Command, AliasedGroup]
+    return cmd
@@ -78,6 +78,19 @@ Examples
   pass the ``--fetch-citations`` flag in order to create a
   ``citations.yaml`` file.
 
+- Many documents can be added at once from a file with one path, DOI or URL
+  per line (or ``-`` to read them from the standard input)
+
+    .. code::
+
+        papis add --from-list dois.txt
+        cat dois.txt | papis add --from-list -
+
+  The metadata and files are fetched concurrently and the documents are
+  added without asking for any confirmation. If the command is interrupted,
+  running it again with the same list skips the documents that were already
+  added. Documents with the same DOI as an existing document are skipped.
+
 Examples in python
 ^^^^^^^^^^^^^^^^^^
 
@@ -86,6 +99,8 @@ in a more effective way in python scripts,
 
 .. autofunction:: papis.commands.add.run
 
+.. autofunction:: papis.commands.add.run_from_list
+
 Command-line Interface
 ^^^^^^^^^^^^^^^^^^^^^^
 
@@ -95,7 +110,8 @@ Command-line Interface
 
 import os
 import re
-from typing import List, Any, Optional, Dict, Tuple
+from typing import (List, Any, Optional, Dict, NamedTuple, Sequence, Set, Tuple,
+                    TYPE_CHECKING)
 
 import click
 
@@ -116,6 +132,9 @@ import papis.citations
 import papis.id
 import papis.logging
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
 logger = papis.logging.get_logger(__name__)
 
 
@@ -244,58 +263,23 @@ def get_hash_folder(data: Dict[str, Any], document_paths: List[str]) -> str:
     return result
 
 
-def run(paths: List[str],
-        data: Optional[Dict[str, Any]] = None,
+def get_document_folder(
+        data: Dict[str, Any],
+        paths: List[str],
         folder_name: Optional[str] = None,
-        file_name: Optional[str] = None,
         subfolder: Optional[str] = None,
-        base_path: Optional[str] = None,
-        confirm: bool = False,
-        open_file: bool = False,
-        edit: bool = False,
-        git: bool = False,
-        link: bool = False,
-        citations: papis.citations.Citations = ()) -> None:
-    """
+        base_path: Optional[str] = None) -> str:
+    """Folder in the library where a new document will be stored.
+
+    :param data: Data parsed for the actual document
     :param paths: Paths to the documents to be added
-    :param data: Data for the document to be added.
-        If more data is to be retrieved from other sources, the data dictionary
-        will be updated from these sources.
-    :param folder_name: Name of the folder where the document will be stored
-    :param file_name: File name of the document's files to be stored.
+    :param folder_name: Name of the folder (papis format). If not given, the
+        name is obtained from :func:`get_hash_folder`.
     :param subfolder: Folder within the library where the document's folder
         should be stored.
-    :param confirm: Whether or not to ask user for confirmation before adding.
-    :param open_file: Whether or not to ask the user for opening the file
-        before adding.
-    :param edit: Whether or not to ask user for editing the info file
-        before adding.
-    :param git: Whether or not to ask user for committing before adding,
-        in the case of course that the library is a git repository.
+    :param base_path: Path to the library, defaults to its first directory.
+    :returns: Full path to the folder
     """
-    if data is None:
-        data = {}
-
-    import tempfile
-
-    # The real paths of the documents to be added
-    in_documents_paths = paths
-    # The basenames of the documents to be added
-    in_documents_names = []
-    # The folder name of the temporary document to be created
-    temp_dir = tempfile.mkdtemp()
-
-    for p in in_documents_paths:
-        if not os.path.exists(p):
-            raise IOError("Document {} not found".format(p))
-
-    in_documents_names = [
-        papis.utils.clean_document_name(doc_path)
-        for doc_path in in_documents_paths
-    ]
-
-    tmp_document = papis.document.Document(temp_dir)
-
     if base_path is None:
         base_path = os.path.expanduser(papis.config.get_lib_dirs()[0])
     out_folder_path = base_path
@@ -304,7 +288,7 @@ def run(paths: List[str],
         out_folder_path = os.path.join(out_folder_path, subfolder)
 
     if not folder_name:
-        out_folder_name = get_hash_folder(data, in_documents_paths)
+        out_folder_name = get_hash_folder(data, paths)
         out_folder_path = os.path.join(out_folder_path, out_folder_name)
         logger.info("Got an automatic folder name")
     else:
@@ -336,20 +320,28 @@ def run(paths: List[str],
     if not papis.utils.is_relative_to(out_folder_path, base_path):
         raise ValueError("formatting produced path outside of library")
 
-    data["files"] = in_documents_names
+    return out_folder_path
 
-    logger.info("Folder path: '%s'", out_folder_path)
-    logger.debug("File(s): %s", in_documents_paths)
 
-    # First prepare everything in the temporary directory
+def copy_files(paths: List[str],
+               data: Dict[str, Any],
+               folder: str,
+               link: bool = False) -> List[str]:
+    """Copy (or link) the files of a new document into its folder, renamed
+    according to :func:`get_file_name`.
+
+    :param paths: Paths to the documents to be added
+    :param data: Data parsed for the actual document
+    :param folder: Folder of the new document
+    :param link: If *True*, create links to the files instead of copying them
+    :returns: The names of the files in *folder*
+    """
     from string import ascii_lowercase
     g = papis.utils.create_identifier(ascii_lowercase)
     string_append = ""
-    if file_name is not None:  # Use args if set
-        papis.config.set("add-file-name", file_name)
     new_file_list = []
 
-    for in_file_path in in_documents_paths:
+    for in_file_path in paths:
 
         # Rename the file in the staging area
         new_filename = papis.utils.clean_document_name(
@@ -360,7 +352,7 @@ def run(paths: List[str],
         new_file_list.append(new_filename)
 
         tmp_end_filepath = os.path.join(
-            temp_dir,
+            folder,
             new_filename)
         string_append = next(g)
 
@@ -376,6 +368,73 @@ def run(paths: List[str],
             import shutil
             shutil.copy(in_file_path, tmp_end_filepath)
 
+    return new_file_list
+
+
+def run(paths: List[str],
+        data: Optional[Dict[str, Any]] = None,
+        folder_name: Optional[str] = None,
+        file_name: Optional[str] = None,
+        subfolder: Optional[str] = None,
+        base_path: Optional[str] = None,
+        confirm: bool = False,
+        open_file: bool = False,
+        edit: bool = False,
+        git: bool = False,
+        link: bool = False,
+        citations: papis.citations.Citations = ()) -> None:
+    """
+    :param paths: Paths to the documents to be added
+    :param data: Data for the document to be added.
+        If more data is to be retrieved from other sources, the data dictionary
+        will be updated from these sources.
+    :param folder_name: Name of the folder where the document will be stored
+    :param file_name: File name of the document's files to be stored.
+    :param subfolder: Folder within the library where the document's folder
+        should be stored.
+    :param confirm: Whether or not to ask user for confirmation before adding.
+    :param open_file: Whether or not to ask the user for opening the file
+        before adding.
+    :param edit: Whether or not to ask user for editing the info file
+        before adding.
+    :param git: Whether or not to ask user for committing before adding,
+        in the case of course that the library is a git repository.
+    """
+    if data is None:
+        data = {}
+
+    import tempfile
+
+    # The real paths of the documents to be added
+    in_documents_paths = paths
+    # The basenames of the documents to be added
+    in_documents_names = []
+    # The folder name of the temporary document to be created
+    temp_dir = tempfile.mkdtemp()
+
+    for p in in_documents_paths:
+        if not os.path.exists(p):
+            raise IOError("Document {} not found".format(p))
+
+    in_documents_names = [
+        papis.utils.clean_document_name(doc_path)
+        for doc_path in in_documents_paths
+    ]
+
+    tmp_document = papis.document.Document(temp_dir)
+
+    out_folder_path = get_document_folder(
+        data, in_documents_paths,
+        folder_name=folder_name, subfolder=subfolder, base_path=base_path)
+    data["files"] = in_documents_names
+
+    logger.info("Folder path: '%s'", out_folder_path)
+    logger.debug("File(s): %s", in_documents_paths)
+
+    # First prepare everything in the temporary directory
+    if file_name is not None:  # Use args if set
+        papis.config.set("add-file-name", file_name)
+    new_file_list = copy_files(in_documents_paths, data, temp_dir, link=link)
     data["files"] = new_file_list
 
     # reference building
@@ -436,6 +495,301 @@ def run(paths: List[str],
             "Add document '{0}'".format(papis.document.describe(tmp_document)))
 
 
+#: Version of the format of the state files of ``papis add --from-list``.
+ADD_LIST_STATE_VERSION = 1
+
+ListSummary = NamedTuple("ListSummary", [
+    ("added", int),
+    ("skipped", int),
+    ("duplicates", int),
+    ("failed", int),
+    ("elapsed", float),
+    ])
+
+
+def read_list(filename: str) -> List[str]:
+    """Read the items of ``papis add --from-list``.
+
+    :param filename: a file with one item (a path, DOI, URL, etc.) per line
+        or ``-`` to read them from the standard input. Empty lines and lines
+        starting with ``#`` are ignored.
+    """
+    if filename == "-":
+        import sys
+        lines = sys.stdin.readlines()
+    else:
+        with open(filename) as fd:
+            lines = fd.readlines()
+
+    items = [line.strip() for line in lines]
+    return [item for item in items if item and not item.startswith("#")]
+
+
+def get_list_state_path(items: Sequence[str]) -> str:
+    """
+    :returns: the file used to resume adding *items* to the current library
+        after an interruption.
+    """
+    import hashlib
+
+    h = hashlib.md5(papis.config.get_lib_name().encode())
+    for item in items:
+        h.update(b"\n" + item.encode())
+
+    return os.path.join(papis.utils.get_cache_home(), "add", h.hexdigest())
+
+
+def _load_list_state(path: str) -> Tuple[Dict[str, str], List[str]]:
+    import json
+
+    # NOTE: the state is a log of JSON records, one for each processed item,
+    # and a "commit" record every time the added folders are in the database
+    status = {}     # type: Dict[str, str]
+    pending = []    # type: List[str]
+    try:
+        with open(path) as fd:
+            records = [json.loads(line) for line in fd if line.strip()]
+    except FileNotFoundError:
+        return status, pending
+    except ValueError as exc:
+        logger.warning("Ignoring corrupted state file '%s': %s", path, exc)
+        return status, pending
+
+    for record in records:
+        if record.get("version") != ADD_LIST_STATE_VERSION:
+            continue
+
+        if record["status"] == "commit":
+            pending = []
+            continue
+
+        status[record["item"]] = record["status"]
+        if record["status"] == "added":
+            pending.append(record["folder"])
+
+    return status, pending
+
+
+def _fetch_item(item: str) -> papis.importer.Context:
+    ctx = papis.importer.Context()
+    if os.path.exists(item):
+        ctx.files = [item]
+
+    importers = papis.utils.get_matching_importer_or_downloader(item)
+
+    # NOTE: importers are sorted by decreasing priority, so the data from the
+    # most relevant ones is merged last
+    for importer in reversed(importers):
+        ctx.data.update(importer.ctx.data)
+
+    if not ctx.files:
+        for importer in importers:
+            if importer.ctx.files:
+                ctx.files = list(importer.ctx.files)
+                break
+
+    return ctx
+
+
+def _get_unique_folder(path: str, reserved: Set[str]) -> str:
+    from string import ascii_lowercase
+    g = papis.utils.create_identifier(ascii_lowercase)
+
+    result = path
+    while os.path.exists(result) or result in reserved:
+        result = "{}-{}".format(path, next(g))
+
+    return result
+
+
+def run_from_list(items: Sequence[str],
+                  data: Optional[Dict[str, Any]] = None,
+                  folder_name: Optional[str] = None,
+                  file_name: Optional[str] = None,
+                  subfolder: Optional[str] = None,
+                  base_path: Optional[str] = None,
+                  link: bool = False,
+                  max_workers: Optional[int] = None) -> ListSummary:
+    """Add many documents to the library without any user interaction.
+
+    This works as a pipeline where
+
+    1. the metadata and files for all the *items* are fetched concurrently
+       with the automatically matched importers and downloaders (see
+       :func:`papis.utils.get_matching_importer_or_downloader`),
+    2. each document is created in its folder in the library as soon as its
+       data is available, skipping documents with the same DOI as an
+       existing one,
+    3. all the new documents are added to the database at once.
+
+    The progress is recorded in a state file (see :func:`get_list_state_path`),
+    so that running the same list again after an interruption only processes
+    the remaining items and the items that failed. The documents added before
+    an interruption are also added to the database. The state file is removed
+    once all the items are added successfully.
+
+    :param items: paths, DOIs, URLs, etc. of the documents to be added.
+    :param data: additional data for all the documents.
+    :param max_workers: number of items that are fetched concurrently,
+        defaults to :ref:`add-list-max-workers
+        <config-settings-add-list-max-workers>`.
+    :returns: the number of added, skipped (from a previous run), duplicate
+        and failed items.
+    """
+    import json
+    import time
+    import tempfile
+    import itertools
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from tqdm import tqdm
+    from papis.utils import normalize_doi
+
+    if max_workers is None:
+        max_workers = papis.config.getint("add-list-max-workers") or 1
+
+    if file_name is not None:  # Use args if set
+        papis.config.set("add-file-name", file_name)
+
+    db = papis.database.get()
+    state_path = get_list_state_path(items)
+    status, pending = _load_list_state(state_path)
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+    todo = []   # type: List[str]
+    seen = set()    # type: Set[str]
+    for item in items:
+        if status.get(item) in ("added", "duplicate") or item in seen:
+            continue
+        seen.add(item)
+        todo.append(item)
+
+    skipped = len(items) - len(todo)
+    if skipped:
+        logger.info("Skipping %d items added in a previous run", skipped)
+
+    documents = db.get_all_documents()
+    dois = set(papis.citations.get_doi_index(documents))
+    known_folders = set(doc.get_main_folder() for doc in documents)
+    folders = set()     # type: Set[str]
+    counts = {"added": 0, "duplicate": 0, "failed": 0}
+
+    def add_item(item: str, ctx: papis.importer.Context) -> Tuple[str, str]:
+        if not ctx:
+            raise ValueError("no data or files found")
+
+        doc_data = dict(ctx.data)
+        doc_data.update(data or {})
+        if papis.config.getboolean("time-stamp"):
+            doc_data["time-added"] = time.strftime(papis.strings.time_format)
+
+        doi = normalize_doi(doc_data.get("doi"))
+        if doi is not None and doi in dois:
+            logger.info("Skipping '%s': a document with DOI '%s' already "
+                        "exists", item, doi)
+            return "duplicate", ""
+
+        for path in ctx.files:
+            if not os.path.exists(path):
+                raise IOError("Document {} not found".format(path))
+
+        out_folder_path = _get_unique_folder(
+            get_document_folder(doc_data, ctx.files,
+                                folder_name=folder_name,
+                                subfolder=subfolder,
+                                base_path=base_path),
+            folders)
+
+        temp_dir = tempfile.mkdtemp()
+        doc_data["files"] = copy_files(ctx.files, doc_data, temp_dir, link=link)
+        if "ref" not in doc_data:
+            doc_data["ref"] = papis.bibtex.create_reference(doc_data)
+
+        doc = papis.document.Document(temp_dir)
+        doc.update(doc_data)
+        doc.save()
+
+        os.makedirs(os.path.dirname(out_folder_path), exist_ok=True)
+        papis.document.move(doc, out_folder_path)
+
+        if doi is not None:
+            dois.add(doi)
+        folders.add(out_folder_path)
+
+        return "added", out_folder_path
+
+    t_start = time.time()
+    with open(state_path, "a") as state:
+        def log(record: Dict[str, Any]) -> None:
+            record["version"] = ADD_LIST_STATE_VERSION
+            state.write("{}\n".format(json.dumps(record)))
+            state.flush()
+
+        def commit() -> None:
+            # NOTE: the database is updated only once for the whole list and
+            # the documents committed by an interrupted run are not re-added
+            documents = [papis.document.from_folder(folder)
+                         for folder in pending
+                         if folder not in known_folders
+                         and os.path.exists(folder)]
+            db.add_many(documents)
+            log({"status": "commit"})
+
+        # NOTE: only a few items are fetched ahead of the ones being added,
+        # so that an interruption does not wait for all the remaining items
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        remaining = iter(todo)
+        futures = {}    # type: Dict[Future[papis.importer.Context], str]
+
+        def submit(n: int) -> None:
+            for item in itertools.islice(remaining, n):
+                futures[executor.submit(_fetch_item, item)] = item
+
+        progress = tqdm(total=len(todo), desc="Adding documents",
+                        disable=not todo)
+        try:
+            submit(2 * max_workers)
+            while futures:
+                done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = futures.pop(future)
+                    try:
+                        result, folder = add_item(item, future.result())
+                    except Exception as exc:
+                        logger.error("Could not add '%s': %s", item, exc)
+                        result, folder = "failed", ""
+
+                    counts[result] += 1
+                    if result == "added":
+                        pending.append(folder)
+
+                    log({"item": item, "status": result, "folder": folder})
+                    progress.update(1)
+
+                submit(len(done))
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            commit()
+            raise
+        finally:
+            progress.close()
+            executor.shutdown(wait=False)
+
+        commit()
+
+    summary = ListSummary(
+        added=counts["added"],
+        skipped=skipped,
+        duplicates=counts["duplicate"],
+        failed=counts["failed"],
+        elapsed=time.time() - t_start)
+
+    if not summary.failed:
+        os.remove(state_path)
+
+    return summary
+
+
 @click.command(
     "add",
     help="Add a document into a given library"
@@ -509,6 +863,12 @@ def run(paths: List[str],
               help="Fetch citations from doi",
               default=lambda: papis.config.getboolean("add-fetch-citations"),
               is_flag=True)
+@click.option(
+    "--from-list", "from_list",
+    help="Add all the documents in a file (or '-' for stdin) with one "
+         "path, DOI, URL, etc. per line",
+    type=str,
+    default=None)
 def cli(files: List[str],
         set_list: List[Tuple[str, str]],
         subfolder: str,
@@ -524,7 +884,8 @@ def cli(files: List[str],
         link: bool,
         list_importers: bool,
         force_download: bool,
-        fetch_citations: bool) -> None:
+        fetch_citations: bool,
+        from_list: Optional[str]) -> None:
     """
     Command line interface for papis-add.
     """
@@ -541,6 +902,38 @@ def cli(files: List[str],
     for data_set in set_list:
         data[data_set[0]] = data_set[1]
 
+    if from_list is not None:
+        # NOTE: the options are only rejected when they are given explicitly,
+        # not when they are enabled in the configuration
+        flags = (
+            ("--git", git, "use-git"),
+            ("--fetch-citations", fetch_citations, "add-fetch-citations"),
+            ("--open", open_file, "add-open"),
+            ("--edit", edit, "add-edit"),
+            )
+        for flag, value, key in flags:
+            if value and not papis.config.getboolean(key):
+                raise click.UsageError(
+                    "'{}' cannot be used with '--from-list'".format(flag))
+
+        items = read_list(from_list) + list(files)
+        summary = run_from_list(
+            items,
+            data=data,
+            folder_name=folder_name,
+            file_name=file_name,
+            subfolder=subfolder,
+            link=link)
+
+        nitems = summary.added + summary.duplicates + summary.failed
+        logger.info(
+            "Added %d documents in %.2fs (%.2f items/s): %d duplicates, "
+            "%d failed, %d skipped from a previous run",
+            summary.added, summary.elapsed,
+            nitems / summary.elapsed if summary.elapsed > 0 else 0.0,
+            summary.duplicates, summary.failed, summary.skipped)
+        return
+
     ctx = papis.importer.Context()
     ctx.files = [f for f in files if os.path.exists(f)]
     ctx.data.update(data)
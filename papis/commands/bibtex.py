@@ -74,6 +74,8 @@ which references are not cited in the tex files by doing
     papis bibtex iscited -f main.tex -f chapter-2.tex
 
 and you can then filter them out using the command ``filter-cited``.
+The citation keys are taken from the ``\cite``-like commands in the files,
+which can also be the ``.aux`` files generated by LaTeX.
 
 To monitor the health of the bib project's file, I mostly have a
 target in the project's ``Makefile`` like
@@ -87,6 +89,18 @@ target in the project's ``Makefile`` like
 it does not solve all problems under the sun, but it is really better than no
 check!
 
+Alternatively, the bib file of a project can be generated from the documents
+in your library that are cited in the LaTeX ``.aux`` files with
+
+::
+
+    papis bibtex sync -o refs.bib main.aux
+
+The cited documents are found in the library by their ``ref`` key. Since
+``refs.bib`` is only rewritten when the cited documents changed, this can be
+run after every LaTeX compilation, e.g. from ``latexmk``, without triggering
+needless BibTeX runs.
+
 
 
 Vim integration
@@ -125,7 +139,7 @@ Command-line Interface
 import os
 import re
 
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 import click
 import tqdm
 
@@ -145,6 +159,7 @@ import papis.commands.browse
 import papis.commands.export
 from papis.commands.update import _update_with_database
 import papis.bibtex
+import papis.document
 import papis.logging
 
 logger = papis.logging.get_logger(__name__)
@@ -412,37 +427,71 @@ def _sort(ctx: click.Context, key: Optional[str], reverse: bool) -> None:
                                        reverse=reverse))
 
 
+_DOI_PREFIX_RE = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:)\s*", re.IGNORECASE)
+
+
+def _normalize_value(key: str, value: Any) -> Optional[str]:
+    """Normalize *value* for comparison by collapsing whitespace, removing
+    BibTeX braces and case folding. DOIs are also stripped of any URL or
+    ``doi:`` prefix.
+    """
+    if value is None:
+        return None
+
+    result = " ".join(str(value).replace("{", "").replace("}", "").split())
+    result = result.casefold()
+
+    if key == "doi":
+        import doi
+        result = _DOI_PREFIX_RE.sub("", doi.get_clean_doi(result))
+
+    return result
+
+
 @cli.command("unique")
 @click.help_option("-h", "--help")
 @click.option("-k", "--key",
-              help="Field to test for uniqueness, default is ref",
-              default="ref",
+              help="Field to test for uniqueness, default is ref "
+                   "(can be given multiple times to combine fields)",
+              multiple=True,
+              default=("ref",),
               type=str)
+@click.option("-n", "--normalize",
+              help="Compare normalized values, i.e. case folded, with "
+                   "collapsed whitespace and cleaned DOIs",
+              default=False,
+              is_flag=True)
 @click.option("-o",
               help="Output the discarded documents to a file",
               default=None,
               type=str)
 @click.pass_context
-def _unique(ctx: click.Context, key: str, o: Optional[str]) -> None:
+def _unique(ctx: click.Context,
+            key: List[str],
+            normalize: bool,
+            o: Optional[str]) -> None:
     """Remove repetitions"""
     docs = ctx.obj["documents"]
     unique_docs = []
     duplis_docs = []
+    seen = {}  # type: Dict[Tuple[Optional[str], ...], papis.document.Document]
 
-    while True:
-        if len(docs) == 0:
-            break
-        doc = docs.pop(0)
-        unique_docs.append(doc)
-        indices = []
-        for i, bottle in enumerate(docs):
-            if doc.get(key) == bottle.get(key):
-                indices.append(i)
-                duplis_docs.append(bottle)
-                logger.info(
-                    "%d repeated %s -> %s",
-                    len(duplis_docs), key, doc.get(key))
-        docs = [d for (i, d) in enumerate(docs) if i not in indices]
+    for doc in docs:
+        if normalize:
+            value = tuple(_normalize_value(k, doc.get(k)) for k in key)
+        else:
+            value = tuple(
+                None if doc.get(k) is None else str(doc[k]) for k in key)
+
+        if value in seen:
+            duplis_docs.append(doc)
+            logger.info(
+                "%d repeated %s -> %s",
+                len(duplis_docs), ", ".join(key),
+                ", ".join(str(seen[value].get(k)) for k in key))
+        else:
+            seen[value] = doc
+            unique_docs.append(doc)
 
     logger.info("Unique   : %d", len(unique_docs))
     logger.info("Discarded: %d", len(duplis_docs))
@@ -481,6 +530,18 @@ def _doctor(ctx: click.Context, key: List[str]) -> None:
             logger.info("\tmissing: %s", k)
 
 
+def _get_cited_refs(files: List[str],
+                    docs: List[papis.document.Document]) -> Set[str]:
+    refs = [str(doc["ref"]) for doc in docs if doc.get("ref")]
+    cited = papis.bibtex.get_cited_keys_from_files(files, keys=refs)
+
+    # NOTE: '\nocite{*}' includes all the entries in the bibliography
+    if "*" in cited:
+        cited.update(refs)
+
+    return cited
+
+
 @cli.command("filter-cited")
 @click.help_option("-h", "--help")
 @click.option("-f", "--file", "_files",
@@ -493,14 +554,10 @@ def _filter_cited(ctx: click.Context, _files: List[str]) -> None:
     e.g.
         papis bibtex read main.bib filter-cited -f main.tex save cited.bib
     """
-    found = []
-
-    for f in _files:
-        with open(f) as fd:
-            text = fd.read()
-            for doc in ctx.obj["documents"]:
-                if re.search(doc["ref"], text):
-                    found.append(doc)
+    docs = ctx.obj["documents"]
+    cited = _get_cited_refs(_files, docs)
+    found = [doc for doc in docs
+             if doc.get("ref") and str(doc["ref"]) in cited]
 
     logger.info("%s documents cited", len(found))
     ctx.obj["documents"] = found
@@ -517,14 +574,10 @@ def _iscited(ctx: click.Context, _files: List[str]) -> None:
     Check which documents are not cited
     e.g. papis bibtex iscited -f main.tex -f chapter-2.tex
     """
-    unfound = []
-
-    for f in _files:
-        with open(f) as fd:
-            text = fd.read()
-            for doc in ctx.obj["documents"]:
-                if not re.search(doc["ref"], text):
-                    unfound.append(doc)
+    docs = ctx.obj["documents"]
+    cited = _get_cited_refs(_files, docs)
+    unfound = [doc for doc in docs
+               if not doc.get("ref") or str(doc["ref"]) not in cited]
 
     logger.info("%s documents not cited", len(unfound))
 
@@ -533,6 +586,128 @@ def _iscited(ctx: click.Context, _files: List[str]) -> None:
                     j, papis.document.describe(doc))
 
 
+_AUX_INPUT_RE = re.compile(r"\\@input\{([^}]*)\}")
+SYNC_STATE_VERSION = 1
+
+
+def _get_aux_files(auxfile: str) -> List[str]:
+    """
+    :returns: a list of *auxfile* and all the ``.aux`` files included from it
+        with ``\\@input`` (e.g. for each ``\\include``-ed chapter).
+    """
+    result = []  # type: List[str]
+    todo = [auxfile]
+    while todo:
+        filename = todo.pop(0)
+        if filename in result or not os.path.exists(filename):
+            continue
+
+        result.append(filename)
+        with open(filename) as fd:
+            text = fd.read()
+
+        todo.extend(
+            os.path.join(os.path.dirname(auxfile), name)
+            for name in _AUX_INPUT_RE.findall(text))
+
+    return result
+
+
+def _get_sync_state_path(bibfile: str) -> str:
+    import hashlib
+    name = hashlib.md5(os.path.abspath(bibfile).encode()).hexdigest()
+    return os.path.join(papis.utils.get_cache_home(), "bibtex-sync", name)
+
+
+@cli.command("sync")
+@click.help_option("-h", "--help")
+@click.argument("auxfile", type=click.Path(exists=True))
+@click.option("-o", "--out", "bibfile",
+              help="BibTeX file to write the cited documents to",
+              default=lambda: config.get("default-save-bibfile", section="bibtex"),
+              required=True,
+              type=click.Path())
+@click.option("-f", "--force",
+              help="Write the BibTeX file even if nothing changed",
+              default=False, is_flag=True)
+@click.pass_context
+def _sync(ctx: click.Context, auxfile: str, bibfile: str, force: bool) -> None:
+    """
+    Write the documents cited in a LaTeX project to a bib file
+    e.g.
+        papis bibtex sync -o refs.bib main.aux
+
+    The cited keys are read from the .aux file (and the .aux files it
+    includes) and are looked up in the library by the key of their BibTeX
+    entry, i.e. their ref or the one created from ``ref-format``. The bib
+    file is only rewritten when the cited documents changed since the last sync.
+    """
+    import json
+
+    cited = papis.bibtex.get_cited_keys_from_files(_get_aux_files(auxfile))
+    cited.discard("*")
+
+    # NOTE: the documents are indexed by the key that is written in their
+    # BibTeX entry (see papis.bibtex.to_bibtex)
+    db = papis.database.get()
+    refs = {}  # type: Dict[str, papis.document.Document]
+    for doc in db.get_all_documents():
+        ref = papis.bibtex.create_reference(doc)
+        if ref:
+            refs.setdefault(ref, doc)
+
+    keys = [key for key in sorted(cited) if key in refs]
+    docs = [refs[key] for key in keys]
+    for key in sorted(cited - refs.keys()):
+        logger.warning("Cited key '%s' not found in the library", key)
+
+    # NOTE: the entries of unchanged documents are taken from the export cache
+    entries = {}  # type: Dict[str, str]
+    for key, (doc, bib) in zip(keys, papis.bibtex.to_bibtex_entries(docs)):
+        if bib:
+            entries[key] = bib
+        else:
+            logger.warning("Skipping document export: '%s'",
+                           doc.get_info_file())
+
+    state_path = _get_sync_state_path(bibfile)
+    state = {}  # type: Dict[str, Any]
+    if os.path.exists(state_path):
+        with open(state_path) as fd:
+            state = json.load(fd)
+
+    old_entries = state.get("entries", {}) \
+        if state.get("version") == SYNC_STATE_VERSION else {}
+    added = entries.keys() - old_entries.keys()
+    removed = old_entries.keys() - entries.keys()
+    updated = [ref for ref in entries.keys() & old_entries.keys()
+               if entries[ref] != old_entries[ref]]
+
+    ctx.obj["documents"] = docs
+    unchanged = (
+        not (added or removed or updated)
+        and os.path.exists(bibfile)
+        and os.path.getmtime(bibfile) == state.get("mtime"))
+    if unchanged and not force:
+        logger.info("'%s' is up to date (%d entries)", bibfile, len(entries))
+        return
+
+    logger.info("Saving %d documents in '%s' (%d added, %d updated, "
+                "%d removed)", len(entries), bibfile,
+                len(added), len(updated), len(removed))
+    with open(bibfile, "w") as fd:
+        fd.write("\n\n".join(entries.values()))
+        fd.write("\n")
+
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, "w") as fd:
+        json.dump({
+            "version": SYNC_STATE_VERSION,
+            "mtime": os.path.getmtime(bibfile),
+            "entries": entries,
+            }, fd)
+
+
 @cli.command("import")
 @click.help_option("-h", "--help")
 @click.option("-o", "--out", help="Out folder to export", default=None)
@@ -3,6 +3,7 @@ See ../../doc/source/commands/citations.rst
 
 papis citations --fetch-citations
 """
+import time
 from typing import Optional
 
 import click
@@ -13,6 +14,7 @@ import papis.logging
 from papis.citations import (has_citations,
                              has_cited_by,
                              update_and_save_citations_from_database_from_doc,
+                             update_library_citations,
                              fetch_and_save_citations,
                              fetch_and_save_cited_by_from_database)
 
@@ -30,9 +32,11 @@ logger = papis.logging.get_logger(__name__)
               help="Fetch and save citations")
 @click.option("-d",
               "--update-from-database",
+              "--update-from-db",
+              "update_from_database",
               default=False,
               is_flag=True,
-              help="Fetch and save citations")
+              help="Update the citations from the documents in the library")
 @click.option("-f",
               "--force",
               default=False,
@@ -61,6 +65,9 @@ def cli(query: str,
                                                            sort_reverse,
                                                            _all)
 
+    # NOTE: update the whole library at once instead of one by one
+    update_library = _all and update_from_database
+
     for i, document in enumerate(documents):
         _has_citations_p = has_citations(document)
         _has_cited_by_p = has_cited_by(document)
@@ -70,16 +77,28 @@ def cli(query: str,
                             i + 1, len(documents),
                             papis.document.describe(document))
                 fetch_and_save_citations(document)
-        if update_from_database:
+        if update_from_database and not update_library:
             if _has_citations_p:
                 logger.info("[%d/%d] updating citations from library for %s",
                             i + 1, len(documents),
                             papis.document.describe(document))
                 update_and_save_citations_from_database_from_doc(document)
-        if fetch_cited_by:
+        if fetch_cited_by and not update_library:
             if _has_cited_by_p and force or not _has_cited_by_p:
                 logger.info("[%d/%d] fetching cited-by "
                             "references from library for %s",
                             i + 1, len(documents),
                             papis.document.describe(document))
                 fetch_and_save_cited_by_from_database(document)
+
+    if update_library:
+        start = time.perf_counter()
+        result = update_library_citations(documents,
+                                          cited_by=fetch_cited_by,
+                                          force=force)
+        elapsed = time.perf_counter() - start
+
+        logger.info("Updated %d citation and %d cited-by files of %d documents "
+                    "in %.2fs (%.1f documents/s)",
+                    result.citations, result.cited_by, result.documents,
+                    elapsed, result.documents / max(elapsed, 1.0e-6))
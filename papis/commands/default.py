@@ -26,7 +26,7 @@ Command-line Interface
 """
 
 import os
-from typing import Optional, Tuple, List, Callable, TYPE_CHECKING
+from typing import Optional, Tuple, List, Dict, Callable, TYPE_CHECKING
 
 import click
 import click.core
@@ -38,6 +38,8 @@ import papis.config
 import papis.logging
 import papis.commands
 import papis.database
+import papis.plugin
+import papis.tracing
 
 if TYPE_CHECKING:
     import cProfile
@@ -47,8 +49,19 @@ logger = papis.logging.get_logger(__name__)
 
 class MultiCommand(click.core.MultiCommand):
 
-    scripts = papis.commands.get_scripts()
-    scripts.update(papis.commands.get_external_scripts())
+    _scripts = None  # type: Optional[Dict[str, papis.commands.Script]]
+
+    @property
+    def scripts(self) -> Dict[str, papis.commands.Script]:
+        """All available commands. The commands declared as plugins are only
+        loaded when requested from :meth:`get_command`.
+        """
+        if MultiCommand._scripts is None:
+            scripts = papis.commands.get_scripts()
+            scripts.update(papis.commands.get_external_scripts())
+            MultiCommand._scripts = scripts
+
+        return MultiCommand._scripts
 
     def list_commands(self, ctx: click.core.Context) -> List[str]:
         """List all matched commands in the command folder and in path
@@ -98,6 +111,9 @@ class MultiCommand(click.core.MultiCommand):
         if script.plugin is not None:
             return script.plugin
 
+        if script.path is None:
+            return papis.commands.get_command(script.command_name)
+
         # If it gets here, it means that it is an external script
         import copy
         from papis.commands.external import external_cli
@@ -137,6 +153,12 @@ def generate_profile_writing_function(profiler: "cProfile.Profile",
     help="Print profiling information into file",
     type=click.Path(),
     default=None)
+@click.option(
+    "--trace",
+    help="Write a trace of the time spent in the main code paths into file "
+         "(also enabled by setting PAPIS_TRACE)",
+    type=click.Path(),
+    default=None)
 @click.option(
     "-l",
     "--lib",
@@ -186,6 +208,7 @@ def generate_profile_writing_function(profiler: "cProfile.Profile",
     default=None)
 def run(verbose: bool,
         profile: str,
+        trace: Optional[str],
         config: str,
         lib: str,
         log: str,
@@ -207,6 +230,9 @@ def run(verbose: bool,
         import atexit
         atexit.register(generate_profile_writing_function(profiler, profile))
 
+    if trace:
+        papis.tracing.enable(trace)
+
     papis.logging.setup(log, color=color, logfile=logfile, verbose=verbose)
 
     # NOTE: order of the configurations is intentional based on priority
@@ -253,3 +279,19 @@ def run(verbose: bool,
 
     if clear_cache:
         papis.database.get().clear()
+        papis.plugin.clear_registry()
+
+        import papis.bibtex
+        papis.bibtex.clear_export_cache()
+
+        import papis.commands.doctor
+        papis.commands.doctor.clear_results()
+
+        import papis.citations
+        papis.citations.clear_citation_graph()
+
+        import papis.httpcache
+        papis.httpcache.clear()
+
+        import papis.httpclient
+        papis.httpclient.clear_downloads()
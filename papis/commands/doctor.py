@@ -4,12 +4,27 @@ library.
 
 There are many checks implemented and some others that you
 can add yourself through the python configuration file.
+
+The checks are run in parallel over the documents and the results are stored
+in the cache folder, so that running
+
+.. code:: sh
+
+    papis doctor --all
+
+again only checks the documents that were modified since the last run. The
+stored results are discarded when the checks or their ``doctor-*``
+configuration settings change and can be removed with ``papis --cc``. Checks
+that depend on other documents in the library, like ``duplicated-keys``, are
+always run.
 """
 
 import os
 import re
+import sys
 import json
-from typing import Optional, List, NamedTuple, Callable, Dict
+import functools
+from typing import Any, Optional, List, NamedTuple, Callable, Dict, Set, Tuple
 import collections
 import html
 
@@ -42,13 +57,23 @@ Check = NamedTuple("Check", [("name", str),
                              ])
 
 
-def register_check(name: str, check_function: CheckFn) -> None:
+def register_check(name: str,
+                   check_function: CheckFn,
+                   cacheable: bool = True) -> None:
     """
     Register a check.
     To be used by users in their configuration files
     for example.
+
+    :param cacheable: if *False*, the check is run every time. This should be
+        used for checks whose result does not only depend on the document
+        and its folder, e.g. checks that compare it to other documents.
     """
     REGISTERED_CHECKS[name] = Check(name=name, operate=check_function)
+    if cacheable:
+        UNCACHEABLE_CHECKS.discard(name)
+    else:
+        UNCACHEABLE_CHECKS.add(name)
 
 
 def registered_checks_names() -> List[str]:
@@ -169,7 +194,7 @@ def refs_check(doc: papis.document.Document) -> List[Error]:
 
 
 DUPLICATED_KEYS_SEEN \
-    = collections.defaultdict(list)  # type: Dict[str, List[str]]
+    = collections.defaultdict(set)  # type: Dict[str, Set[str]]
 DUPLICATED_KEYS_NAME = "duplicated-keys"
 
 
@@ -192,7 +217,47 @@ def duplicated_keys_check(doc: papis.document.Document) -> List[Error]:
                                  path=folder or "",
                                  doc=doc))
         else:
-            DUPLICATED_KEYS_SEEN[key].append(str(doc[key]))
+            DUPLICATED_KEYS_SEEN[key].add(str(doc[key]))
+    return results
+
+
+NEAR_DUPLICATES_FOUND = None  # type: Optional[Dict[str, List[Tuple[str, str]]]]
+NEAR_DUPLICATES_CHECK_NAME = "near-duplicates"
+
+
+def near_duplicates_check(doc: papis.document.Document) -> List[Error]:
+    """
+    Check for likely duplicates of the document in the whole library, with a
+    similarity score above ``doctor-near-duplicates-threshold`` (see
+    :mod:`papis.duplicates`).
+    """
+    global NEAR_DUPLICATES_FOUND
+    if NEAR_DUPLICATES_FOUND is None:
+        import papis.duplicates
+        threshold = papis.config.getfloat("doctor-near-duplicates-threshold")
+        duplicates = papis.duplicates.find_duplicates(
+            papis.database.get().get_all_documents(),
+            threshold=0.8 if threshold is None else threshold)
+
+        NEAR_DUPLICATES_FOUND = collections.defaultdict(list)
+        for dup in duplicates:
+            a = dup.a.get_main_folder() or ""
+            b = dup.b.get_main_folder() or ""
+            msg = "score {:.2f}, {}".format(dup.score, dup.reason)
+            NEAR_DUPLICATES_FOUND[a].append((b, msg))
+            NEAR_DUPLICATES_FOUND[b].append((a, msg))
+
+    folder = doc.get_main_folder()
+    results = []  # type: List[Error]
+    for other, msg in NEAR_DUPLICATES_FOUND.get(folder or "", []):
+        results.append(Error(name=NEAR_DUPLICATES_CHECK_NAME,
+                             msg=("Document is likely a duplicate of '{}' ({})."
+                                  .format(other, msg)),
+                             suggestion_cmd="papis merge --duplicates",
+                             payload=other,
+                             fix_action=lambda: None,
+                             path=folder or "",
+                             doc=doc))
     return results
 
 
@@ -224,16 +289,25 @@ def bibtex_type_check(doc: papis.document.Document) -> List[Error]:
 KEY_TYPE_CHECK_NAME = "key-type-check"
 
 
+@functools.lru_cache(maxsize=8)
+def _compile_key_types(keys: Tuple[str, ...]) -> List[Tuple[str, type]]:
+    result = []
+    for tup in keys:
+        key, typstr = eval(tup)
+        result.append((key, eval(typstr)))
+
+    return result
+
+
 def key_type_check(doc: papis.document.Document) -> List[Error]:
     """
     Check the type of some keys.
     """
     results = []
     folder = doc.get_main_folder()
-    keys = [eval(tup) for tup in
-            papis.config.getlist("doctor-key-type-check-keys")]
-    for key, typstr in keys:
-        typ = eval(typstr)
+    keys = _compile_key_types(
+        tuple(papis.config.getlist("doctor-key-type-check-keys")))
+    for key, typ in keys:
         if doc.has(key) and not isinstance(doc[key], typ):
             results.append(Error(name=KEY_TYPE_CHECK_NAME,
                                  path=folder or "",
@@ -291,9 +365,12 @@ def html_codes_check(doc: papis.document.Document) -> List[Error]:
 
 
 REGISTERED_CHECKS = {}  # type: Dict[str, Check]
+UNCACHEABLE_CHECKS = set()  # type: Set[str]
 register_check(FILES_CHECK_NAME, files_check)
 register_check(KEYS_EXIST_CHECK_NAME, keys_check)
-register_check(DUPLICATED_KEYS_NAME, duplicated_keys_check)
+register_check(DUPLICATED_KEYS_NAME, duplicated_keys_check, cacheable=False)
+register_check(NEAR_DUPLICATES_CHECK_NAME, near_duplicates_check,
+               cacheable=False)
 register_check(BIBTEX_TYPE_CHECK_NAME, bibtex_type_check)
 register_check(REFS_CHECK_NAME, refs_check)
 register_check(HTML_CODES_CHECK_NAME, html_codes_check)
@@ -312,6 +389,252 @@ def run(doc: papis.document.Document, checks: List[str]) -> List[Error]:
     return results
 
 
+#: Minimum number of documents that are checked in a process pool.
+PARALLEL_THRESHOLD = 256
+#: Version of the stored results, which needs to be increased when their
+#: format changes.
+RESULTS_VERSION = 2
+
+# NOTE: stored results of the cacheable checks: the "checks" map the check
+# names to their key (see _get_checks_keys) and the "documents" map their main
+# folder to a document key (see _get_document_key) and to a dictionary of
+# check names and whether they failed
+DoctorResults = Dict[str, Any]
+
+
+def get_results_path() -> str:
+    """
+    :returns: the path to the file storing the results of the checks for the
+        current library.
+    """
+    import hashlib
+
+    lib = papis.config.get_lib()
+    name = hashlib.md5("{}:{}".format(lib.name, lib.paths).encode()).hexdigest()
+    return os.path.join(papis.utils.get_cache_home(), "doctor", name)
+
+
+def clear_results() -> None:
+    """Remove the stored results of the checks for the current library."""
+    path = get_results_path()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _load_results(path: str) -> DoctorResults:
+    import pickle
+
+    results = {}  # type: DoctorResults
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as fd:
+                results = pickle.load(fd)
+        except Exception as exc:
+            logger.debug("Could not load doctor results '%s': %s", path, exc)
+
+    if results.get("version") != RESULTS_VERSION:
+        results = {"version": RESULTS_VERSION, "checks": {}, "documents": {}}
+
+    return results
+
+
+def _save_results(path: str, results: DoctorResults) -> None:
+    import pickle
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = "{}.{}".format(path, os.getpid())
+        with open(tmp_path, "wb") as fd:
+            pickle.dump(results, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.debug("Could not save doctor results '%s': %s", path, exc)
+
+
+def _get_checks_keys(checks: List[str]) -> Dict[str, str]:
+    """
+    :returns: a hash for each of the *checks* of its code and of the
+        ``doctor-*`` settings, so that its stored results are discarded when
+        either changes.
+    """
+    import hashlib
+
+    settings = hashlib.md5()
+    settings.update(papis.__version__.encode())
+    for key in sorted(papis.config.get_default_settings()["settings"]):
+        if key.startswith("doctor-"):
+            settings.update("{}={}".format(key, papis.config.get(key)).encode())
+
+    keys = {}
+    for name in checks:
+        fn = REGISTERED_CHECKS[name].operate
+        code = getattr(fn, "__code__", None)
+
+        h = settings.copy()
+        h.update("{}:{}.{}".format(
+            name, fn.__module__, getattr(fn, "__qualname__", "")).encode())
+        if code is not None:
+            h.update(code.co_code)
+            h.update(repr(code.co_consts).encode())
+
+        keys[name] = h.hexdigest()
+
+    return keys
+
+
+def _get_document_key(doc: papis.document.Document) -> Tuple[int, ...]:
+    """
+    :returns: the modification time and size of the info file and the
+        modification time of the folder of the document, which changes when
+        files are added or removed.
+    """
+    try:
+        info = os.stat(doc.get_info_file())
+        folder = os.stat(doc.get_main_folder() or "")
+    except OSError:
+        return ()
+
+    return (info.st_mtime_ns, info.st_size, folder.st_mtime_ns)
+
+
+def _get_check_errors(doc_checks: Tuple[papis.document.Document, List[str]]
+                      ) -> Dict[str, List[Error]]:
+    doc, checks = doc_checks
+    return {name: REGISTERED_CHECKS[name].operate(doc) for name in checks}
+
+
+def _get_check_error_data(
+        doc_checks: Tuple[papis.document.Document, List[str]]
+        ) -> Dict[str, List[Tuple[str, str, str, str, str]]]:
+    # NOTE: the fix actions and documents of the errors cannot be pickled, so
+    # only the remaining fields are sent back from the process pool
+    return {
+        name: [(e.name, e.path, e.payload, e.msg, e.suggestion_cmd)
+               for e in errors]
+        for name, errors in _get_check_errors(doc_checks).items()
+        }
+
+
+def _get_lazy_fix_action(doc: papis.document.Document,
+                         check: str, payload: str) -> Callable[[], None]:
+    def fix() -> None:
+        # NOTE: the check is run again to recover the fix action of the error
+        for error in REGISTERED_CHECKS[check].operate(doc):
+            if error.payload == payload:
+                error.fix_action()
+                break
+
+    return fix
+
+
+def run_many(documents: List[papis.document.Document],
+             checks: List[str],
+             use_cache: bool = True) -> List[Error]:
+    """Run the *checks* on all the *documents*.
+
+    The cacheable checks are first run over all the documents that changed
+    since the last run, in a process pool if there are many of them. Whether
+    they failed is stored for every document and check, keyed on the
+    modification time of its info file and folder and on the code of the
+    check, and reused on the next runs. Finally, only the checks that failed
+    in a previous run and the uncacheable checks are run again to collect
+    their errors.
+    """
+    cacheable = [name for name in checks if name not in UNCACHEABLE_CHECKS]
+    checks_keys = _get_checks_keys(cacheable)
+    path = get_results_path()
+
+    if use_cache:
+        results = _load_results(path)
+    else:
+        results = {"version": RESULTS_VERSION, "checks": {}, "documents": {}}
+
+    stored = results["documents"]
+    outdated = [name for name in cacheable
+                if results["checks"].get(name, checks_keys[name])
+                != checks_keys[name]]
+    if outdated:
+        logger.debug("Discarding stored results of checks: %s",
+                     ", ".join(outdated))
+        for _, doc_checked in stored.values():
+            for name in outdated:
+                doc_checked.pop(name, None)
+    results["checks"].update(checks_keys)
+
+    failed = []  # type: List[List[str]]
+    todo = []  # type: List[Tuple[int, List[str], Tuple[int, ...]]]
+    for i, doc in enumerate(documents):
+        folder = doc.get_main_folder() or ""
+        key = _get_document_key(doc)
+        entry = stored.get(folder)
+
+        checked = {}  # type: Dict[str, bool]
+        if entry is not None and folder and entry[0] == key:
+            checked = entry[1]
+
+        failed.append([name for name in cacheable if checked.get(name)])
+        missing = [name for name in cacheable if name not in checked]
+        if missing:
+            todo.append((i, missing, key))
+
+    logger.debug("Checking %d documents (%d up to date)",
+                 len(todo), len(documents) - len(todo))
+
+    args = [(documents[i], names) for i, names, _ in todo]
+    if len(todo) >= PARALLEL_THRESHOLD and sys.platform != "win32":
+        todo_errors = [{
+            name: [Error(name=e[0], path=e[1], payload=e[2], msg=e[3],
+                         suggestion_cmd=e[4],
+                         fix_action=_get_lazy_fix_action(doc, name, e[2]),
+                         doc=doc)
+                   for e in errors]
+            for name, errors in data.items()
+            } for (doc, _), data in zip(
+                args, papis.utils.parmap(_get_check_error_data, args))]
+    else:
+        todo_errors = [_get_check_errors(arg) for arg in args]
+
+    # NOTE: the errors of the checks that were just run are kept, so that
+    # they are not run twice
+    new_errors = {}  # type: Dict[int, Dict[str, List[Error]]]
+    for (i, names, key), doc_errors in zip(todo, todo_errors):
+        doc_failed = [name for name in names if doc_errors[name]]
+        failed[i].extend(doc_failed)
+        if doc_failed:
+            new_errors[i] = {name: doc_errors[name] for name in doc_failed}
+
+        doc_folder = documents[i].get_main_folder()
+        if not doc_folder or not key:
+            continue
+
+        entry = stored.get(doc_folder)
+        doc_checked = entry[1] if entry is not None and entry[0] == key else {}
+        doc_checked.update((name, name in doc_failed) for name in names)
+        stored[doc_folder] = (key, doc_checked)
+
+    if use_cache and (todo or outdated):
+        # NOTE: the stored results of documents that were removed from the
+        # library are dropped, but not the ones outside of the current query
+        folders = {doc.get_main_folder() for doc in documents}
+        removed = [folder for folder in stored
+                   if folder not in folders and not os.path.isdir(folder)]
+        for folder in removed:
+            del stored[folder]
+
+        _save_results(path, results)
+
+    errors = []  # type: List[Error]
+    for i, (doc, names) in enumerate(zip(documents, failed)):
+        doc_errors = new_errors.get(i, {})
+        for name in checks:
+            if name in doc_errors:
+                errors.extend(doc_errors[name])
+            elif name in UNCACHEABLE_CHECKS or name in names:
+                errors.extend(run(doc, [name]))
+
+    return errors
+
+
 @click.command("doctor")
 @click.help_option("--help", "-h")
 @papis.cli.query_argument()
@@ -362,9 +685,7 @@ def cli(query: str,
 
     logger.debug("Running checks: %s", _checks)
 
-    errors = []  # type: List[Error]
-    for doc in documents:
-        errors += run(doc, _checks)
+    errors = run_many(documents, _checks)
 
     if errors:
         logger.warning("%s errors found", len(errors))
@@ -48,7 +48,8 @@ Command-line Interface
 """
 
 import os
-from typing import List, Optional
+import sys
+from typing import Iterable, Iterator, List, Optional, TextIO
 
 import click
 
@@ -60,7 +61,9 @@ import papis.api
 import papis.database
 import papis.strings
 import papis.plugin
+import papis.exporter
 import papis.logging
+import papis.tracing
 
 logger = papis.logging.get_logger(__name__)
 
@@ -73,6 +76,7 @@ def _extension_name() -> str:
     return "papis.exporter"
 
 
+@papis.tracing.traced("export")
 def run(documents: List[papis.document.Document], to_format: str) -> str:
     """
     Exports several documents into something else.
@@ -80,10 +84,37 @@ def run(documents: List[papis.document.Document], to_format: str) -> str:
     :param documents: A list of papis documents
     :param to_format: what format to use
     """
-    ret_string = (
-        papis.plugin.get_extension_manager(_extension_name())[to_format]
-        .plugin(document for document in documents))
-    return str(ret_string)
+    return "".join(run_stream(documents, to_format))
+
+
+def run_stream(documents: Iterable[papis.document.Document],
+               to_format: str) -> Iterator[str]:
+    """
+    Exports several documents into something else, in chunks.
+
+    If the exporter for *to_format* supports streaming (see
+    :mod:`papis.exporter`), the chunks are produced as the documents are
+    exported, otherwise the whole output is returned as a single chunk.
+
+    :param documents: An iterable of papis documents
+    :param to_format: what format to use
+    """
+    exporter = papis.plugin.get_plugin(_extension_name(), to_format)
+    with papis.tracing.span("export.stream", format=to_format):
+        yield from papis.exporter.export(exporter, documents)
+
+
+def write_stream(chunks: Iterable[str], fd: TextIO) -> int:
+    """
+    Write the *chunks* to the file *fd* as they are produced.
+
+    :returns: the number of characters written.
+    """
+    written = 0
+    for chunk in chunks:
+        fd.write(chunk)
+        written += len(chunk)
+    return written
 
 
 @click.command("export")
@@ -135,16 +166,16 @@ def cli(query: str,
     for d in documents:
         d["_papis_local_folder"] = d.get_main_folder()
 
-    ret_string = run(documents, to_format=fmt)
-
-    if ret_string is not None and not folder:
+    if not folder:
+        chunks = run_stream(documents, to_format=fmt)
         if out is not None:
             logger.info("Dumping to '%s'", out)
             with open(out, "a+") as fd:
-                fd.write(ret_string)
+                write_stream(chunks, fd)
         else:
             logger.info("Dumping to stdout")
-            print(ret_string)
+            write_stream(chunks, sys.stdout)
+            print()
         return
 
     import shutil
@@ -188,11 +219,12 @@ def explorer(ctx: click.Context, fmt: str, out: str) -> None:
     """
     docs = ctx.obj["documents"]
 
-    outstring = run(docs, to_format=fmt)
+    chunks = run_stream(docs, to_format=fmt)
     if out is not None:
         with open(out, "a+") as fd:
             logger.info(
                 "Writing %d documents in %s into '%s'", len(docs), fmt, out)
-            fd.write(outstring)
+            write_stream(chunks, fd)
     else:
-        print(outstring)
+        write_stream(chunks, sys.stdout)
+        print()
@@ -131,10 +131,7 @@ def run(documents: List[papis.document.Document],
     elif info_files:
         return [d.get_info_file() for d in documents]
     elif fmt:
-        return [
-            papis.format.format(fmt, document)
-            for document in documents
-        ]
+        return list(papis.format.format_many(fmt, documents))
     elif folders:
         return [
             str(d.get_main_folder()) for d in documents
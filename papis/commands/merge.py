@@ -4,6 +4,13 @@ Merge two documents that might be potentially repeated.
 If your papis picker do not support selecting two items, then
 pass the ``--pick`` flag to pick twice for the documents.
 
+To go through all the likely duplicates in your library (see
+:mod:`papis.duplicates`) and merge them one pair at a time, use
+
+.. code:: sh
+
+    papis merge --duplicates
+
 TODO: Write more documentation
 
 Command-line Interface
@@ -14,7 +21,7 @@ Command-line Interface
 """
 
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 
 import click
 
@@ -28,6 +35,7 @@ import papis.database
 import papis.document
 import papis.format
 import papis.strings
+import papis.tui.utils
 import papis.commands.rm
 import papis.commands.update
 import papis.logging
@@ -59,6 +67,98 @@ def run(keep: papis.document.Document,
         logger.info("Keeping both documents")
 
 
+def run_interactive(a: papis.document.Document,
+                    b: papis.document.Document,
+                    second: bool = False,
+                    out: Optional[str] = None,
+                    keep_both: bool = False,
+                    git: bool = False) -> None:
+    """Interactively choose the data and files to keep from the documents
+    *a* and *b* and merge them (see :func:`run`).
+    """
+    data_a = papis.document.to_dict(a)
+    data_b = papis.document.to_dict(b)
+
+    to_pop = ["files"]
+    for d in (data_a, data_b):
+        for key in to_pop:
+            if key in d:
+                d.pop(key)
+
+    papis.utils.update_doc_from_data_interactively(data_a,
+                                                   data_b,
+                                                   papis.document.describe(b))
+
+    files = []  # type: List[str]
+    for doc in (a, b):
+        indices = papis.tui.utils.select_range(
+            doc.get_files(),
+            "Documents from A to keep",
+            accept_none=True,
+            bottom_toolbar=papis.document.describe(a))
+        files += [doc.get_files()[i] for i in indices]
+
+    if not papis.tui.utils.confirm("Are you sure you want to merge?"):
+        logger.info("Exiting safely")
+        return
+
+    keep = b if second else a
+    erase = a if second else b
+
+    if out is not None:
+        import shutil
+
+        os.makedirs(out, exist_ok=True)
+        keep = papis.document.from_folder(out)
+        keep["files"] = []
+        for f in files:
+            shutil.copy(f, out)
+            keep["files"] += [os.path.basename(f)]
+        keep.update(data_a)
+        keep.save()
+        logger.info("Saving the new document in '%s'", out)
+        return
+
+    run(keep, erase, data_a, files, keep_both, git)
+
+
+def run_duplicates(documents: List[papis.document.Document],
+                   second: bool = False,
+                   keep_both: bool = False,
+                   git: bool = False) -> None:
+    """Find likely duplicates in *documents* (see
+    :func:`papis.duplicates.find_duplicates`) and merge each pair
+    interactively.
+    """
+    import papis.duplicates
+
+    threshold = papis.config.getfloat("doctor-near-duplicates-threshold")
+    duplicates = papis.duplicates.find_duplicates(
+        documents, threshold=0.8 if threshold is None else threshold)
+    logger.info("Found %d likely duplicates", len(duplicates))
+
+    removed = set()  # type: Set[str]
+    for i, dup in enumerate(duplicates):
+        folders = (dup.a.get_main_folder() or "", dup.b.get_main_folder() or "")
+        if removed.intersection(folders):
+            continue
+
+        description = "{}\n  {}\n  {}".format(
+            "[{}/{}] Merge (score {:.2f}, {})?".format(
+                i + 1, len(duplicates), dup.score, dup.reason),
+            papis.document.describe(dup.a),
+            papis.document.describe(dup.b))
+        if not papis.tui.utils.confirm(description, yes=False):
+            continue
+
+        run_interactive(dup.a, dup.b,
+                        second=second, keep_both=keep_both, git=git)
+        if not keep_both:
+            erased = folders[0] if second else folders[1]
+            if not os.path.exists(erased):
+                removed.add(erased)
+
+
 @click.command("merge")
 @click.help_option("-h", "--help")
 @papis.cli.query_argument()
@@ -85,6 +185,12 @@ def run(keep: papis.document.Document,
               "--out",
               help="Create the resulting document in this path",
               default=None)
+@click.option("-d",
+              "--duplicates",
+              help="Go through the likely duplicates among the documents "
+                   "and merge them",
+              default=False,
+              is_flag=True)
 @papis.cli.git_option(help="Merge in git")
 def cli(query: str,
         sort_field: Optional[str],
@@ -93,7 +199,8 @@ def cli(query: str,
         git: bool,
         keep_both: bool,
         sort_reverse: bool,
-        pick: bool) -> None:
+        pick: bool,
+        duplicates: bool) -> None:
     """Merge two documents from a given library"""
     documents = papis.database.get().query(query)
 
@@ -104,6 +211,14 @@ def cli(query: str,
         logger.warning(papis.strings.no_documents_retrieved_message)
         return
 
+    if duplicates:
+        if out is not None:
+            logger.error("The '--out' option cannot be used with '--duplicates'")
+            return
+
+        run_duplicates(documents, second=second, keep_both=keep_both, git=git)
+        return
+
     documents = [d for d in papis.pick.pick_doc(documents)]
 
     if pick:
@@ -116,49 +231,5 @@ def cli(query: str,
             len(documents))
         return
 
-    a = documents[0]
-    data_a = papis.document.to_dict(a)
-    b = documents[1]
-    data_b = papis.document.to_dict(b)
-
-    to_pop = ["files"]
-    for d in (data_a, data_b):
-        for key in to_pop:
-            if key in d:
-                d.pop(key)
-
-    papis.utils.update_doc_from_data_interactively(data_a,
-                                                   data_b,
-                                                   papis.document.describe(b))
-
-    files = []  # type: List[str]
-    for doc in documents:
-        indices = papis.tui.utils.select_range(
-            doc.get_files(),
-            "Documents from A to keep",
-            accept_none=True,
-            bottom_toolbar=papis.document.describe(a))
-        files += [doc.get_files()[i] for i in indices]
-
-    if not papis.tui.utils.confirm("Are you sure you want to merge?"):
-        logger.info("Exiting safely")
-        return
-
-    keep = b if second else a
-    erase = a if second else b
-
-    if out is not None:
-        import shutil
-
-        os.makedirs(out, exist_ok=True)
-        keep = papis.document.from_folder(out)
-        keep["files"] = []
-        for f in files:
-            shutil.copy(f, out)
-            keep["files"] += [os.path.basename(f)]
-        keep.update(data_a)
-        keep.save()
-        logger.info("Saving the new document in '%s'", out)
-        return
-
-    run(keep, erase, data_a, files, keep_both, git)
+    run_interactive(documents[0], documents[1],
+                    second=second, out=out, keep_both=keep_both, git=git)
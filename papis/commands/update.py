@@ -151,20 +151,15 @@ def cli(query: str,
                     processed_tuples[key] = value
             ctx.data.update(processed_tuples)
 
-        matching_importers = []
+        matching_importers = []  # type: List[papis.importer.Importer]
         if not from_importer and auto:
-            for importer_cls in papis.importer.get_importers():
-                try:
-                    importer = importer_cls.match_data(document)
-                    if importer:
-                        importer.fetch()
-                except NotImplementedError:
-                    continue
-                except Exception as e:
-                    logger.exception(e)
-                else:
-                    if importer and importer.ctx:
-                        matching_importers.append(importer)
+            results = papis.importer.fetch_matching_importers(
+                papis.importer.get_importers(),
+                lambda cls: cls.match_data(document))
+            papis.importer.log_timings(results)
+
+            matching_importers = [r.importer for r in results
+                                  if r.importer is not None and r.importer.ctx]
 
         for _importer_name, _uri in from_importer:
             try:
@@ -1,6 +1,6 @@
 import os
 import configparser
-from typing import Dict, Any, List, Optional, Callable  # noqa: ignore
+from typing import Dict, Any, List, Optional, Callable, Tuple  # noqa: ignore
 
 import papis.exceptions
 import papis.library
@@ -19,6 +19,35 @@ _OVERRIDE_VARS = {
     "scripts": None
 }  # type: Dict[str, Optional[str]]
 
+#: Cache of resolved values from :func:`general_get`, keyed by
+#: ``(key, section, library name, data type)``.
+_CACHE = {}  # type: Dict[Tuple[str, Optional[str], str, Any], Any]
+_CACHE_STATS = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def invalidate_cache() -> None:
+    """Clear the cache of resolved configuration values.
+
+    This is called automatically whenever the configuration is modified
+    through :func:`set`, :func:`set_lib` or by reading new configuration
+    files, but should also be called if the default settings or the
+    configuration object are modified by other means.
+    """
+    if _CACHE:
+        _CACHE.clear()
+        _CACHE_STATS["invalidations"] += 1
+
+
+def get_cache_info() -> Dict[str, int]:
+    """Get statistics about the cache of resolved configuration values.
+
+    :returns: a dictionary with the number of cache ``hits``, ``misses``
+        and ``invalidations`` and the current ``size`` of the cache.
+    """
+    info = dict(_CACHE_STATS)
+    info["size"] = len(_CACHE)
+    return info
+
 
 def get_general_settings_name() -> str:
     """Get the section name of the general settings
@@ -47,6 +76,31 @@ class Configuration(configparser.ConfigParser):
         }  # type: PapisConfigType
         self.initialize()
 
+    # NOTE: all the ways of modifying a ConfigParser go through these methods,
+    # so the cached values are invalidated when the configuration changes
+
+    def read(self,
+             filenames: Any,
+             encoding: Optional[str] = None) -> Any:
+        invalidate_cache()
+        return super().read(filenames, encoding=encoding)
+
+    def read_dict(self, *args: Any, **kwargs: Any) -> None:
+        invalidate_cache()
+        super().read_dict(*args, **kwargs)
+
+    def set(self, *args: Any, **kwargs: Any) -> None:
+        invalidate_cache()
+        super().set(*args, **kwargs)
+
+    def remove_option(self, *args: Any, **kwargs: Any) -> bool:
+        invalidate_cache()
+        return super().remove_option(*args, **kwargs)
+
+    def remove_section(self, *args: Any, **kwargs: Any) -> bool:
+        invalidate_cache()
+        return super().remove_section(*args, **kwargs)
+
     def handle_includes(self) -> None:
         if "include" in self:
             for name in self["include"]:
@@ -134,6 +188,7 @@ def register_default_settings(settings_dictionary: PapisConfigType) -> None:
     :param settings_dictionary: A dictionary with settings
     """
     default_settings = get_default_settings()
+    invalidate_cache()
     # we do a for loop because apparently the OrderedDict removes all
     # key-val fields after updating, so we have to do it by hand
     for section in settings_dictionary:
@@ -238,12 +293,36 @@ def general_get(key: str, section: Optional[str] = None,
                 data_type: Optional[Any] = None) -> Optional[Any]:
     """General getter method that will be specialized for different modules.
 
+    Resolved values are cached (see :func:`get_cache_info`) until the
+    configuration is modified.
+
     :param data_type: The data type that should be expected for the value of
         the variable.
     :param extras: List of tuples containing section and prefixes
     """
     config = get_configuration()
     libname = get_lib_name()
+
+    cache_key = (key, section, libname, data_type)
+    try:
+        value = _CACHE[cache_key]
+    except KeyError:
+        _CACHE_STATS["misses"] += 1
+    else:
+        _CACHE_STATS["hits"] += 1
+        return value
+
+    value = _general_get(config, libname, key, section, data_type)
+    _CACHE[cache_key] = value
+
+    return value
+
+
+def _general_get(config: "Configuration",
+                 libname: str,
+                 key: str,
+                 section: Optional[str] = None,
+                 data_type: Optional[Any] = None) -> Optional[Any]:
     global_section = get_general_settings_name()
     default_settings = get_default_settings()
 
@@ -415,6 +494,10 @@ def set_lib(library: papis.library.Library) -> None:
     config = get_configuration()
     if library.name not in config:
         config[library.name] = {"dirs": str(library.paths)}
+    if (_CURRENT_LIBRARY is None
+            or _CURRENT_LIBRARY.name != library.name
+            or _CURRENT_LIBRARY.paths != library.paths):
+        invalidate_cache()
     _CURRENT_LIBRARY = library
 
 
@@ -513,5 +596,6 @@ def reset_configuration() -> Configuration:
     """
     global _CONFIGURATION
     _CONFIGURATION = None
+    invalidate_cache()
     logger.debug("Resetting configuration")
     return get_configuration()
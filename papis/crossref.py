@@ -1,7 +1,8 @@
 import re
 import os
 import tempfile
-from typing import Set, List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+from typing import (Set, List, Dict, Any, Iterable, Iterator, Optional, Sequence,
+                    Tuple, Union, Callable)
 
 import doi
 import click
@@ -12,15 +13,25 @@ import papis.filetype
 import papis.document
 import papis.importer
 import papis.downloaders.base
+import papis.httpclient
 import papis.logging
 
-if TYPE_CHECKING:
-    import habanero
-
 logger = papis.logging.get_logger(__name__)
 
 KeyConversionPair = papis.document.KeyConversionPair
 
+# NOTE: filters whose names have dots instead of dashes in the Crossref API
+_dotted_filter_names = {
+    "license_url": "license.url",
+    "license_version": "license.version",
+    "license_delay": "license.delay",
+    "full_text_version": "full-text.version",
+    "full_text_type": "full-text.type",
+    "full_text_application": "full-text.application",
+    "award_number": "award.number",
+    "award_funder": "award.funder",
+    }
+
 _filter_names = set([
     "has_funder", "funder", "location", "prefix", "member", "from_index_date",
     "until_index_date", "from_deposit_date", "until_deposit_date",
@@ -62,6 +73,11 @@ _sort_values = [
 
 _order_values = ["asc", "desc"]  # type: List[str]
 
+#: Maximum number of results returned by Crossref in a single request.
+CROSSREF_MAX_ROWS = 1000
+#: Number of results returned by Crossref when no limit is given.
+CROSSREF_DEFAULT_ROWS = 20
+
 
 type_converter = {
     "book": "book",
@@ -159,10 +175,334 @@ def crossref_data_to_papis_data(data: Dict[str, Any]) -> Dict[str, Any]:
     return new_data
 
 
-def _get_crossref_works(**kwargs: Any) -> "habanero.request_class.Request":
-    import habanero
-    cr = habanero.Crossref()
-    return cr.works(**kwargs)
+def _get_base_url() -> str:
+    return str(papis.config.getstring("crossref-base-url")).rstrip("/")
+
+
+def _get_user_agent() -> str:
+    # NOTE: Crossref routes requests that identify themselves with a contact
+    # address to its "polite" pool, which is faster and more reliable
+    user_agent = papis.config.getstring("user-agent")
+    mailto = papis.config.get("crossref-mailto")
+    if mailto:
+        user_agent = "{} (mailto:{})".format(user_agent, mailto)
+
+    return user_agent
+
+
+def _get_filter(filters: Dict[str, Any]) -> str:
+    """
+    :returns: the *filters* in the ``name:value,name:value`` syntax of the
+        Crossref API, e.g. ``from_pub_date`` becomes ``from-pub-date``.
+    """
+    result = []
+    for name, value in filters.items():
+        name = _dotted_filter_names.get(name, name.replace("_", "-"))
+        for v in (value if isinstance(value, list) else [value]):
+            if isinstance(v, bool):
+                v = str(v).lower()
+            result.append("{}:{}".format(name, v))
+
+    return ",".join(result)
+
+
+def _get_crossref_json(path: str,
+                       params: Optional[Dict[str, Any]] = None,
+                       cache: bool = True) -> Dict[str, Any]:
+    params = dict(params or {})
+    mailto = papis.config.get("crossref-mailto")
+    if mailto:
+        params["mailto"] = mailto
+
+    headers = {"User-Agent": _get_user_agent()}
+    if not cache:
+        headers["Cache-Control"] = "no-store"
+
+    response = papis.httpclient.get(
+        "{}{}".format(_get_base_url(), path),
+        params=params,
+        headers=headers)
+    response.raise_for_status()
+
+    return dict(response.json())
+
+
+def _get_work_path(doi_string: str) -> str:
+    from urllib.parse import quote
+    return "/works/{}".format(quote(doi_string, safe="/"))
+
+
+def _get_crossref_works(
+        ids: List[str]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+    return [_get_crossref_json(_get_work_path(i)) for i in ids]
+
+
+def _fetch_work(doi_string: str,
+                limiter: papis.httpclient.RateLimiter) -> Optional[Dict[str, Any]]:
+    import requests
+
+    limiter.wait()
+    try:
+        message = _get_crossref_json(_get_work_path(doi_string))["message"]
+    except requests.HTTPError as exc:
+        if exc.response is not None and exc.response.status_code == 404:
+            logger.debug("No data found for doi '%s'", doi_string)
+        else:
+            logger.error("Could not retrieve data for doi '%s' from crossref: %s",
+                         doi_string, exc)
+        return None
+    except requests.RequestException as exc:
+        logger.error("Could not retrieve data for doi '%s' from crossref: %s",
+                     doi_string, exc)
+        return None
+    except (ValueError, KeyError):
+        logger.error("Error retrieving from crossref: incorrect message")
+        return None
+
+    return crossref_data_to_papis_data(message)
+
+
+def dois_to_data(
+        dois: Iterable[str],
+        max_workers: Optional[int] = None,
+        callback: Optional[Callable[[str, Optional[Dict[str, Any]]], None]] = None,
+        ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Retrieve the data for several DOIs from Crossref concurrently.
+
+    The requests use a bounded thread pool and the shared session from
+    :mod:`papis.httpclient`, which retries failed requests with an
+    exponential backoff. They are also rate limited by
+    ``crossref-rate-limit``.
+
+    :param dois: a list of DOIs.
+    :param max_workers: the number of concurrent requests, defaults to
+        ``crossref-max-workers``.
+    :param callback: a function called with the DOI and its data as soon as
+        each request completes, e.g. to show the progress.
+    :returns: an iterator over ``(doi, data)`` tuples in the same order as
+        *dois* (without duplicates), where *data* is *None* if the DOI could
+        not be retrieved.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    dois = list(dict.fromkeys(dois))
+    if not dois:
+        return
+
+    if max_workers is None:
+        max_workers = papis.config.getint("crossref-max-workers") or 1
+
+    limiter = papis.httpclient.RateLimiter(
+        papis.config.getfloat("crossref-rate-limit") or 0.0)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(_fetch_work, d, limiter): i
+            for i, d in enumerate(dois)}
+
+        # NOTE: results are buffered until all the previous ones are done
+        results = {}    # type: Dict[int, Optional[Dict[str, Any]]]
+        next_index = 0
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            if callback is not None:
+                callback(dois[index], results[index])
+
+            while next_index in results:
+                yield dois[next_index], results.pop(next_index)
+                next_index += 1
+
+
+def _check_filters(filters: Dict[str, Any]) -> None:
+    if not set(filters) & _filter_names == set(filters):
+        raise Exception(
+            "Filter keys must be one of {0}"
+            .format(",".join(_filter_names))
+        )
+
+
+def _iter_cursor(
+        params: Dict[str, Any],
+        max_results: int,
+        limiter: papis.httpclient.RateLimiter,
+        ) -> Iterator[List[Dict[str, Any]]]:
+    # NOTE: deep paging with cursors is described in
+    # https://api.crossref.org/swagger-ui/index.html
+    params = dict(params, cursor="*")
+
+    count = 0
+    while True:
+        # NOTE: cursors expire after a few minutes, so the responses cannot be
+        # reused from the HTTP cache
+        limiter.wait()
+        message = _get_crossref_json("/works", params, cache=False)["message"]
+
+        items = list(message.get("items", []))
+        nitems = len(items)
+        if max_results > 0:
+            items = items[:max_results - count]
+
+        if not items:
+            return
+
+        count += len(items)
+        yield items
+
+        cursor = message.get("next-cursor")
+        if (not cursor
+                or nitems < params["rows"]
+                or 0 < max_results <= count):
+            return
+
+        params["cursor"] = cursor
+
+
+def get_year_shards(start: int, end: int) -> List[Dict[str, Any]]:
+    """
+    :returns: filters that split a query into one shard for each publication
+        year from *start* to *end* (inclusive), to be used with
+        :func:`iter_works`.
+    """
+    return [{"from_pub_date": str(year), "until_pub_date": str(year)}
+            for year in range(start, end + 1)]
+
+
+def iter_works(
+        query: str = "",
+        author: str = "",
+        title: str = "",
+        max_results: int = 0,
+        filters: Optional[Dict[str, Any]] = None,
+        sort: str = "score",
+        order: str = "desc",
+        page_size: Optional[int] = None,
+        shards: Optional[Sequence[Dict[str, Any]]] = None,
+        max_workers: Optional[int] = None,
+        ) -> Iterator[Dict[str, Any]]:
+    """Search Crossref and yield the results as they arrive.
+
+    The results are requested in pages with cursor-based deep paging, so
+    there is no limit on the number of results (other than *max_results*).
+    All the requests go through the shared session from
+    :mod:`papis.httpclient` and are rate limited by ``crossref-rate-limit``.
+    They are never stored in the HTTP cache, since the cursors expire after a
+    few minutes.
+
+    Large harvests can be split into *shards*, e.g. by publication year (see
+    :func:`get_year_shards`). Each shard adds its filters to *filters* and
+    is paged through separately by one of *max_workers* threads, so that
+    the shards are fetched concurrently. The results of different shards are
+    yielded in the order in which they arrive.
+
+    :param max_results: maximum number of results or ``0`` for all of them.
+    :param page_size: number of results in each request, defaults to
+        ``crossref-page-size``.
+    :param shards: a list of additional filters.
+    :param max_workers: number of shards fetched concurrently, defaults to
+        ``crossref-max-workers``.
+    :returns: an iterator over the data of the results.
+    """
+    assert sort in _sort_values, "Sort value not valid"
+    assert order in _order_values, "Sort value not valid"
+
+    if filters is None:
+        filters = {}
+
+    _check_filters(filters)
+    for shard in shards or []:
+        _check_filters(shard)
+
+    if page_size is None:
+        page_size = papis.config.getint("crossref-page-size") or CROSSREF_MAX_ROWS
+
+    rows = min(page_size, CROSSREF_MAX_ROWS)
+    if max_results > 0:
+        rows = min(rows, max_results)
+
+    params = {
+        "query": query,
+        "query.author": author,
+        "query.title": title,
+        "sort": sort,
+        "order": order,
+        }  # type: Dict[str, Any]
+    params = {key: value for key, value in params.items() if value}
+    params["rows"] = max(1, rows)
+
+    limiter = papis.httpclient.RateLimiter(
+        papis.config.getfloat("crossref-rate-limit") or 0.0)
+
+    if not shards:
+        if filters:
+            params["filter"] = _get_filter(filters)
+
+        for items in _iter_cursor(params, max_results, limiter):
+            for item in items:
+                yield crossref_data_to_papis_data(item)
+        return
+
+    if max_workers is None:
+        max_workers = papis.config.getint("crossref-max-workers") or 1
+    max_workers = max(1, max_workers)
+
+    import queue
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    # NOTE: a bounded queue stops the workers from running ahead of the
+    # consumer, so that only a few pages are kept in memory
+    pages = queue.Queue(maxsize=2 * max_workers)    # type: queue.Queue[Any]
+    stop = threading.Event()
+
+    def put(value: Any) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def harvest(shard: Dict[str, Any]) -> None:
+        shard_params = dict(params)
+        shard_params["filter"] = _get_filter(dict(filters or {}, **shard))
+        logger.debug("Fetching shard with filter '%s'", shard_params["filter"])
+
+        try:
+            for items in _iter_cursor(shard_params, max_results, limiter):
+                if not put(items):
+                    return
+        except Exception as exc:
+            put(exc)
+        finally:
+            put(None)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for shard in shards:
+            executor.submit(harvest, shard)
+
+        count = 0
+        remaining = len(shards)
+        try:
+            while remaining:
+                items = pages.get()
+                if items is None:
+                    remaining -= 1
+                    continue
+
+                if isinstance(items, Exception):
+                    raise items
+
+                for item in items:
+                    yield crossref_data_to_papis_data(item)
+
+                    count += 1
+                    if 0 < max_results <= count:
+                        return
+        finally:
+            stop.set()
 
 
 def get_data(
@@ -184,24 +524,20 @@ def get_data(
         filters = {}
 
     if filters:
-        if not set(filters) & _filter_names == set(filters):
-            raise Exception(
-                "Filter keys must be one of {0}"
-                .format(",".join(_filter_names))
-            )
-    data = {
-        "query": query,
-        "query_author": author,
-        "ids": dois,
-        "query_title": title,
-        "limit": max_results
-        }
+        _check_filters(filters)
 
-    kwargs = {key: data[key] for key in data if data[key]}
     if not dois:
-        kwargs.update({"sort": sort, "order": order})
+        try:
+            return list(iter_works(
+                query=query, author=author, title=title,
+                max_results=max_results or CROSSREF_DEFAULT_ROWS,
+                filters=filters, sort=sort, order=order))
+        except Exception as e:
+            logger.error(e)
+            return []
+
     try:
-        results = _get_crossref_works(filter=filters, **kwargs)
+        results = _get_crossref_works(ids=dois)
     except Exception as e:
         logger.error(e)
         return []
@@ -247,7 +583,8 @@ def doi_to_data(doi_string: str) -> Dict[str, Any]:
 @click.option("--author", "-a", help="Author of the query", default="")
 @click.option("--title", "-t", help="Title of the query", default="")
 @click.option(
-    "--max", "-m", "_ma", help="Maximum number of results", default=20)
+    "--max", "-m", "_ma", help="Maximum number of results (0 for all)",
+    default=20)
 @click.option(
     "--filter", "-f", "_filters", help="Filters to apply", default=(),
     type=(click.Choice(list(_filter_names)), str),
@@ -258,6 +595,12 @@ def doi_to_data(doi_string: str) -> Dict[str, Any]:
 @click.option(
     "--sort", "-s", help="Sorting parameter", default="score",
     type=click.Choice(_sort_values), show_default=True)
+@click.option(
+    "--page-size", help="Number of results in each request", default=None,
+    type=int)
+@click.option(
+    "--shard-years", help="Fetch each publication year in this range "
+    "concurrently", default=None, type=(int, int))
 def explorer(
         ctx: click.core.Context,
         query: str,
@@ -266,7 +609,9 @@ def explorer(
         _ma: int,
         _filters: List[Tuple[str, str]],
         sort: str,
-        order: str) -> None:
+        order: str,
+        page_size: Optional[int],
+        shard_years: Optional[Tuple[int, int]]) -> None:
     """
     Look for documents on crossref.org.
 
@@ -274,21 +619,33 @@ def explorer(
 
     papis explore crossref -a 'Albert einstein' pick export --bibtex lib.bib
 
+    To harvest all the results of a query, fetching each publication year
+    concurrently, use
+
+    papis explore crossref -q 'tensor networks' -m 0 --shard-years 2000 2020
+
     """
     logger.info("Looking up...")
 
-    data = get_data(
+    data = iter_works(
         query=query,
         author=author,
         title=title,
         max_results=_ma,
         filters=dict(_filters),
         sort=sort,
-        order=order)
-    docs = [papis.document.from_data(data=d) for d in data]
-    ctx.obj["documents"] += docs
+        order=order,
+        page_size=page_size,
+        shards=get_year_shards(*shard_years) if shard_years else None)
+
+    ndocs = len(ctx.obj["documents"])
+    try:
+        ctx.obj["documents"].extend(
+            papis.document.from_data(data=d) for d in data)
+    except Exception as e:
+        logger.error(e)
 
-    logger.info("%s documents found", len(docs))
+    logger.info("%s documents found", len(ctx.obj["documents"]) - ndocs)
 
 
 class DoiFromPdfImporter(papis.importer.Importer):
@@ -364,14 +721,8 @@ class Importer(papis.importer.Importer):
                     "Trying to download document from '%s'", doc_url)
 
                 import requests
-                session = requests.Session()
-
-                import requests.structures
-                session.headers = requests.structures.CaseInsensitiveDict({
-                    "user-agent": papis.config.getstring("user-agent")})
-
                 import filetype
-                response = session.get(doc_url, allow_redirects=True)
+                response = papis.httpclient.get(doc_url, allow_redirects=True)
                 kind = filetype.guess(response.content)
 
                 if response.status_code != requests.codes.ok:
@@ -3,7 +3,7 @@ Here the database abstraction for the libraries is defined.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Sequence
 
 import papis.utils
 import papis.config
@@ -58,6 +58,15 @@ class Database(ABC):
     def add(self, document: papis.document.Document) -> None:
         pass
 
+    def add_many(self, documents: Sequence[papis.document.Document]) -> None:
+        """Add several documents at once.
+
+        Backends should override this to commit all the documents in a single
+        operation, instead of once for each document as with :meth:`add`.
+        """
+        for doc in documents:
+            self.add(doc)
+
     @abstractmethod
     def update(self, document: papis.document.Document) -> None:
         pass
@@ -1,7 +1,7 @@
 import os
 import re
 import sys
-from typing import List, Optional, Match, Dict, Tuple
+from typing import List, Optional, Match, Dict, Sequence, Tuple
 
 import papis.utils
 import papis.docmatcher
@@ -10,6 +10,7 @@ import papis.config
 import papis.format
 import papis.database.base
 import papis.logging
+import papis.tracing
 
 logger = papis.logging.get_logger(__name__)
 
@@ -48,6 +49,7 @@ def get_cache_file_path(directory: str) -> str:
     return os.path.join(folder, cache_name)
 
 
+@papis.tracing.traced("query.filter")
 def filter_documents(
         documents: List[papis.document.Document],
         search: str = "") -> List[papis.document.Document]:
@@ -159,7 +161,7 @@ class Database(papis.database.base.Database):
             logger.debug("Getting documents from cache in '%s'", cache_path)
 
             import pickle
-            with open(cache_path, "rb") as fd:
+            with papis.tracing.span("cache.load"), open(cache_path, "rb") as fd:
                 self.documents = pickle.load(fd)
         else:
             logger.info("Indexing library, this might take a while...")
@@ -187,6 +189,20 @@ class Database(papis.database.base.Database):
         assert os.path.exists(_folder)
         self.save()
 
+    def add_many(self, documents: Sequence[papis.document.Document]) -> None:
+        logger.debug("Adding %d documents...", len(documents))
+
+        docs = self.get_documents()
+        for document in documents:
+            _folder = document.get_main_folder()
+            assert _folder is not None
+            assert os.path.exists(_folder)
+
+            self.maybe_compute_id(document)
+            docs.append(document)
+
+        self.save()
+
     def update(self, document: papis.document.Document) -> None:
         if not papis.config.getboolean("use-cache"):
             return
@@ -250,7 +266,7 @@ class Database(papis.database.base.Database):
 
         import pickle
         path = self._get_cache_file_path()
-        with open(path, "wb+") as fd:
+        with papis.tracing.span("cache.save"), open(path, "wb+") as fd:
             pickle.dump(docs, fd)
 
     def _get_cache_file_path(self) -> str:
@@ -40,7 +40,8 @@ you will not be able to parse the publisher through a search.
 
 """
 import os
-from typing import List, Dict, Optional, Any, KeysView, TYPE_CHECKING
+from typing import (List, Dict, Optional, Any, KeysView, Sequence,
+                    TYPE_CHECKING)
 
 import papis.config
 import papis.strings
@@ -92,6 +93,17 @@ class Database(papis.database.base.Database):
         logger.debug("Committing document..")
         writer.commit()
 
+    def add_many(self, documents: Sequence[papis.document.Document]) -> None:
+        schema_keys = self.get_schema_init_fields().keys()
+
+        logger.debug("Adding %d documents...", len(documents))
+        writer = self.get_writer()
+        for document in documents:
+            self.add_document_with_writer(document, writer, schema_keys)
+
+        logger.debug("Committing documents..")
+        writer.commit()
+
     def update(self, document: papis.document.Document) -> None:
         """As it says in the docs, just delete the document and add it again
         """
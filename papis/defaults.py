@@ -41,11 +41,13 @@ settings = {
     "add-edit": False,
     "add-open": False,
     "add-fetch-citations": False,
+    "add-list-max-workers": 4,
 
     # papis-doctor configuration
     "doctor-default-checks": ["files", "keys-exist", "duplicated-keys"],
     "doctor-keys-exist-keys": ["title", "author", "ref"],
     "doctor-duplicated-keys-keys": ["ref"],
+    "doctor-near-duplicates-threshold": 0.8,
     "doctor-html-codes-keys": ["title", "author", "abstract", "journal"],
     "doctor-key-type-check-keys": [("year", "int"),
                                    ("month", "int"),
@@ -168,7 +170,25 @@ settings = {
     "unique-document-keys": "['doi','ref','isbn','isbn10','url','doc_url']",
 
     "downloader-proxy": None,
+    "importer-timeout": 60,
+    "importer-max-workers": 8,
+    "http-timeout": 30,
+    "http-max-retries": 3,
+    "http-pool-size": 10,
+    "http-cache": False,
+    "http-cache-ttl": 86400,
+    "http-cache-max-size": 200,
+
+    "crossref-base-url": "https://api.crossref.org",
+    "crossref-mailto": None,
+    "crossref-max-workers": 4,
+    "crossref-rate-limit": 10.0,
+    "crossref-page-size": 200,
+    "arxiv-page-size": 500,
+    "arxiv-delay": 3.0,
+    "arxiv-max-workers": 1,
     "bibtex-unicode": False,
+    "bibtex-export-cache": True,
 
     "time-stamp": True,
 
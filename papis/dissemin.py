@@ -2,7 +2,6 @@ from typing import List, Dict, Any
 
 import click
 
-import papis.config
 import papis.document
 import papis.logging
 
@@ -51,20 +50,16 @@ def get_data(query: str = "") -> List[Dict[str, Any]]:
     https://dissem.in/api/search/?q=pregroup
     """
     import urllib.parse
-    import urllib.request
+    import papis.httpclient
 
     dict_params = {"q": query}
     params = urllib.parse.urlencode(dict_params)
     main_url = "https://dissem.in/api/search/?"
     req_url = main_url + params
     logger.debug("url = '%s'", req_url)
-    url = urllib.request.Request(
-        req_url,
-        headers={
-            "User-Agent": str(papis.config.get("user-agent"))
-        }
-    )
-    jsondoc = urllib.request.urlopen(url).read().decode()
+    response = papis.httpclient.get(req_url)
+    response.raise_for_status()
+    jsondoc = response.content.decode()
 
     import json
     paperlist = json.loads(jsondoc)
@@ -3,6 +3,7 @@ from typing import Optional, Any, Callable, TYPE_CHECKING
 import papis.config
 import papis.document
 import papis.logging
+import papis.tracing
 
 if TYPE_CHECKING:
     import pyparsing
@@ -120,6 +121,7 @@ class DocMatcher(object):
         return cls.parsed_search
 
 
+@papis.tracing.traced("query.parse")
 def parse_query(query_string: str) -> "pyparsing.ParseResults":
     import pyparsing
     logger.debug("Parsing query: '%s'", query_string)
@@ -10,6 +10,7 @@ from typing_extensions import TypedDict
 import papis
 import papis.config
 import papis.logging
+import papis.tracing
 
 logger = papis.logging.get_logger(__name__)
 
@@ -360,6 +361,7 @@ def from_data(data: Dict[str, Any]) -> Document:
     return Document(data=data)
 
 
+@papis.tracing.traced("sort")
 def sort(docs: List[Document], key: str, reverse: bool) -> List[Document]:
     # The tuple returned by the _sort_for_key function represents:
     # (ranking, integer value, string value)
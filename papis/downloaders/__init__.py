@@ -1,11 +1,42 @@
+"""
+Downloaders get the data and files of documents from the web pages of
+publishers and repositories. They are found with
+:func:`get_matching_downloaders` when a URL is added, e.g. by
+``papis add https://...``.
+
+Instead of implementing :meth:`Downloader.match` by hand, downloaders should
+declare the URLs they support with
+
+* :attr:`Downloader.HOSTS`: the domain names handled by the downloader,
+  which also includes all their subdomains,
+* :attr:`Downloader.URL_PATTERN`: a regular expression for URLs that cannot
+  be recognized by their host alone (e.g. file extensions).
+
+When the downloaders are first needed, these declarations are compiled into
+a single dispatch table (see :func:`get_dispatch_table`), so that finding
+the downloaders for a URL does not depend on the number of installed
+downloaders. Only downloaders without any declaration (e.g. the fallback
+downloader) are checked one by one.
+
+.. code:: python
+
+    class Downloader(papis.downloaders.Downloader):
+        HOSTS = ("example.org",)
+
+        def __init__(self, url: str) -> None:
+            super().__init__(url, name="example")
+"""
+
 import os
 import re
 import sys
-from typing import List, Optional, Any, Sequence, Type, Dict, Union, TYPE_CHECKING
+from typing import (List, Optional, Any, ClassVar, NamedTuple, Pattern, Sequence,
+                    Set, Tuple, Type, Dict, Union, TYPE_CHECKING)
 
 import papis.bibtex
 import papis.config
 import papis.document
+import papis.httpclient
 import papis.importer
 import papis.plugin
 import papis.utils
@@ -16,6 +47,10 @@ if TYPE_CHECKING:
 
 logger = papis.logging.get_logger(__name__)
 
+#: Number of bytes at the start of a downloaded document that are used to
+#: guess its file type.
+DOCUMENT_HEAD_SIZE = 8192
+
 
 def _extension_name() -> str:
     return "papis.downloader"
@@ -53,6 +88,13 @@ class Downloader(papis.importer.Importer):
     """This is the base class for every downloader.
     """
 
+    #: Domain names of the URLs supported by the downloader. URLs on any of
+    #: their subdomains are also supported.
+    HOSTS = ()  # type: ClassVar[Tuple[str, ...]]
+    #: A regular expression for other URLs supported by the downloader. It
+    #: is matched case insensitively at the start of the URL.
+    URL_PATTERN = None  # type: ClassVar[Optional[str]]
+
     def __init__(self,
                  uri: str = "",
                  name: str = "",
@@ -80,18 +122,11 @@ class Downloader(papis.importer.Importer):
 
         self.bibtex_data = None  # type: Optional[str]
         self.document_data = None  # type: Optional[bytes]
+        self.document_file = None  # type: Optional[str]
+        self.document_sha256 = None  # type: Optional[str]
 
-        import requests
-        self.session = requests.Session()  # type: requests.Session
-        self.session.headers = requests.structures.CaseInsensitiveDict({
-            "User-Agent": papis.config.getstring("user-agent")
-        })
-        proxy = papis.config.get("downloader-proxy")
-        if proxy is not None:
-            self.session.proxies = {
-                "http": proxy,
-                "https": proxy,
-            }
+        # NOTE: all downloaders share a session to reuse connections
+        self.session = papis.httpclient.get_session()
         self.cookies = cookies
 
     def fetch_data(self) -> None:
@@ -136,14 +171,16 @@ class Downloader(papis.importer.Importer):
         except NotImplementedError:
             pass
         else:
-            doc_rawdata = self.get_document_data()
-            if doc_rawdata and self.check_document_format():
-                import tempfile
-                with tempfile.NamedTemporaryFile(
-                        mode="wb+", delete=False) as f:
-                    f.write(doc_rawdata)
-                    self.logger.info("Saving downloaded file in '%s'", f.name)
-                    self.ctx.files.append(f.name)
+            doc_path = self.get_document_file()
+            if doc_path is None:
+                return
+
+            if self.check_document_format():
+                self.logger.info("Saving downloaded file in '%s'", doc_path)
+                self.ctx.files.append(doc_path)
+            else:
+                os.remove(doc_path)
+                self.document_file = None
 
     def fetch(self) -> None:
         self.fetch_data()
@@ -151,8 +188,17 @@ class Downloader(papis.importer.Importer):
 
     @classmethod
     def match(cls, url: str) -> Optional["Downloader"]:
-        raise NotImplementedError(
-            "Matching uri not implemented for this importer")
+        """Create a downloader for *url* if it matches :attr:`HOSTS` or
+        :attr:`URL_PATTERN`.
+
+        Downloaders that need to modify the URL or do not declare the URLs
+        they support should override this method.
+        """
+        if not cls.HOSTS and cls.URL_PATTERN is None:
+            raise NotImplementedError(
+                "Matching uri not implemented for this importer")
+
+        return cls(url) if matches_declaration(cls, url) else None
 
     def _get_body(self) -> bytes:
         """Get body of the uri, this is also important for unittesting"""
@@ -237,24 +283,78 @@ class Downloader(papis.importer.Importer):
         """Get the document_data data if it has been downloaded already
         and if not download it and return the data in binary format.
 
+        This reads the whole document into memory, so
+        :meth:`get_document_file` should be preferred.
+
         :returns: Document data in binary format
         """
         if not self.document_data:
-            self.download_document()
+            if self.document_file is None:
+                self.download_document()
+
+            if self.document_file is not None:
+                with open(self.document_file, "rb") as fd:
+                    self.document_data = fd.read()
+
         return self.document_data
 
+    def get_document_file(self) -> Optional[str]:
+        """Get the file where the document was downloaded and if it has not
+        been downloaded yet, download it.
+
+        :returns: Path to the downloaded document
+        """
+        if self.document_file is None and not self.document_data:
+            self.download_document()
+
+        if self.document_file is None and self.document_data:
+            # NOTE: downloaders can also set the data directly
+            import tempfile
+            with tempfile.NamedTemporaryFile(mode="wb+", delete=False) as f:
+                f.write(self.document_data)
+            self.document_file = f.name
+
+        return self.document_file
+
     def download_document(self) -> None:
         """Document downloader, it should try to download document information
         from the url provided by ``get_document_url``.
 
-        It sets the ``document_data`` attribute if it succeeds.
+        The document is streamed to a temporary file (see
+        :func:`papis.httpclient.download`), so that large files are never
+        held in memory and interrupted downloads can be resumed. It sets the
+        ``document_file`` and ``document_sha256`` attributes if it succeeds,
+        while errors returned by the server (e.g. ``403 Forbidden`` for
+        documents behind a paywall) are only logged.
         """
         url = self.get_document_url()
         if not url:
             return
         self.logger.info("Downloading file from '%s'", url)
-        res = self.session.get(url, cookies=self.cookies)
-        self.document_data = res.content
+
+        import requests
+        try:
+            result = papis.httpclient.download(
+                url, session=self.session, cookies=self.cookies)
+        except requests.HTTPError as exc:
+            self.logger.warning("Could not download file from '%s': %s",
+                                url, exc)
+            return
+
+        self.logger.debug("Downloaded %d bytes (sha256 %s)",
+                          result.size, result.sha256)
+
+        self.document_file = result.path
+        self.document_sha256 = result.sha256
+
+    def _get_document_head(self) -> bytes:
+        # NOTE: the file type can be found from the first few kilobytes
+        doc_path = self.get_document_file()
+        if doc_path is None:
+            return b""
+
+        with open(doc_path, "rb") as fd:
+            return fd.read(DOCUMENT_HEAD_SIZE)
 
     def check_document_format(self) -> bool:
         """Check if the downloaded document has the filetype that the
@@ -274,7 +374,7 @@ class Downloader(papis.importer.Importer):
             return True
 
         import filetype
-        retrieved_kind = filetype.guess(self.get_document_data())
+        retrieved_kind = filetype.guess(self._get_document_head())
 
         if retrieved_kind is None:
             print_warning()
@@ -304,21 +404,215 @@ def get_available_downloaders() -> List[Type[Downloader]]:
     return _ret
 
 
+def get_url_host(url: str) -> Optional[str]:
+    """
+    :returns: the lower case host name in *url*, which may not have a scheme.
+
+    >>> get_url_host("https://Journals.APS.org/prl/abstract")
+    'journals.aps.org'
+    >>> get_url_host("arxiv.org/abs/1701.08223")
+    'arxiv.org'
+    >>> get_url_host("arXiv:1701.08223") is None
+    True
+    """
+    from urllib.parse import urlsplit
+
+    url = url.strip()
+    if "//" not in url:
+        if not re.match(r"^[\w.-]+\.[a-z]{2,}(/|$)", url, re.IGNORECASE):
+            return None
+        url = "//{}".format(url)
+
+    try:
+        return urlsplit(url).hostname
+    except ValueError:
+        return None
+
+
+def _get_parent_domains(host: str) -> List[str]:
+    # NOTE: "a.b.org" -> ["a.b.org", "b.org", "org"]
+    parts = host.split(".")
+    return [".".join(parts[i:]) for i in range(len(parts))]
+
+
+def matches_declaration(cls: Type[Downloader], url: str) -> bool:
+    """
+    :returns: *True* if *url* matches the :attr:`~Downloader.HOSTS` or the
+        :attr:`~Downloader.URL_PATTERN` declared by the downloader *cls*.
+    """
+    if cls.HOSTS:
+        host = get_url_host(url)
+        hosts = {h.lower() for h in cls.HOSTS}
+        if host is not None and hosts.intersection(_get_parent_domains(host)):
+            return True
+
+    if cls.URL_PATTERN is not None:
+        return re.match(cls.URL_PATTERN, url, re.IGNORECASE) is not None
+
+    return False
+
+
+DispatchTable = NamedTuple("DispatchTable", [
+    ("hosts", Dict[str, List[Type[Downloader]]]),
+    ("pattern", Optional[Pattern[str]]),
+    ("pattern_downloaders", Dict[str, Type[Downloader]]),
+    ("separate_patterns", List[Tuple[Pattern[str], Type[Downloader]]]),
+    ("generic", List[Type[Downloader]]),
+    ])
+
+# NOTE: patterns with named groups, backreferences or conditionals would clash
+# with the other patterns or refer to the wrong groups in the combined pattern
+_UNCOMBINABLE_PATTERN_RE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(")
+
+_DISPATCH_TABLE = None  # type: Optional[DispatchTable]
+
+
+def _is_valid_pattern(pattern: str) -> bool:
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+
+    return True
+
+
+def get_dispatch_table() -> DispatchTable:
+    """Compile the URL declarations of all the available downloaders.
+
+    The table contains
+
+    * a dictionary from the declared :attr:`~Downloader.HOSTS` to the
+      downloaders supporting them,
+    * a single regular expression combining all the declared
+      :attr:`~Downloader.URL_PATTERN`, where each pattern is a lookahead in
+      a named group, so that a single match finds all the matching patterns,
+    * the patterns that cannot be combined with the others (e.g. because they
+      use named groups or backreferences), which are matched one by one,
+    * the downloaders without any declaration, which need to be checked
+      one by one.
+
+    Invalid patterns are logged and ignored.
+
+    The table is built once and reused afterwards.
+    """
+    global _DISPATCH_TABLE
+
+    if _DISPATCH_TABLE is not None:
+        return _DISPATCH_TABLE
+
+    hosts = {}  # type: Dict[str, List[Type[Downloader]]]
+    patterns = []  # type: List[str]
+    pattern_downloaders = {}  # type: Dict[str, Type[Downloader]]
+    separate = []  # type: List[Tuple[Pattern[str], Type[Downloader]]]
+    generic = []  # type: List[Type[Downloader]]
+
+    for cls in get_available_downloaders():
+        for host in cls.HOSTS:
+            hosts.setdefault(host.lower(), []).append(cls)
+
+        if cls.URL_PATTERN is not None:
+            group = "d{}".format(len(patterns))
+            pattern = "(?:(?=(?P<{}>{})))?".format(group, cls.URL_PATTERN)
+            try:
+                compiled = re.compile(cls.URL_PATTERN, re.IGNORECASE)
+            except re.error as exc:
+                logger.error("Invalid URL pattern of downloader '%s': %s",
+                             cls.__name__, exc)
+                continue
+
+            if (compiled.groupindex
+                    or _UNCOMBINABLE_PATTERN_RE.search(cls.URL_PATTERN)
+                    or not _is_valid_pattern(pattern)):
+                separate.append((compiled, cls))
+            else:
+                patterns.append(pattern)
+                pattern_downloaders[group] = cls
+
+        if not cls.HOSTS and cls.URL_PATTERN is None:
+            generic.append(cls)
+
+    combined = None  # type: Optional[Pattern[str]]
+    if patterns:
+        try:
+            combined = re.compile("".join(patterns), re.IGNORECASE)
+        except re.error as exc:
+            logger.error("Could not combine the URL patterns of the "
+                         "downloaders: %s", exc)
+            separate.extend(
+                (re.compile(str(cls.URL_PATTERN), re.IGNORECASE), cls)
+                for cls in pattern_downloaders.values())
+            pattern_downloaders = {}
+
+    logger.debug("Compiled dispatch table: %d hosts, %d combined patterns, "
+                 "%d separate patterns and %d generic downloaders",
+                 len(hosts), len(pattern_downloaders), len(separate),
+                 len(generic))
+
+    _DISPATCH_TABLE = DispatchTable(
+        hosts=hosts,
+        pattern=combined,
+        pattern_downloaders=pattern_downloaders,
+        separate_patterns=separate,
+        generic=generic)
+
+    return _DISPATCH_TABLE
+
+
+def get_candidate_downloaders(url: str) -> List[Type[Downloader]]:
+    """Find the downloaders that may support *url* using the dispatch table
+    from :func:`get_dispatch_table`.
+
+    :returns: the downloader classes whose declarations match *url* and all
+        the downloaders without declarations.
+    """
+    table = get_dispatch_table()
+
+    result = []  # type: List[Type[Downloader]]
+    seen = set()  # type: Set[Type[Downloader]]
+
+    def extend(classes: Sequence[Type[Downloader]]) -> None:
+        for cls in classes:
+            if cls not in seen:
+                seen.add(cls)
+                result.append(cls)
+
+    host = get_url_host(url)
+    if host is not None:
+        for domain in _get_parent_domains(host):
+            extend(table.hosts.get(domain, []))
+
+    if table.pattern is not None:
+        m = table.pattern.match(url)
+        if m is not None:
+            extend([table.pattern_downloaders[group]
+                    for group, value in m.groupdict().items()
+                    if value is not None])
+
+    extend([cls for pattern, cls in table.separate_patterns
+            if pattern.match(url) is not None])
+    extend(table.generic)
+    return result
+
+
 def get_matching_downloaders(url: str) -> Sequence[Downloader]:
     """Get matching downloaders sorted by their priorities.
     The first elements have the higher priority
 
+    Only the downloaders found by :func:`get_candidate_downloaders` are
+    matched and instantiated.
+
     :param url: Url to be matched against
     :returns: A list of sorted downloaders
     """
-    print(get_available_downloaders())
+    candidates = get_candidate_downloaders(url)
+    logger.debug("Found %d candidate downloaders for '%s'", len(candidates), url)
+
     _maybe_matches = [
         d.match(url)
-        for d in get_available_downloaders()]  # List[Optional[Downloader]]
+        for d in candidates]  # List[Optional[Downloader]]
     matches = [m
                for m in _maybe_matches
                if m is not None]  # type: List[Downloader]
-    print(matches)
     return sorted(
         matches,
         key=lambda k: k.priority,
@@ -331,8 +625,8 @@ def get_downloader_by_name(name: str) -> Type[Downloader]:
     :param name: Name of the downloader
     :returns: A downloader class
     """
-    downloader_class = papis.plugin.get_extension_manager(
-        _extension_name())[name].plugin  # type: Type[Downloader]
+    downloader_class = papis.plugin.get_plugin(
+        _extension_name(), name)  # type: Type[Downloader]
     return downloader_class
 
 
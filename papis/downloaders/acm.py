@@ -1,11 +1,13 @@
 import re
-from typing import Optional
+from typing import Optional, ClassVar, Tuple
 
 import papis.downloaders.base
 
 
 class Downloader(papis.downloaders.Downloader):
 
+    HOSTS = ("acm.org",)  # type: ClassVar[Tuple[str, ...]]
+
     def __init__(self, url: str) -> None:
         super().__init__(
             url, "acm",
@@ -13,13 +15,6 @@ class Downloader(papis.downloaders.Downloader):
             cookies={"gdpr": "true"},
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        if re.match(r".*acm.org.*", url):
-            return Downloader(url)
-        else:
-            return None
-
     def get_doi(self) -> Optional[str]:
         url = self.uri
         self.logger.debug("Parsing DOI from '%s'", url)
@@ -1,11 +1,12 @@
-import re
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 
 import papis.document
 import papis.downloaders
 
 
 class Downloader(papis.downloaders.Downloader):
+
+    HOSTS = ("acs.org",)  # type: ClassVar[Tuple[str, ...]]
     DOCUMENT_URL = (
         "http://pubs.acs.org/doi/pdf/{doi}"
         )   # type: ClassVar[str]
@@ -23,10 +24,6 @@ class Downloader(papis.downloaders.Downloader):
             priority=10,
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        return Downloader(url) if re.match(r".*acs.org.*", url) else None
-
     def get_data(self) -> Dict[str, Any]:
         soup = self._get_soup()
         data = papis.downloaders.base.parse_meta_headers(soup)
@@ -1,11 +1,13 @@
 import re
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 
 import papis.downloaders.base
 
 
 class Downloader(papis.downloaders.Downloader):
 
+    HOSTS = ("annualreviews.org",)  # type: ClassVar[Tuple[str, ...]]
+
     DOCUMENT_URL = "http://annualreviews.org/doi/pdf/{doi}"  # type: ClassVar[str]
 
     BIBTEX_URL = (
@@ -20,13 +22,6 @@ class Downloader(papis.downloaders.Downloader):
             priority=10,
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        if re.match(r".*annualreviews.org.*", url):
-            return Downloader(url)
-        else:
-            return None
-
     def get_document_url(self) -> Optional[str]:
         if "doi" in self.ctx.data:
             url = self.DOCUMENT_URL.format(doi=self.ctx.data["doi"])
@@ -1,11 +1,12 @@
-import re
-from typing import Optional
+from typing import Optional, ClassVar, Tuple
 
 import papis.downloaders.fallback
 
 
 class Downloader(papis.downloaders.fallback.Downloader):
 
+    HOSTS = ("aps.org",)  # type: ClassVar[Tuple[str, ...]]
+
     def __init__(self, url: str) -> None:
         super().__init__(
             url, name="aps",
@@ -13,10 +14,6 @@ class Downloader(papis.downloaders.fallback.Downloader):
             priority=10,
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.fallback.Downloader]:
-        return Downloader(url) if re.match(r".*aps.org.*", url) else None
-
     def get_bibtex_url(self) -> Optional[str]:
         url = "{}?type=bibtex&download=true".format(
             self.uri.replace("/abstract", "/export"))
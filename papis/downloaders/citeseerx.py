@@ -1,6 +1,5 @@
 import os
-import re
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 
 import papis.document
 import papis.downloaders
@@ -21,6 +20,8 @@ article_key_conversion = [
 
 class Downloader(papis.downloaders.Downloader):
 
+    HOSTS = ("citeseerx.ist.psu.edu",)  # type: ClassVar[Tuple[str, ...]]
+
     # NOTE: not sure if this API is open for the public, but it seems to work
     API_URL = "https://citeseerx.ist.psu.edu/api/paper"  # type: ClassVar[str]
 
@@ -39,13 +40,6 @@ class Downloader(papis.downloaders.Downloader):
 
         self.pid = os.path.basename(url)
 
-    @classmethod
-    def match(cls,
-              url: str) -> Optional[papis.downloaders.Downloader]:
-        return (Downloader(url)
-                if re.match(r".*citeseerx\.ist\.psu\.edu.*", url)
-                else None)
-
     def _get_raw_data(self) -> bytes:
         response = self.session.get(
             self.API_URL,
@@ -17,6 +17,10 @@ class Downloader(papis.downloaders.Downloader):
 
     @classmethod
     def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
+        # NOTE: subclasses declaring the URLs they support only match those
+        if cls.HOSTS or cls.URL_PATTERN is not None:
+            return super().match(url)
+
         return Downloader(url)
 
     def get_data(self) -> Dict[str, Any]:
@@ -1,11 +1,15 @@
 import re
-from typing import Optional
+from typing import ClassVar, Optional
 
 import papis.downloaders.base
 
 
 class Downloader(papis.downloaders.Downloader):
 
+    URL_PATTERN = (
+        r"^http.*\.(pdf|djvu|epub|mobi|jpg|png|md)$"
+        )   # type: ClassVar[Optional[str]]
+
     def __init__(self, url: str) -> None:
         super().__init__(url, name="get", priority=0)
 
@@ -19,8 +23,8 @@ class Downloader(papis.downloaders.Downloader):
         >>> not Downloader.match('http://whatever?path?is?therefile')
         True
         """
-        endings = "pdf|djvu|epub|mobi|jpg|png|md"
-        m = re.match(r"^http.*\.(%s)$" % endings, url, re.IGNORECASE)
+        assert cls.URL_PATTERN is not None
+        m = re.match(cls.URL_PATTERN, url, re.IGNORECASE)
         if m:
             d = Downloader(url)
             extension = m.group(1)
@@ -1,4 +1,3 @@
-import re
 from typing import Any, ClassVar, Dict, Optional, Tuple
 
 import papis.downloaders.fallback
@@ -22,6 +21,15 @@ class Downloader(papis.downloaders.fallback.Downloader):
         "hal-cnrs",
         )   # type: ClassVar[Tuple[str, ...]]
 
+    HOSTS = tuple(
+        "{}.archives-ouvertes.fr".format(subdomain)
+        for subdomain in SUPPORTED_ARCHIVES_OUVERTES_SUBDOMAINS
+        )   # type: ClassVar[Tuple[str, ...]]
+    # NOTE: other subdomains of hal.science are not supported
+    URL_PATTERN = r"https?://({})\.science\b".format(
+        "|".join(SUPPORTED_HAL_SCIENCE_SUBDOMAINS)
+        )   # type: ClassVar[Optional[str]]
+
     def __init__(self, url: str) -> None:
         super().__init__(
             url, name="hal",
@@ -29,19 +37,6 @@ class Downloader(papis.downloaders.fallback.Downloader):
             priority=10,
             )
 
-    @classmethod
-    def match(
-            cls, url: str) -> Optional[papis.downloaders.fallback.Downloader]:
-        subdomains = "|".join(cls.SUPPORTED_ARCHIVES_OUVERTES_SUBDOMAINS)
-        if re.match(r".*({})\.archives-ouvertes\.fr.*".format(subdomains), url):
-            return Downloader(url)
-
-        subdomains = r"|".join(cls.SUPPORTED_HAL_SCIENCE_SUBDOMAINS)
-        if re.match(r".*//({})\.science.*".format(subdomains), url):
-            return Downloader(url)
-
-        return None
-
     def get_data(self) -> Dict[str, Any]:
         data = super().get_data()
 
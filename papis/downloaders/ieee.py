@@ -1,11 +1,14 @@
 import re
-from typing import Optional, Tuple, Dict
+from typing import ClassVar, Optional, Tuple, Dict
 
 import papis.downloaders.base
 
 
 class Downloader(papis.downloaders.Downloader):
 
+    HOSTS = ("ieee.org",)  # type: ClassVar[Tuple[str, ...]]
+    URL_PATTERN = r"ieee:"  # type: ClassVar[Optional[str]]
+
     def __init__(self, url: str) -> None:
         super().__init__(url, name="ieee", expected_document_extension="pdf")
 
@@ -15,7 +18,7 @@ class Downloader(papis.downloaders.Downloader):
         if m:
             url = "http://ieeexplore.ieee.org/document/{}".format(m.group(1))
             return Downloader(url)
-        if re.match(r".*ieee.org.*", url):
+        if papis.downloaders.matches_declaration(cls, url):
             url = re.sub(r"\.pdf.*$", "", url)
             return Downloader(url)
         else:
@@ -39,20 +42,13 @@ class Downloader(papis.downloaders.Downloader):
         return bibtex_url, data
 
     def download_bibtex(self) -> None:
-        import urllib.parse
-        import urllib.request
-
         bib_url, values = self._get_bibtex_url()
-        post_data = urllib.parse.urlencode(values).encode("ascii")
-
         self.logger.debug("bibtex url = '%s'", bib_url)
 
-        req = urllib.request.Request(bib_url, post_data)
-        with urllib.request.urlopen(req) as response:
-            data = response.read()
-            text = data.decode("utf-8")
-            text = text.replace("<br>", "")
-            self.bibtex_data = text
+        response = self.session.post(bib_url, data=values)
+        text = response.content.decode("utf-8")
+        text = text.replace("<br>", "")
+        self.bibtex_data = text
 
     def get_document_url(self) -> Optional[str]:
         identifier = self.get_identifier()
@@ -1,10 +1,11 @@
 import re
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 
 import papis.downloaders.base
 
 
 class Downloader(papis.downloaders.Downloader):
+    HOSTS = ("iopscience.iop.org",)  # type: ClassVar[Tuple[str, ...]]
     DOCUMENT_URL = (
         "https://iopscience.iop.org/article/{doi}/pdf"
         )   # type: ClassVar[str]
@@ -24,9 +25,8 @@ class Downloader(papis.downloaders.Downloader):
 
     @classmethod
     def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        url = re.sub(r"/pdf", "", url)
-        if re.match(r".*iopscience\.iop\.org.*", url):
-            return Downloader(url)
+        if papis.downloaders.matches_declaration(cls, url):
+            return Downloader(re.sub(r"/pdf", "", url))
         else:
             return None
 
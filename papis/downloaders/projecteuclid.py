@@ -1,10 +1,11 @@
-import re
-from typing import Optional
+from typing import Optional, ClassVar, Tuple
 
 import papis.downloaders.fallback
 
 
 class Downloader(papis.downloaders.fallback.Downloader):
+
+    HOSTS = ("projecteuclid.org",)  # type: ClassVar[Tuple[str, ...]]
     _BIBTEX_URL = "https://projecteuclid.org/citation/download/citation-{}.bib"
 
     def __init__(self, url: str) -> None:
@@ -14,13 +15,6 @@ class Downloader(papis.downloaders.fallback.Downloader):
             priority=10,
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional["Downloader"]:
-        if re.match(r".*projecteuclid\.org.*", url):
-            return Downloader(url)
-        else:
-            return None
-
     def get_bibtex_url(self) -> Optional[str]:
         try:
             # NOTE: this was determined heuristically by looking at the IDs
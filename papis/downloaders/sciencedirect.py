@@ -1,5 +1,4 @@
-import re
-from typing import Dict, Optional, Any, List
+from typing import Dict, Any, List, ClassVar, Tuple
 
 import papis.document
 import papis.downloaders
@@ -42,19 +41,14 @@ def _parse_author_list(data: Dict[str, Any]) -> List[Dict[str, Any]]:
 
 class Downloader(papis.downloaders.Downloader):
 
+    HOSTS = ("sciencedirect.com",)  # type: ClassVar[Tuple[str, ...]]
+
     def __init__(self, url: str) -> None:
         super().__init__(
             url, name="sciencedirect",
             expected_document_extension="pdf",
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        if re.match(r".*\.sciencedirect\.com.*", url):
-            return Downloader(url)
-        else:
-            return None
-
     def get_data(self) -> Dict[str, Any]:
         soup = self._get_soup()
         data = {}   # type: Dict[str, Any]
@@ -1,25 +1,21 @@
 import re
-from typing import Optional
+from typing import Optional, ClassVar, Tuple
 
 import papis.downloaders.base
 
 
 class Downloader(papis.downloaders.Downloader):
 
+    HOSTS = (
+        "aip.scitation.org", "aapt.scitation.org",
+        )   # type: ClassVar[Tuple[str, ...]]
+
     def __init__(self, url: str) -> None:
         super().__init__(
             url, name="scitationaip",
             expected_document_extension="pdf",
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        # http://aip.scitation.org/doi/10.1063/1.4873138
-        if re.match(r".*(aip|aapt)\.scitation\.org.*", url):
-            return Downloader(url)
-        else:
-            return None
-
     def get_doi(self) -> Optional[str]:
         mdoi = re.match(r".*/doi/(.*/[^?&%^$]*).*", self.uri)
         if mdoi:
@@ -1,11 +1,12 @@
-import re
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 
 import papis.downloaders.base
 import papis.document
 
 
 class Downloader(papis.downloaders.Downloader):
+
+    HOSTS = ("link.springer.com",)  # type: ClassVar[Tuple[str, ...]]
     DOCUMENT_URL = (
         "https://link.springer.com/content/pdf/{doi}.pdf"
         )   # type: ClassVar[str]
@@ -22,10 +23,6 @@ class Downloader(papis.downloaders.Downloader):
             priority=10,
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        return Downloader(url) if re.match(r".*link\.springer.com.*", url) else None
-
     def get_data(self) -> Dict[str, Any]:
         soup = self._get_soup()
         data = papis.downloaders.base.parse_meta_headers(soup)
@@ -1,5 +1,4 @@
-import re
-from typing import Any, ClassVar, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional, Tuple
 
 import papis.document
 import papis.downloaders.base
@@ -37,6 +36,8 @@ def _parse_month(date: str) -> Optional[int]:
 
 
 class Downloader(papis.downloaders.Downloader):
+
+    HOSTS = ("tandfonline.com",)  # type: ClassVar[Tuple[str, ...]]
     DOCUMENT_URL = (
         "http://www.tandfonline.com/doi/pdf/{doi}"
         )   # type: ClassVar[str]
@@ -53,11 +54,6 @@ class Downloader(papis.downloaders.Downloader):
             priority=10,
             )
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        return (Downloader(url)
-                if re.match(r".*tandfonline.com.*", url) else None)
-
     def get_data(self) -> Dict[str, Any]:
         soup = self._get_soup()
         data = papis.downloaders.base.parse_meta_headers(soup)
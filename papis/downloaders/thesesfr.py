@@ -1,21 +1,16 @@
 import re
-from typing import Optional
+from typing import Optional, ClassVar, Tuple
 
 import papis.downloaders.base
 
 
 class Downloader(papis.downloaders.Downloader):
 
+    HOSTS = ("theses.fr",)  # type: ClassVar[Tuple[str, ...]]
+
     def __init__(self, url: str) -> None:
         super().__init__(url, name="thesesfr", expected_document_extension="pdf")
 
-    @classmethod
-    def match(cls, url: str) -> Optional[papis.downloaders.Downloader]:
-        if re.match(r".*theses.fr.*", url):
-            return Downloader(url)
-        else:
-            return None
-
     def get_identifier(self) -> Optional[str]:
         """
         >>> d = Downloader("http://www.theses.fr/2014TOU30305")
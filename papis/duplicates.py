@@ -0,0 +1,278 @@
+"""
+Finding likely duplicate documents
+----------------------------------
+
+Documents that are imported several times from different sources rarely
+have exactly the same metadata, e.g. one may have a DOI and the other an
+arXiv identifier, or their titles may differ in capitalization or a few
+words. This module finds such near-duplicates in a library in two steps
+
+1. **blocking**: documents are grouped into candidate pairs if they have
+   the same normalized DOI, arXiv identifier or ISBN, or if their titles are
+   likely to be similar. The latter uses a MinHash signature of the words in
+   the title with locality-sensitive hashing (LSH), so that the documents
+   are never compared all against all.
+2. **scoring**: each candidate pair is given a score between 0 and 1 from
+   the similarity of their titles, authors and years. Pairs sharing an
+   identifier always have a score of 1.
+
+.. code:: python
+
+    import papis.database
+    import papis.duplicates
+
+    docs = papis.database.get().get_all_documents()
+    for dup in papis.duplicates.find_duplicates(docs, threshold=0.8):
+        print(dup.score, dup.reason, dup.a["title"], dup.b["title"])
+
+The duplicates are reported by the ``near-duplicates`` check of
+``papis doctor`` and can be merged interactively with
+``papis merge --duplicates``.
+"""
+
+import re
+import struct
+import hashlib
+import functools
+import itertools
+import collections
+from typing import (Any, Dict, Iterable, List, NamedTuple, Optional,
+                    Sequence, Set, Tuple)
+
+import papis.document
+import papis.logging
+import papis.utils
+
+logger = papis.logging.get_logger(__name__)
+
+#: Number of bands used for locality-sensitive hashing of the title
+#: signatures. Two titles with a Jaccard similarity of 0.8 end up in the
+#: same bucket of at least one band with a probability of ~0.96.
+LSH_BANDS = 6
+#: Number of rows (hash functions) in each band.
+LSH_ROWS = 4
+#: Buckets with more documents than this are ignored, since they only
+#: contain very common titles (e.g. "Introduction") and would result in a
+#: quadratic number of candidate pairs.
+MAX_BUCKET_SIZE = 64
+
+# NOTE: the 384 bits of a SHA-384 digest give 24 hash values of 16 bits
+_HASH_FORMAT = "<{}H".format(LSH_BANDS * LSH_ROWS)
+assert struct.calcsize(_HASH_FORMAT) <= hashlib.sha384().digest_size
+
+_WORD_RE = re.compile(r"\w+")
+_ARXIV_PREFIX_RE = re.compile(
+    r"^(https?://arxiv\.org/(abs|pdf)/|arxiv:)\s*", re.I)
+_ARXIV_VERSION_RE = re.compile(r"v\d+$")
+
+Duplicate = NamedTuple("Duplicate", [
+    ("a", papis.document.Document),
+    ("b", papis.document.Document),
+    ("score", float),
+    ("reason", str),
+    ])
+
+
+def normalize_arxivid(value: Any) -> Optional[str]:
+    """
+    :returns: the arXiv identifier without any URL or ``arXiv:`` prefixes
+        and without a version, e.g. ``1234.5678v2`` becomes ``1234.5678``.
+    """
+    if not value:
+        return None
+
+    result = _ARXIV_PREFIX_RE.sub("", str(value).strip()).lower()
+    if result.endswith(".pdf"):
+        result = result[:-4]
+
+    return _ARXIV_VERSION_RE.sub("", result) or None
+
+
+def normalize_isbn(value: Any) -> Optional[str]:
+    """
+    :returns: the ISBN without separators. ISBN-10 numbers are converted to
+        ISBN-13, so that both forms of the same book compare equal.
+    """
+    if not value:
+        return None
+
+    result = re.sub(r"[^0-9X]", "", str(value).upper())
+    if len(result) == 10:
+        result = "978" + result[:9]
+        checksum = sum(int(c) * (3 if i % 2 else 1) for i, c in enumerate(result))
+        result += str((10 - checksum % 10) % 10)
+
+    return result or None
+
+
+def normalize_title(value: Any) -> List[str]:
+    """
+    :returns: the case folded words in the title, without any punctuation
+        or BibTeX braces.
+    """
+    if not value:
+        return []
+
+    return _WORD_RE.findall(str(value).casefold())
+
+
+def _get_arxivid(doc: papis.document.Document) -> Optional[str]:
+    for key in ("arxivid", "arxiv"):
+        if doc.get(key):
+            return normalize_arxivid(doc[key])
+
+    if str(doc.get("archiveprefix", "")).lower() == "arxiv":
+        return normalize_arxivid(doc.get("eprint"))
+
+    return None
+
+
+def _get_author_names(doc: papis.document.Document) -> Set[str]:
+    """
+    :returns: the case folded family names of the authors.
+    """
+    author_list = doc.get("author_list")
+    if isinstance(author_list, list) and author_list:
+        return {str(a.get("family", "")).casefold()
+                for a in author_list if isinstance(a, dict)} - {""}
+
+    author = str(doc.get("author", ""))
+    names = set()
+    for name in re.split(r"\s+and\s+", author):
+        name = name.strip()
+        if not name:
+            continue
+
+        # NOTE: either "Family, Given" or "Given Family"
+        family = name.split(",")[0] if "," in name else name.split()[-1]
+        names.add(family.strip().casefold())
+
+    return names
+
+
+def _get_year(doc: papis.document.Document) -> Optional[int]:
+    m = re.search(r"\d{4}", str(doc.get("year", "")))
+    return int(m.group()) if m else None
+
+
+@functools.lru_cache(maxsize=2**16)
+def _get_token_hashes(token: str) -> Tuple[int, ...]:
+    digest = hashlib.sha384(token.encode()).digest()
+    return struct.unpack_from(_HASH_FORMAT, digest)
+
+
+def minhash(tokens: Iterable[str]) -> Tuple[int, ...]:
+    """
+    :returns: the MinHash signature of the set of *tokens*, with
+        ``LSH_BANDS * LSH_ROWS`` values. Each of the values is the minimum of
+        a different hash function over the *tokens*.
+    """
+    hashes = [_get_token_hashes(token) for token in set(tokens)]
+    if not hashes:
+        return ()
+
+    return tuple(map(min, zip(*hashes)))
+
+
+def jaccard(a: Set[Any], b: Set[Any]) -> float:
+    if not a and not b:
+        return 0.0
+
+    return len(a & b) / len(a | b)
+
+
+_Entry = NamedTuple("_Entry", [
+    ("title", Set[str]),
+    ("authors", Set[str]),
+    ("year", Optional[int]),
+    ])
+
+
+def score(a: _Entry, b: _Entry) -> float:
+    """
+    :returns: a similarity score between 0 and 1 for two documents from the
+        similarity of their titles, authors and years.
+    """
+    title = jaccard(a.title, b.title)
+
+    if a.authors and b.authors:
+        authors = jaccard(a.authors, b.authors)
+    else:
+        authors = 0.5
+
+    if a.year is None or b.year is None:
+        year = 0.5
+    else:
+        # NOTE: preprints are often a year older than the published version
+        year = max(0.0, 1.0 - abs(a.year - b.year) / 2)
+
+    return 0.6 * title + 0.25 * authors + 0.15 * year
+
+
+def find_duplicates(
+        documents: Sequence[papis.document.Document],
+        threshold: float = 0.8) -> List[Duplicate]:
+    """Find pairs of likely duplicate documents.
+
+    :param documents: the documents to check, usually the whole library.
+    :param threshold: minimum score of the reported pairs.
+    :returns: a list of duplicate pairs sorted by decreasing score.
+    """
+    entries = []  # type: List[_Entry]
+    blocks = collections.defaultdict(list)  # type: Dict[Tuple[str, Any], List[int]]
+
+    for i, doc in enumerate(documents):
+        words = normalize_title(doc.get("title"))
+        entries.append(_Entry(title=set(words),
+                              authors=_get_author_names(doc),
+                              year=_get_year(doc)))
+
+        doi = papis.utils.normalize_doi(doc.get("doi"))
+        for name, value in (("doi", doi),
+                            ("arxiv", _get_arxivid(doc)),
+                            ("isbn", normalize_isbn(doc.get("isbn")))):
+            if value:
+                blocks[name, value].append(i)
+
+        signature = minhash(words)
+        for band in range(LSH_BANDS if signature else 0):
+            rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+            blocks["title", (band,) + rows].append(i)
+
+    reasons = {}  # type: Dict[Tuple[int, int], str]
+    for (name, value), indices in blocks.items():
+        if len(indices) < 2:
+            continue
+
+        if name == "title" and len(indices) > MAX_BUCKET_SIZE:
+            logger.debug("Skipping %d documents with similar titles: '%s'",
+                         len(indices), documents[indices[0]].get("title"))
+            continue
+
+        for pair in itertools.combinations(indices, 2):
+            if name != "title" or pair not in reasons:
+                reasons[pair] = name
+
+    logger.debug("Scoring %d candidate pairs for %d documents",
+                 len(reasons), len(documents))
+
+    # NOTE: the author and year similarities add at most 0.4 to the score
+    min_title = (threshold - 0.4) / 0.6
+
+    result = []
+    for (i, j), reason in reasons.items():
+        if reason == "title":
+            if jaccard(entries[i].title, entries[j].title) < min_title:
+                continue
+
+            similarity = score(entries[i], entries[j])
+            reason = "similar title, authors and year"
+        else:
+            similarity = 1.0
+            reason = "same {}".format(reason)
+
+        if similarity >= threshold:
+            result.append(Duplicate(a=documents[i], b=documents[j],
+                                    score=similarity, reason=reason))
+
+    return sorted(result, key=lambda d: d.score, reverse=True)
@@ -0,0 +1,63 @@
+"""
+Exporters are declared in the ``papis.exporter`` entry point namespace
+(see :mod:`papis.plugin`) as a function that takes a list of documents and
+returns a string.
+
+Exporters can also produce their output in chunks, so that large libraries
+can be written out without building the whole output in memory. Such an
+exporter is a generator of strings wrapped in :class:`StreamingExporter`,
+e.g.
+
+.. code:: python
+
+    @papis.exporter.streaming
+    def exporter(documents: Iterable[papis.document.Document]) -> Iterator[str]:
+        for doc in documents:
+            yield "{}\\n".format(doc["title"])
+
+The resulting object can still be called as a normal exporter and returns
+the whole output as a single string. Use :func:`export` to get the chunks
+from any exporter, streaming or not.
+"""
+
+from typing import Callable, Iterable, Iterator, List, Union
+
+import papis.document
+
+ExporterStream = Callable[[Iterable[papis.document.Document]], Iterator[str]]
+
+
+class StreamingExporter:
+    """An exporter that produces its output in chunks.
+
+    :param stream: a function that takes the documents and returns an
+        iterator over the chunks of the output.
+    """
+
+    def __init__(self, stream: ExporterStream) -> None:
+        self.stream = stream
+        self.__doc__ = stream.__doc__
+
+    def __call__(self, documents: Iterable[papis.document.Document]) -> str:
+        return "".join(self.stream(documents))
+
+
+def streaming(stream: ExporterStream) -> StreamingExporter:
+    """Decorator turning a generator of output chunks into an exporter."""
+    return StreamingExporter(stream)
+
+
+def export(exporter: Union[StreamingExporter,
+                           Callable[[List[papis.document.Document]], str]],
+           documents: Iterable[papis.document.Document]) -> Iterator[str]:
+    """Get the output of *exporter* for *documents* in chunks.
+
+    Exporters that have a ``stream`` method (see :class:`StreamingExporter`)
+    are streamed, while the output of other exporters is returned as a single
+    chunk.
+    """
+    stream = getattr(exporter, "stream", None)
+    if stream is not None:
+        yield from stream(documents)
+    else:
+        yield str(exporter(list(documents)))
@@ -1,9 +1,10 @@
-from typing import Optional, Union, Any, Dict
+from typing import Optional, Union, Any, Dict, Iterable, Iterator
 
 import papis.config
 import papis.plugin
 import papis.document
 import papis.logging
+import papis.tracing
 from papis.document import Document
 
 logger = papis.logging.get_logger(__name__)
@@ -17,6 +18,46 @@ class InvalidFormatterValue(Exception):
 
 
 class Formater:
+    """Base class for all formatters.
+
+    Formatters that need to parse or compile the format string before using
+    it can implement :meth:`compile` and use :meth:`get_template` in
+    :meth:`format`, so that the compiled template is cached and reused for
+    all the documents formatted with the same format string.
+    """
+
+    #: Maximum number of compiled templates kept by :meth:`get_template`
+    template_cache_size = 128
+
+    def compile(self, fmt: str) -> Any:
+        """Compile the format string *fmt* into a template.
+
+        :returns: an object that is cached by :meth:`get_template`. By
+            default, the format string itself is returned.
+        """
+        return fmt
+
+    def get_template(self, fmt: str) -> Any:
+        """Get the template compiled from *fmt* with :meth:`compile`.
+
+        The compiled templates are cached by format string.
+        """
+        # NOTE: this is not set in __init__ so that subclasses do not need
+        # to call it explicitly
+        cache = self.__dict__.setdefault(
+            "_template_cache", {})  # type: Dict[str, Any]
+
+        try:
+            return cache[fmt]
+        except KeyError:
+            pass
+
+        if len(cache) >= self.template_cache_size:
+            cache.pop(next(iter(cache)))
+
+        template = cache[fmt] = self.compile(fmt)
+        return template
+
     def format(self,
                fmt: str,
                doc: FormatDocType,
@@ -31,6 +72,24 @@ class Formater:
         """
         raise NotImplementedError
 
+    def format_many(self,
+                    fmt: str,
+                    docs: Iterable[FormatDocType],
+                    doc_key: str = "",
+                    additional: Optional[Dict[str, Any]] = None
+                    ) -> Iterator[str]:
+        """Format several documents with the same format string.
+
+        The default implementation calls :meth:`format` for each document,
+        but formatters can override it to avoid any per-call setup.
+
+        :param docs: An iterable of documents
+        :returns: An iterator over the formatted strings, in the same order
+            as *docs*.
+        """
+        for doc in docs:
+            yield self.format(fmt, doc, doc_key=doc_key, additional=additional)
+
 
 class PythonFormater(Formater):
     """Construct a string using a pythonic format string and a document.
@@ -45,8 +104,34 @@ class PythonFormater(Formater):
             additional = {}
 
         doc_name = doc_key or papis.config.getstring("format-doc-name")
-        fdoc = Document()
-        fdoc.update(doc)
+        return self._format(fmt, doc, doc_name, additional)
+
+    def format_many(self,
+                    fmt: str,
+                    docs: Iterable[FormatDocType],
+                    doc_key: str = "",
+                    additional: Optional[Dict[str, Any]] = None
+                    ) -> Iterator[str]:
+        if additional is None:
+            additional = {}
+
+        doc_name = doc_key or papis.config.getstring("format-doc-name")
+        for doc in docs:
+            yield self._format(fmt, doc, doc_name, additional)
+
+    def _format(self,
+                fmt: str,
+                doc: FormatDocType,
+                doc_name: str,
+                additional: Dict[str, Any]) -> str:
+        # NOTE: documents return an empty string for missing keys, so plain
+        # dictionaries are converted
+        if isinstance(doc, Document):
+            fdoc = doc
+        else:
+            fdoc = Document()
+            fdoc.update(doc)
+
         try:
             return fmt.format(**{doc_name: fdoc}, **additional)
         except Exception as exception:
@@ -80,12 +165,37 @@ class Jinja2Formater(Formater):
 
         doc_name = doc_key or papis.config.getstring("format-doc-name")
         try:
-            return str(self.jinja2
-                           .Template(fmt)
-                           .render(**{doc_name: doc}, **additional))
+            return str(self.get_template(fmt).render(**{doc_name: doc},
+                                                     **additional))
         except Exception as exception:
             return str(exception)
 
+    def format_many(self,
+                    fmt: str,
+                    docs: Iterable[FormatDocType],
+                    doc_key: str = "",
+                    additional: Optional[Dict[str, Any]] = None
+                    ) -> Iterator[str]:
+        if additional is None:
+            additional = {}
+
+        doc_name = doc_key or papis.config.getstring("format-doc-name")
+        try:
+            template = self.get_template(fmt)
+        except Exception as exception:
+            for _ in docs:
+                yield str(exception)
+            return
+
+        for doc in docs:
+            try:
+                yield str(template.render(**{doc_name: doc}, **additional))
+            except Exception as exception:
+                yield str(exception)
+
+    def compile(self, fmt: str) -> Any:
+        return self.jinja2.Template(fmt)
+
 
 def _extension_name() -> str:
     return "papis.format"
@@ -97,8 +207,7 @@ def get_formater() -> Formater:
     if _FORMATER is None:
         name = papis.config.getstring("formater")
         try:
-            _FORMATER = papis.plugin.get_extension_manager(
-                _extension_name())[name].plugin()
+            _FORMATER = papis.plugin.get_plugin(_extension_name(), name)()
         except KeyError:
             logger.error("Invalid formatter: %s", name)
             raise InvalidFormatterValue(
@@ -109,9 +218,29 @@ def get_formater() -> Formater:
     return _FORMATER
 
 
+@papis.tracing.traced("format")
 def format(fmt: str,
            doc: FormatDocType,
            doc_key: str = "",
            additional: Optional[Dict[str, Any]] = None) -> str:
     formater = get_formater()
     return formater.format(fmt, doc, doc_key=doc_key, additional=additional)
+
+
+def format_many(fmt: str,
+                docs: Iterable[FormatDocType],
+                doc_key: str = "",
+                additional: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """Format all documents in *docs* with the same format string.
+
+    This is faster than calling :func:`format` for each document, since the
+    format string is only processed once by the formatter.
+
+    :returns: An iterator over the formatted strings, in the same order as
+        *docs*.
+    """
+    formater = get_formater()
+    with papis.tracing.span("format.many"):
+        yield from formater.format_many(fmt, docs,
+                                        doc_key=doc_key,
+                                        additional=additional)
@@ -0,0 +1,329 @@
+"""
+HTTP cache
+----------
+
+An opt-in cache for HTTP responses.
+
+When the :ref:`http-cache <config-settings-http-cache>` setting is enabled,
+successful ``GET`` responses from the importers and downloaders are stored in
+the ``http`` folder of the cache directory. This avoids hitting the same servers
+again, e.g. when retrying a failed ``papis add`` or running the same
+``papis explore`` command twice.
+
+* Responses are reused without any request for
+  :ref:`http-cache-ttl <config-settings-http-cache-ttl>` seconds.
+* After that, if the server sent an ``ETag`` or ``Last-Modified`` header, a
+  conditional request is made and the stored response is reused if the
+  server answers with ``304 Not Modified``.
+* The total size of the stored responses is kept under
+  :ref:`http-cache-max-size <config-settings-http-cache-max-size>` megabytes
+  by removing the least recently used responses.
+
+The cache is implemented as a transport adapter for :mod:`requests`. It is
+used by the shared session of :mod:`papis.httpclient` and it can be added to
+any other session with :func:`mount`
+
+.. code:: python
+
+    import requests
+    import papis.httpcache
+
+    session = papis.httpcache.mount(requests.Session())
+    response = session.get("https://arxiv.org/abs/1234.5678")
+    print(getattr(response, "from_cache", False))
+
+Streamed responses (``stream=True``), other methods than ``GET`` and
+responses with a ``Cache-Control: no-store`` header are never stored. Requests
+with a ``Cache-Control: no-store`` header bypass the cache entirely, e.g. for
+responses that are only valid for a short time.
+"""
+
+import os
+import time
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import requests
+import requests.adapters
+import requests.structures
+
+import papis.config
+import papis.utils
+import papis.logging
+
+if TYPE_CHECKING:
+    from requests import PreparedRequest, Response
+
+logger = papis.logging.get_logger(__name__)
+
+#: Version of the format of the stored responses.
+HTTP_CACHE_VERSION = 1
+
+# NOTE: these headers describe the raw body, but the stored content is the
+# decoded body of the response
+_IGNORED_HEADERS = frozenset([
+    "content-encoding", "content-length", "transfer-encoding", "connection",
+    "keep-alive", "set-cookie",
+    ])
+# NOTE: request headers that can change the contents of the response
+_KEY_HEADERS = ("Accept", "Accept-Language", "Authorization", "Cookie")
+
+# NOTE: total size of the stored responses in each cache folder, which is
+# computed once per process and then updated on every save, so that the folder
+# is only scanned again when it grows over the maximum size
+_CACHE_SIZE = {}  # type: Dict[str, int]
+
+
+def is_enabled() -> bool:
+    return papis.config.getboolean("http-cache") is True
+
+
+def get_cache_dir() -> str:
+    """
+    :returns: the folder where the responses are stored.
+    """
+    return os.path.join(papis.utils.get_cache_home(), "http")
+
+
+def clear() -> None:
+    """Remove all the stored responses."""
+    import shutil
+
+    cache_dir = get_cache_dir()
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+
+    _CACHE_SIZE.pop(cache_dir, None)
+
+
+def _get_request_key(request: "PreparedRequest") -> str:
+    h = hashlib.sha256()
+    h.update("{} {}".format(request.method, request.url).encode())
+    for name in _KEY_HEADERS:
+        value = request.headers.get(name, "")
+        if isinstance(value, str):
+            value = value.encode()
+
+        h.update("\n{}: ".format(name).encode() + value)
+
+    return h.hexdigest()
+
+
+def _load(path: str) -> Optional[Dict[str, Any]]:
+    import pickle
+
+    try:
+        with open(path, "rb") as fd:
+            entry = pickle.load(fd)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.debug("Could not load cached response '%s': %s", path, exc)
+        return None
+
+    if entry.get("version") != HTTP_CACHE_VERSION:
+        return None
+
+    return dict(entry)
+
+
+def _save(path: str, entry: Dict[str, Any]) -> None:
+    import pickle
+
+    data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = "{}.{}".format(path, os.getpid())
+    try:
+        old_size = os.path.getsize(path)
+    except OSError:
+        old_size = 0
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as fd:
+            fd.write(data)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.debug("Could not save cached response '%s': %s", path, exc)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+
+    cache_dir = os.path.dirname(path)
+    if cache_dir in _CACHE_SIZE:
+        _CACHE_SIZE[cache_dir] += len(data) - old_size
+
+
+def _touch(path: str) -> None:
+    # NOTE: the modification time is used to find the least recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _scan(cache_dir: str) -> List[Tuple[float, int, str]]:
+    entries = []  # type: List[Tuple[float, int, str]]
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except FileNotFoundError:
+        pass
+
+    return entries
+
+
+def _get_cache_size(cache_dir: str) -> int:
+    if cache_dir not in _CACHE_SIZE:
+        _CACHE_SIZE[cache_dir] = sum(size for _, size, _ in _scan(cache_dir))
+
+    return _CACHE_SIZE[cache_dir]
+
+
+def evict(max_size: Optional[float] = None) -> int:
+    """Remove the least recently used responses until their total size is
+    under *max_size*.
+
+    :param max_size: maximum size in megabytes, defaults to
+        :ref:`http-cache-max-size <config-settings-http-cache-max-size>`.
+    :returns: the number of removed responses.
+    """
+    if max_size is None:
+        max_size = papis.config.getfloat("http-cache-max-size") or 0.0
+
+    max_bytes = int(max_size * 1024 * 1024)
+    cache_dir = get_cache_dir()
+
+    entries = _scan(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    _CACHE_SIZE[cache_dir] = total
+    if total <= max_bytes:
+        return 0
+
+    nremoved = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+
+        total -= size
+        nremoved += 1
+
+    _CACHE_SIZE[cache_dir] = total
+    logger.debug("Removed %d responses from the HTTP cache", nremoved)
+    return nremoved
+
+
+class CachingAdapter(requests.adapters.HTTPAdapter):
+    """A transport adapter that stores successful ``GET`` responses in
+    :func:`get_cache_dir`.
+
+    Responses that are served from the cache have a ``from_cache`` attribute
+    set to *True*.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+
+        if ttl is None:
+            ttl = papis.config.getfloat("http-cache-ttl") or 0.0
+        self.ttl = ttl
+
+    def _to_response(self,
+                     request: "PreparedRequest",
+                     entry: Dict[str, Any]) -> "Response":
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = requests.structures.CaseInsensitiveDict(
+            entry["headers"])
+        response._content = entry["content"]
+        response.url = str(request.url)
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        response.connection = self
+        setattr(response, "from_cache", True)
+
+        return response
+
+    def send(self,                                      # type: ignore[override]
+             request: "PreparedRequest",
+             stream: bool = False,
+             **kwargs: Any) -> "Response":
+        request_cache_control = request.headers.get("Cache-Control", "")
+        if isinstance(request_cache_control, bytes):
+            request_cache_control = request_cache_control.decode("latin-1")
+
+        if (request.method != "GET" or stream
+                or "no-store" in request_cache_control.lower()):
+            return super().send(request, stream=stream, **kwargs)
+
+        path = os.path.join(get_cache_dir(), _get_request_key(request))
+        entry = _load(path)
+
+        if entry is not None:
+            if time.time() - entry["time"] < self.ttl:
+                logger.debug("Using cached response for '%s'", request.url)
+                _touch(path)
+                return self._to_response(request, entry)
+
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            logger.debug("Cached response for '%s' is still valid", request.url)
+            entry["time"] = time.time()
+            _save(path, entry)
+            return self._to_response(request, entry)
+
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if response.status_code != 200 or "no-store" in cache_control:
+            return response
+
+        _save(path, {
+            "version": HTTP_CACHE_VERSION,
+            "url": request.url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {key: value for key, value in response.headers.items()
+                        if key.lower() not in _IGNORED_HEADERS},
+            "content": response.content,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "time": time.time(),
+            })
+
+        # NOTE: the folder is only scanned when the size goes over the
+        # maximum, and then some room is made for the next responses
+        max_size = papis.config.getfloat("http-cache-max-size") or 0.0
+        if _get_cache_size(get_cache_dir()) > max_size * 1024 * 1024:
+            evict(0.9 * max_size)
+
+        return response
+
+
+def mount(session: requests.Session) -> requests.Session:
+    """Add the cache to *session* if
+    :ref:`http-cache <config-settings-http-cache>` is enabled.
+
+    :returns: the same *session*.
+    """
+    if is_enabled():
+        adapter = CachingAdapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    return session
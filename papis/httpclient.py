@@ -0,0 +1,464 @@
+"""
+HTTP client
+-----------
+
+All the network access in papis (importers, downloaders, Crossref, arXiv,
+PubMed, etc.) goes through a single :class:`requests.Session` returned by
+:func:`get_session`. Sharing the session means that connections are kept
+alive and reused for all the requests to the same host, which makes bulk
+operations much faster than opening a new TCP/TLS connection for each request.
+
+The session
+
+* sends the :ref:`user-agent <config-settings-user-agent>` header and uses the
+  :ref:`downloader-proxy <config-settings-downloader-proxy>`, if any;
+* keeps a pool of
+  :ref:`http-pool-size <config-settings-http-pool-size>` connections for
+  each host;
+* gives up on requests after :ref:`http-timeout <config-settings-http-timeout>`
+  seconds, unless a different ``timeout`` is given or a shorter one is set
+  for the current thread with :func:`request_timeout`;
+* retries idempotent requests up to
+  :ref:`http-max-retries <config-settings-http-max-retries>` times with an
+  exponential backoff on connection errors, ``429 Too Many Requests``
+  and server errors, honouring any ``Retry-After`` header;
+* stores responses in the HTTP cache if it is enabled (see
+  :mod:`papis.httpcache`).
+
+.. code:: python
+
+    import papis.httpclient
+
+    response = papis.httpclient.get("https://arxiv.org/abs/1234.5678")
+
+Files (e.g. the documents fetched by the downloaders) should be retrieved
+with :func:`download` instead, which streams them to disk in chunks. An
+interrupted download is kept in the ``downloads`` folder of the cache
+directory and is resumed with an HTTP ``Range`` request, both when retrying
+and the next time the same URL is downloaded.
+"""
+
+import os
+import time
+import hashlib
+import threading
+import contextlib
+from typing import Any, Dict, Iterator, NamedTuple, Optional, TYPE_CHECKING
+
+import requests
+import requests.adapters
+
+import papis.config
+import papis.httpcache
+import papis.utils
+import papis.logging
+
+if TYPE_CHECKING:
+    from requests import Response
+    from urllib3.util.retry import Retry
+
+logger = papis.logging.get_logger(__name__)
+
+#: Backoff factor (in seconds) used between retries of failed requests. The
+#: delay before the *n*-th retry is ``HTTP_BACKOFF_FACTOR * 2 ** (n - 1)``.
+HTTP_BACKOFF_FACTOR = 0.5
+#: HTTP status codes of the responses that are retried.
+HTTP_RETRY_STATUS = frozenset([429, 500, 502, 503, 504])
+#: Size (in bytes) of the chunks in which files are downloaded.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+Download = NamedTuple("Download", [
+    ("path", str),
+    ("size", int),
+    ("sha256", str),
+    ("content_type", Optional[str]),
+    ])
+
+_SESSION = None  # type: Optional[requests.Session]
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+class RateLimiter:
+    """A thread-safe limiter that spaces out calls to :meth:`wait` so that at
+    most *rate* of them return each second.
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Session(requests.Session):
+    """A :class:`requests.Session` with a default timeout for all requests."""
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self,                                   # type: ignore[override]
+                method: str,
+                url: str,
+                **kwargs: Any) -> "Response":
+        timeout = kwargs.get("timeout", self.timeout)
+        max_timeout = getattr(_LOCAL, "timeout", None)
+        if max_timeout is not None and (
+                timeout is None
+                or (isinstance(timeout, (int, float)) and timeout > max_timeout)):
+            timeout = max_timeout
+
+        kwargs["timeout"] = timeout
+        return super().request(method, url, **kwargs)
+
+
+@contextlib.contextmanager
+def request_timeout(timeout: Optional[float]) -> Iterator[None]:
+    """Limit the timeout of the requests made by the current thread with a
+    :class:`Session` to *timeout* seconds in this context.
+
+    Note that the timeout applies to connecting and to each read from the
+    server, not to the whole request.
+
+    :param timeout: maximum timeout (in seconds), or *None* to not limit it.
+    """
+    previous = getattr(_LOCAL, "timeout", None)
+    _LOCAL.timeout = timeout
+    try:
+        yield
+    finally:
+        _LOCAL.timeout = previous
+
+
+def _get_retry(max_retries: int) -> "Retry":
+    from urllib3.util.retry import Retry
+
+    kwargs = {
+        "total": max_retries,
+        "backoff_factor": HTTP_BACKOFF_FACTOR,
+        "status_forcelist": HTTP_RETRY_STATUS,
+        "respect_retry_after_header": True,
+        "raise_on_status": False,
+        }  # type: Dict[str, Any]
+
+    try:
+        return Retry(allowed_methods=Retry.DEFAULT_ALLOWED_METHODS, **kwargs)
+    except (TypeError, AttributeError):
+        # NOTE: urllib3 < 1.26 calls them `method_whitelist`
+        return Retry(**kwargs)
+
+
+def new_session() -> Session:
+    """Create a new session with the settings described in
+    :mod:`papis.httpclient`.
+
+    Most code should use the shared session from :func:`get_session`
+    instead, so that connections are reused.
+    """
+    timeout = papis.config.getfloat("http-timeout")
+    pool_size = papis.config.getint("http-pool-size") or 10
+    max_retries = papis.config.getint("http-max-retries") or 0
+
+    session = Session(timeout=timeout)
+    session.headers["User-Agent"] = papis.config.getstring("user-agent")
+
+    proxy = papis.config.get("downloader-proxy")
+    if proxy is not None:
+        session.proxies = {"http": proxy, "https": proxy}
+
+    kwargs = {
+        "pool_connections": pool_size,
+        "pool_maxsize": pool_size,
+        "max_retries": _get_retry(max_retries),
+        }  # type: Dict[str, Any]
+
+    adapter = (
+        papis.httpcache.CachingAdapter(**kwargs)
+        if papis.httpcache.is_enabled()
+        else requests.adapters.HTTPAdapter(**kwargs)
+        )  # type: requests.adapters.HTTPAdapter
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    :returns: the session shared by all the network code in papis. It is
+        created the first time it is needed.
+    """
+    global _SESSION
+
+    with _LOCK:
+        if _SESSION is None:
+            _SESSION = new_session()
+
+        return _SESSION
+
+
+def reset_session() -> None:
+    """Close the shared session, e.g. so that a new one is created with the
+    current configuration the next time it is needed.
+    """
+    global _SESSION
+
+    with _LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+
+        _SESSION = None
+
+
+def get(url: str, **kwargs: Any) -> "Response":
+    """Send a ``GET`` request with the shared session.
+
+    :param kwargs: any arguments accepted by :meth:`requests.Session.get`.
+    """
+    return get_session().get(url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> "Response":
+    """Send a ``POST`` request with the shared session.
+
+    :param kwargs: any arguments accepted by :meth:`requests.Session.post`.
+    """
+    return get_session().post(url, **kwargs)
+
+
+def get_download_dir() -> str:
+    """
+    :returns: the folder where partial downloads are kept.
+    """
+    return os.path.join(papis.utils.get_cache_home(), "downloads")
+
+
+def clear_downloads() -> None:
+    """Remove all the partial downloads."""
+    import shutil
+
+    download_dir = get_download_dir()
+    if os.path.exists(download_dir):
+        shutil.rmtree(download_dir)
+
+
+def get_partial_download_path(url: str) -> str:
+    """
+    :returns: the file where the download of *url* is stored until it is
+        complete.
+    """
+    name = hashlib.sha256(url.encode()).hexdigest()
+    return os.path.join(get_download_dir(), "{}.part".format(name))
+
+
+def _hash_file(path: str) -> "hashlib._Hash":
+    h = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for chunk in iter(lambda: fd.read(DOWNLOAD_CHUNK_SIZE), b""):
+            h.update(chunk)
+
+    return h
+
+
+def _get_validator(response: "Response") -> Optional[str]:
+    # NOTE: weak entity tags cannot be used in If-Range
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return str(etag)
+
+    return response.headers.get("Last-Modified")
+
+
+def _load_validator(part_path: str) -> Optional[str]:
+    import json
+
+    try:
+        with open("{}.json".format(part_path)) as fd:
+            data = json.load(fd)  # type: Dict[str, Optional[str]]
+    except (OSError, ValueError):
+        return None
+
+    return data.get("validator")
+
+
+def _save_validator(part_path: str, url: str, validator: Optional[str]) -> None:
+    import json
+
+    with open("{}.json".format(part_path), "w") as fd:
+        json.dump({"url": url, "validator": validator}, fd)
+
+
+def _remove(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _download_part(url: str,
+                   part_path: str,
+                   resume: bool,
+                   session: requests.Session,
+                   max_retries: int,
+                   **kwargs: Any) -> Download:
+    h = hashlib.sha256()
+    size = 0
+    validator = None
+
+    if resume and os.path.exists(part_path):
+        validator = _load_validator(part_path)
+        if validator is None:
+            logger.debug("Discarding partial download of '%s': the server "
+                         "did not identify its version", url)
+        else:
+            h = _hash_file(part_path)
+            size = os.path.getsize(part_path)
+
+    # NOTE: ranges refer to the encoded content, so it must not be compressed
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers["Accept-Encoding"] = "identity"
+
+    content_type = None
+    nretries = 0
+    while True:
+        if size and validator is not None:
+            logger.debug("Resuming download of '%s' from byte %d", url, size)
+            headers["Range"] = "bytes={}-".format(size)
+            headers["If-Range"] = validator
+        else:
+            h, size = hashlib.sha256(), 0
+            headers.pop("Range", None)
+            headers.pop("If-Range", None)
+
+        response = None
+        try:
+            response = session.get(url, stream=True, headers=headers, **kwargs)
+            if response.status_code == 416 and size:
+                # NOTE: the partial download is no longer valid
+                validator = None
+                continue
+
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type")
+
+            if size and response.status_code != 206:
+                logger.debug("Partial download of '%s' is out of date or the "
+                             "server does not support resuming it", url)
+                h, size = hashlib.sha256(), 0
+
+            if not size:
+                validator = _get_validator(response)
+                if resume:
+                    _save_validator(part_path, url, validator)
+
+            with open(part_path, "ab" if size else "wb") as fd:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    fd.write(chunk)
+                    h.update(chunk)
+                    size += len(chunk)
+        except (requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError) as exc:
+            nretries += 1
+            if nretries > max_retries:
+                logger.error("Download of '%s' failed after %d bytes: %s",
+                             url, size, exc)
+                raise
+
+            logger.info("Download of '%s' interrupted, resuming: %s", url, exc)
+            time.sleep(HTTP_BACKOFF_FACTOR * 2 ** (nretries - 1))
+            continue
+        finally:
+            if response is not None:
+                response.close()
+
+        break
+
+    return Download(path=part_path, size=size, sha256=h.hexdigest(),
+                    content_type=content_type)
+
+
+def download(url: str,
+             path: Optional[str] = None,
+             session: Optional[requests.Session] = None,
+             max_retries: Optional[int] = None,
+             **kwargs: Any) -> Download:
+    """Download *url* into a file.
+
+    The response is streamed to disk in chunks of ``DOWNLOAD_CHUNK_SIZE``
+    bytes and hashed as it arrives, so the file is never held in memory. If
+    the connection is lost, the download is resumed from where it stopped
+    with a ``Range`` request (if the server supports it).
+
+    Partial downloads are resumed only if the server identified the version
+    of the file (with an ``ETag`` or ``Last-Modified`` header), which is sent
+    back in an ``If-Range`` header, so that a file that changed in the
+    meantime is downloaded again from the start. If the same URL is already
+    being downloaded (e.g. by another process), the file is downloaded
+    separately without resuming.
+
+    :param path: the file where the download is saved, defaults to a new
+        temporary file.
+    :param session: the session used for the requests, defaults to the
+        shared session from :func:`get_session`.
+    :param max_retries: number of times an interrupted download is resumed,
+        defaults to :ref:`http-max-retries <config-settings-http-max-retries>`.
+    :param kwargs: any other arguments accepted by :meth:`requests.Session.get`.
+    :returns: the path, size, SHA-256 digest and content type of the file.
+    :raises requests.HTTPError: if the server answers with an error status.
+    """
+    import shutil
+    import tempfile
+
+    if session is None:
+        session = get_session()
+
+    if max_retries is None:
+        max_retries = papis.config.getint("http-max-retries") or 0
+
+    part_path = get_partial_download_path(url)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+
+    # NOTE: the lock file is removed by clear_downloads if it is left behind
+    lock_path = "{}.lock".format(part_path)
+    try:
+        os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        locked = True
+    except FileExistsError:
+        logger.debug("'%s' is already being downloaded: not resuming it", url)
+        fd, part_path = tempfile.mkstemp(suffix=".part", dir=get_download_dir())
+        os.close(fd)
+        locked = False
+
+    try:
+        result = _download_part(url, part_path,
+                                resume=locked,
+                                session=session,
+                                max_retries=max_retries,
+                                **kwargs)
+
+        if path is None:
+            fd, path = tempfile.mkstemp()
+            os.close(fd)
+
+        shutil.move(part_path, path)
+        _remove("{}.json".format(part_path))
+    except BaseException:
+        # NOTE: private partial downloads cannot be resumed later
+        if not locked:
+            _remove(part_path)
+        raise
+    finally:
+        if locked:
+            _remove(lock_path)
+
+    return result._replace(path=path)
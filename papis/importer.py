@@ -1,14 +1,20 @@
 import os.path
-from typing import Optional, List, Dict, Any, Callable, Type, TYPE_CHECKING
+import time
+from typing import (Optional, List, Dict, Any, Callable, NamedTuple, Sequence,
+                    Tuple, Type, TYPE_CHECKING)
 
 import papis
+import papis.config
 import papis.plugin
 import papis.logging
 
 
 if TYPE_CHECKING:
+    from concurrent.futures import Future
     from stevedore import ExtensionManager
 
+logger = papis.logging.get_logger(__name__)
+
 
 class Context:
     def __init__(self) -> None:
@@ -113,7 +119,8 @@ def get_importer_by_name(name: str) -> Type[Importer]:
     :param name: Name of the importer
     :returns: The importer
     """
-    imp = get_import_mgr()[name].plugin  # type: Type[Importer]
+    imp = papis.plugin.get_plugin(
+        _extension_name(), name)  # type: Type[Importer]
     return imp
 
 
@@ -130,3 +137,219 @@ def cache(fun: Callable[[Importer], Any]) -> Callable[[Importer], Any]:
         if not self.ctx:
             fun(self)
     return wrapper
+
+
+#: Priority of the importers that do not define one. This is the same as the
+#: default priority of a :class:`papis.downloaders.Downloader`.
+DEFAULT_PRIORITY = 1
+
+MatchResult = NamedTuple("MatchResult", [
+    ("name", str),
+    ("importer", Optional[Importer]),
+    ("status", str),
+    ("elapsed", float),
+    ])
+
+
+def _get_priority(importer: Importer) -> int:
+    return int(getattr(importer, "priority", DEFAULT_PRIORITY))
+
+
+def _is_downloader(importer: Importer) -> bool:
+    # NOTE: only downloaders have a priority, see papis.downloaders.Downloader
+    return hasattr(importer, "priority")
+
+
+def _is_superseded(importer: Importer, best_priority: Optional[int]) -> bool:
+    """
+    :returns: *True* if *importer* is a downloader with a lower priority than
+        the best downloader fetched so far. Other importers provide their own
+        metadata and are never superseded by a downloader.
+    """
+    return (best_priority is not None
+            and _is_downloader(importer)
+            and _get_priority(importer) < best_priority)
+
+
+def _get_class_name(importer_cls: Type[Importer]) -> str:
+    return "{}.{}".format(importer_cls.__module__, importer_cls.__name__)
+
+
+def _run_match(importer_cls: Type[Importer],
+               match: Callable[[Type[Importer]], Optional[Importer]],
+               key: int,
+               starts: Dict[int, float],
+               timeout: Optional[float]) -> Optional[Importer]:
+    import papis.httpclient
+
+    starts[key] = time.perf_counter()
+    try:
+        with papis.httpclient.request_timeout(timeout):
+            return match(importer_cls)
+    except NotImplementedError:
+        return None
+
+
+def _run_fetch(importer: Importer, timeout: Optional[float]) -> None:
+    import papis.httpclient
+
+    with papis.httpclient.request_timeout(timeout):
+        importer.fetch()
+
+
+def fetch_matching_importers(
+        importer_classes: Sequence[Type[Importer]],
+        match: Callable[[Type[Importer]], Optional[Importer]],
+        timeout: Optional[float] = None,
+        max_workers: Optional[int] = None) -> List[MatchResult]:
+    """Match and fetch several importers concurrently.
+
+    Each of the *importer_classes* is matched with *match* (e.g. a call to
+    :meth:`Importer.match` or :meth:`Importer.match_data`) and the matching
+    importers are then fetched, all in a thread pool. Once a downloader
+    is successfully fetched, all downloaders with a lower priority (see
+    :attr:`papis.downloaders.Downloader.priority`) are cancelled, since
+    they would only provide less specific data, e.g. the generic downloaders
+    once a downloader for the publisher of the document succeeded. Other
+    importers (e.g. for DOIs or arXiv identifiers) are never cancelled.
+
+    :param importer_classes: a list of importer (or downloader) classes.
+    :param match: a function returning a matching importer for a class.
+    :param timeout: maximum time (in seconds) allowed for matching and
+        fetching each importer, defaults to ``importer-timeout``.
+        Importers that take longer are abandoned: their results are ignored,
+        but, since threads cannot be interrupted, they keep running in the
+        background and the interpreter waits for them before exiting. To
+        keep this short, their HTTP requests are also made with at most this
+        timeout (see :func:`papis.httpclient.request_timeout`).
+    :param max_workers: maximum number of concurrent importers, defaults to
+        ``importer-max-workers``.
+    :returns: a result for each of the *importer_classes*, with the status
+        of the importer (``fetched``, ``no match``, ``failed``, ``timeout``
+        or ``cancelled``) and the time spent on it. The results are sorted
+        by decreasing priority of the importers.
+    """
+    from concurrent.futures import (ThreadPoolExecutor, wait,
+                                    FIRST_COMPLETED)
+
+    if timeout is None:
+        timeout = papis.config.getfloat("importer-timeout") or 0.0
+    if max_workers is None:
+        max_workers = papis.config.getint("importer-max-workers") or 1
+
+    request_timeout = timeout if timeout > 0 else None
+
+    starts = {}  # type: Dict[int, float]
+    names = [_get_class_name(cls) for cls in importer_classes]
+    status = ["cancelled"] * len(importer_classes)
+    elapsed = [0.0] * len(importer_classes)
+    importers = [None] * len(importer_classes)  # type: List[Optional[Importer]]
+    best_priority = None  # type: Optional[int]
+
+    def finish(key: int, result: str) -> None:
+        status[key] = result
+        if key in starts:
+            elapsed[key] = time.perf_counter() - starts[key]
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    # NOTE: futures for matching have no importer, futures for fetching do
+    futures = {}  # type: Dict[Future[Any], Tuple[int, Optional[Importer]]]
+    for key, importer_cls in enumerate(importer_classes):
+        future = executor.submit(_run_match, importer_cls, match, key, starts,
+                                 request_timeout)
+        futures[future] = (key, None)
+
+    while futures:
+        now = time.perf_counter()
+        deadlines = [starts[key] + timeout
+                     for key, _ in futures.values() if key in starts]
+        wait_time = max(0.0, min(deadlines) - now) if deadlines else timeout
+        done, _ = wait(list(futures),
+                       timeout=wait_time if timeout > 0 else None,
+                       return_when=FIRST_COMPLETED)
+
+        for future in done:
+            key, importer = futures.pop(future)
+            exc = future.exception()
+            if exc is not None:
+                logger.error("Importer '%s' failed: %s", names[key], exc)
+                finish(key, "failed")
+            elif importer is None:
+                # NOTE: the match has finished, so start fetching
+                importer = future.result()
+                if importer is None:
+                    finish(key, "no match")
+                    continue
+
+                names[key] = importer.name
+                if _is_superseded(importer, best_priority):
+                    finish(key, "cancelled")
+                    continue
+
+                logger.info("%s {c.Back.BLACK}{c.Fore.GREEN}matches %s"
+                            "{c.Style.RESET_ALL}", importer.uri, importer.name)
+                future = executor.submit(_run_fetch, importer, request_timeout)
+                futures[future] = (key, importer)
+            else:
+                importers[key] = importer
+                finish(key, "fetched")
+
+                priority = _get_priority(importer)
+                if _is_downloader(importer) and (
+                        best_priority is None or priority > best_priority):
+                    best_priority = priority
+
+        if best_priority is not None:
+            for future, (key, importer) in list(futures.items()):
+                if importer is not None and _is_superseded(importer,
+                                                           best_priority):
+                    future.cancel()
+                    del futures[future]
+                    finish(key, "cancelled")
+
+        if timeout > 0:
+            now = time.perf_counter()
+            for future, (key, _) in list(futures.items()):
+                if key in starts and now - starts[key] > timeout:
+                    logger.warning("Importer '%s' timed out after %.1fs",
+                                   names[key], timeout)
+                    future.cancel()
+                    del futures[future]
+                    finish(key, "timeout")
+
+    # NOTE: do not wait for the importers that timed out, they are left to
+    # finish in the background (with their requests limited by the timeout)
+    executor.shutdown(wait=False)
+
+    for key, importer in enumerate(importers):
+        # NOTE: lower priority downloaders may have finished before the best one
+        if importer is not None and _is_superseded(importer, best_priority):
+            importers[key] = None
+            status[key] = "cancelled"
+
+        logger.debug("Importer '%s': %s in %.3fs",
+                     names[key], status[key], elapsed[key])
+
+    results = [
+        MatchResult(name=names[key],
+                    importer=importers[key],
+                    status=status[key],
+                    elapsed=elapsed[key])
+        for key in range(len(importer_classes))]
+
+    return sorted(results, key=lambda r: (
+        r.importer is None,
+        -_get_priority(r.importer) if r.importer is not None else 0))
+
+
+def log_timings(results: Sequence[MatchResult]) -> None:
+    """Log the time spent on each importer that matched, from the slowest
+    to the fastest.
+    """
+    matched = [r for r in results if r.status != "no match"]
+    if not matched:
+        return
+
+    logger.info("Importer timings:\n%s", "\n".join(
+        "    {:<40.40} {:>10} {:8.2f}s".format(r.name, r.status, r.elapsed)
+        for r in sorted(matched, key=lambda r: -r.elapsed)))
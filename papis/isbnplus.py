@@ -60,14 +60,13 @@ An example of successful returns:
     ...
 """
 import urllib.parse
-import urllib.request
 from typing import List, Dict, Any
 
 import click
 import bs4
 
-import papis.config
 import papis.document
+import papis.httpclient
 import papis.logging
 
 logger = papis.logging.get_logger(__name__)
@@ -107,13 +106,9 @@ def get_data(query: str = "",
                                      if v})
     req_url = ISBNPLUS_BASEURL + "search?" + params
     logger.debug("url = '%s'", req_url)
-    url = urllib.request.Request(
-        req_url,
-        headers={"User-Agent": papis.config.getstring("user-agent")}
-    )
-
-    with urllib.request.urlopen(url) as req:
-        xmldoc = req.read()
+    response = papis.httpclient.get(req_url)
+    response.raise_for_status()
+    xmldoc = response.content
 
     root = bs4.BeautifulSoup(xmldoc, "html.parser")
 
@@ -1,16 +1,23 @@
-from typing import List
+from typing import Iterable, Iterator
 
 import click
 
 import papis.document
+import papis.exporter
 import papis.logging
 
 logger = papis.logging.get_logger(__name__)
 
 
-def exporter(documents: List[papis.document.Document]) -> str:
+@papis.exporter.streaming
+def exporter(documents: Iterable[papis.document.Document]) -> Iterator[str]:
     import json
-    return json.dumps([papis.document.to_dict(doc) for doc in documents])
+
+    # NOTE: this produces the same output as dumping the whole list at once
+    yield "["
+    for i, doc in enumerate(documents):
+        yield ("" if i == 0 else ", ") + json.dumps(papis.document.to_dict(doc))
+    yield "]"
 
 
 @click.command("json")
@@ -7,6 +7,7 @@ import papis.config
 import papis.document
 import papis.plugin
 import papis.logging
+import papis.tracing
 
 logger = papis.logging.get_logger(__name__)
 
@@ -33,11 +34,12 @@ def _extension_name() -> str:
 
 def get_picker(name: str) -> Type[Picker[Option]]:
     """Get the picker named 'name' declared as a plugin"""
-    picker = papis.plugin.get_extension_manager(
-        _extension_name())[name].plugin  # type: Type[Picker[Option]]
+    picker = papis.plugin.get_plugin(
+        _extension_name(), name)  # type: Type[Picker[Option]]
     return picker
 
 
+@papis.tracing.traced("pick")
 def pick(
         options: Sequence[Option],
         default_index: int = 0,
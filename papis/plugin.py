@@ -54,9 +54,31 @@ and install the package in the system.
 The ``extension_manager`` will be able to access the provided functions
 in the package if they have been declared in the entry points of
 the ``setup.py`` script of the named package.
+
+Plugin registry
+---------------
+
+Creating an ``ExtensionManager`` imports every plugin declared in its
+namespace, which is expensive when only the names of the plugins, or a
+single one of them, are needed. For this reason papis keeps an on-disk
+registry of all the entry points declared in ``papis.*`` namespaces (and of
+the external ``papis-*`` scripts found in the ``PATH``) in the cache
+directory. The registry is keyed on the entry point metadata of the
+installed packages, so it gets rebuilt automatically whenever a package is
+installed, updated or removed, and can be cleared by hand with
+:func:`clear_registry`. If a plugin cannot be loaded, the registry is also
+rebuilt once in case it is out of date.
+
+Use :func:`get_available_entrypoints` to list the names of the plugins
+in a namespace and :func:`get_plugin` to load a single one of them
+without loading the whole namespace.
 """
 
-from typing import List, Dict, Any, TYPE_CHECKING
+import os
+import sys
+import json
+import glob
+from typing import List, Dict, Any, Optional, Iterator, Tuple, TYPE_CHECKING
 
 import papis.logging
 
@@ -66,6 +88,11 @@ if TYPE_CHECKING:
 logger = papis.logging.get_logger(__name__)
 
 MANAGERS = {}  # type: Dict[str, ExtensionManager]
+PLUGINS = {}  # type: Dict[Tuple[str, str], Any]
+
+#: Version of the registry file format, bump when it changes
+REGISTRY_VERSION = 1
+_REGISTRY = None  # type: Optional[Dict[str, Any]]
 
 
 def stevedore_error_handler(manager: "ExtensionManager",
@@ -81,7 +108,9 @@ def _load_extensions(namespace: str) -> None:
     MANAGERS[namespace] = ExtensionManager(
         namespace=namespace,
         invoke_on_load=False,
-        verify_requirements=True,
+        # NOTE: requirements are checked by the installer, re-checking them
+        # here goes through pkg_resources and is slow for large environments
+        verify_requirements=False,
         propagate_map_exceptions=True,
         on_load_failure_callback=stevedore_error_handler
     )
@@ -97,8 +126,235 @@ def get_extension_manager(namespace: str) -> "ExtensionManager":
 
 
 def get_available_entrypoints(namespace: str) -> List[str]:
-    return list(
-        map(str, get_extension_manager(namespace).entry_points_names()))
+    """Get the names of all the plugins declared in *namespace*.
+
+    The names are taken from the plugin registry, so no plugin is loaded.
+    """
+    return list(get_entrypoints(namespace))
+
+
+def get_plugin(namespace: str, name: str) -> Any:
+    """Load a single plugin from *namespace*.
+
+    If the extension manager for *namespace* was already created, the plugin
+    is taken from there, otherwise only the module declaring the plugin is
+    imported.
+
+    If the plugin is not found in the registry or cannot be imported, the
+    registry is rebuilt once and the plugin is loaded again, in case the
+    registry was out of date.
+
+    :raises KeyError: if no plugin called *name* is declared in *namespace*.
+    """
+    manager = MANAGERS.get(namespace)
+    if manager is not None:
+        return manager[name].plugin
+
+    key = (namespace, name)
+    if key in PLUGINS:
+        return PLUGINS[key]
+
+    try:
+        value = get_entrypoints(namespace)[name]
+        PLUGINS[key] = _load_entrypoint_value(value)
+    except (KeyError, ImportError, AttributeError) as exc:
+        logger.debug("Could not load plugin '%s' from '%s' (%s): rebuilding "
+                     "the plugin registry", name, namespace, exc)
+        clear_registry()
+
+        value = get_entrypoints(namespace)[name]
+        try:
+            PLUGINS[key] = _load_entrypoint_value(value)
+        except Exception as exc:
+            logger.error("Error while loading entrypoint '%s'", value)
+            logger.error(exc)
+            raise
+
+    return PLUGINS[key]
+
+
+def _load_entrypoint_value(value: str) -> Any:
+    import importlib
+
+    module_name, _, attrs = value.partition(":")
+    obj = importlib.import_module(module_name.strip())
+    for attr in attrs.split("[")[0].strip().split("."):
+        if attr:
+            obj = getattr(obj, attr)
+
+    return obj
+
+
+def _iter_all_entrypoints() -> Iterator[Tuple[str, str, str]]:
+    """Iterate over all installed entry points in ``papis.*`` namespaces.
+
+    :returns: an iterator over tuples ``(namespace, name, value)``, where
+        value is given in the usual ``module:attribute`` format.
+    """
+    try:
+        from importlib.metadata import distributions
+    except ImportError:
+        import pkg_resources  # type: ignore
+        for dist in pkg_resources.working_set:
+            for group, eps in dist.get_entry_map().items():
+                if not group.startswith("papis."):
+                    continue
+
+                for ep in eps.values():
+                    yield (group, ep.name, "{}:{}".format(
+                        ep.module_name, ".".join(ep.attrs)))
+        return
+
+    for dist in distributions():
+        for ep in dist.entry_points:
+            if ep.group.startswith("papis."):
+                yield ep.group, ep.name, ep.value
+
+
+def _get_registry_key() -> str:
+    """Compute a key that identifies the entry points of the installed
+    packages.
+
+    This uses the modification time of the folders in ``sys.path``, which
+    change whenever a package is installed or removed from them, and of the
+    ``entry_points.txt`` files in the ``.dist-info`` and ``.egg-info``
+    metadata folders, which change when a package is updated in place (e.g.
+    editable installs).
+    """
+    import hashlib
+
+    h = hashlib.md5(sys.version.encode())
+    for path in sys.path:
+        path = path or "."
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+
+        h.update("{}:{}".format(path, mtime).encode())
+        if not os.path.isdir(path):
+            continue
+
+        for pattern in ("*.dist-info", "*.egg-info"):
+            for filename in sorted(glob.glob(
+                    os.path.join(path, pattern, "entry_points.txt"))):
+                try:
+                    mtime = os.stat(filename).st_mtime
+                except OSError:
+                    continue
+
+                h.update("{}:{}".format(filename, mtime).encode())
+
+    return h.hexdigest()
+
+
+def get_registry_path() -> str:
+    """
+    :returns: the path to the file storing the plugin registry.
+    """
+    import papis.utils
+    return os.path.join(papis.utils.get_cache_home(), "plugins.json")
+
+
+def _save_registry(registry: Dict[str, Any]) -> None:
+    path = get_registry_path()
+    tmp_path = "{}.{}".format(path, os.getpid())
+    try:
+        with open(tmp_path, "w") as fd:
+            json.dump(registry, fd)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.debug("Could not save plugin registry to '%s': %s", path, exc)
+
+
+def _get_registry() -> Dict[str, Any]:
+    global _REGISTRY
+    if _REGISTRY is not None:
+        return _REGISTRY
+
+    key = _get_registry_key()
+    path = get_registry_path()
+
+    try:
+        with open(path) as fd:
+            registry = json.load(fd)  # type: Dict[str, Any]
+    except (OSError, ValueError):
+        registry = {}
+
+    if (registry.get("version") != REGISTRY_VERSION
+            or registry.get("key") != key):
+        logger.debug("Building plugin registry in '%s'", path)
+
+        entrypoints = {}  # type: Dict[str, Dict[str, str]]
+        for namespace, name, value in _iter_all_entrypoints():
+            entrypoints.setdefault(namespace, {}).setdefault(name, value)
+
+        registry = {
+            "version": REGISTRY_VERSION,
+            "key": key,
+            "entrypoints": entrypoints,
+            "scripts": registry.get("scripts", {}),
+            }
+        _save_registry(registry)
+
+    _REGISTRY = registry
+    return registry
+
+
+def get_entrypoints(namespace: str) -> Dict[str, str]:
+    """Get all entry points declared in *namespace*.
+
+    :returns: a mapping from the plugin name to the ``module:attribute``
+        value of its entry point.
+    """
+    result = _get_registry()["entrypoints"].get(namespace, {})
+    return dict(result)
+
+
+def get_executables(paths: List[str], pattern: str) -> List[str]:
+    """Get the files in the folders *paths* matching the glob *pattern*.
+
+    The results are stored in the plugin registry for each folder and only
+    recomputed when the modification time of the folder changes.
+
+    :returns: a list of matching files, in the order of *paths*.
+    """
+    registry = _get_registry()
+    scripts = registry["scripts"]
+
+    result = []  # type: List[str]
+    modified = False
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+
+        cache_key = "{}:{}".format(path, pattern)
+        entry = scripts.get(cache_key)
+        if entry is None or entry["mtime"] != mtime:
+            entry = {"mtime": mtime,
+                     "files": sorted(glob.glob(os.path.join(path, pattern)))}
+            scripts[cache_key] = entry
+            modified = True
+
+        result.extend(entry["files"])
+
+    if modified:
+        _save_registry(registry)
+
+    return result
+
+
+def clear_registry() -> None:
+    """Remove the plugin registry, so that it is rebuilt on next use."""
+    global _REGISTRY
+    _REGISTRY = None
+
+    path = get_registry_path()
+    if os.path.exists(path):
+        logger.debug("Removing plugin registry '%s'", path)
+        os.remove(path)
 
 
 def get_available_plugins(namespace: str) -> List[Any]:
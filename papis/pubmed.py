@@ -69,31 +69,25 @@ def is_valid_pmid(pmid: str) -> bool:
     if not pmid.isdigit():
         return False
 
-    import urllib
-    url = PUBMED_URL.format(pmid=pmid, database=PUBMED_DATABASE)
-    request = urllib.request.Request(url)
+    import requests
+    import papis.httpclient
 
-    from urllib.error import HTTPError, URLError
+    url = PUBMED_URL.format(pmid=pmid, database=PUBMED_DATABASE)
     try:
-        urllib.request.urlopen(request)
-    except (HTTPError, URLError):
+        response = papis.httpclient.get(url)
+    except requests.RequestException:
         return False
 
-    return True
+    return response.ok
 
 
 def get_data(query: str = "") -> Dict[str, Any]:
     # NOTE: being nice and using the project version as a user agent
     # as requested in https://api.ncbi.nlm.nih.gov/lit/ctxp
-    import requests
-    headers = requests.structures.CaseInsensitiveDict({
-        "user-agent": "papis/{}".format(papis.__version__)
-        })
-
-    session = requests.Session()
-    session.headers = headers       # type: ignore[assignment]
-    response = session.get(PUBMED_URL.format(
-        pmid=query.strip(), database=PUBMED_DATABASE))
+    import papis.httpclient
+    response = papis.httpclient.get(
+        PUBMED_URL.format(pmid=query.strip(), database=PUBMED_DATABASE),
+        headers={"User-Agent": "papis/{}".format(papis.__version__)})
 
     import json
     return pubmed_data_to_papis_data(json.loads(response.content.decode()))
@@ -0,0 +1,195 @@
+"""
+Lightweight tracing of the hot paths in papis.
+
+Tracing is disabled by default and can be enabled by setting the
+``PAPIS_TRACE`` environment variable to a file name or by passing
+``--trace FILE`` to the ``papis`` command. When enabled, the duration of
+the instrumented code paths (crawling the library, parsing ``info.yaml``
+files, loading and saving the cache, parsing queries, filtering, formatting,
+sorting, picking, exporting, etc.) is recorded and written to the given file
+when papis exits, in the Chrome trace event JSON format. The resulting file
+can be inspected with ``chrome://tracing`` or
+`Perfetto <https://ui.perfetto.dev>`__ and attached to reports about slow
+commands.
+
+Code paths are instrumented with the :func:`span` context manager or the
+:func:`traced` decorator, e.g.
+
+.. code:: python
+
+    import papis.tracing
+
+    with papis.tracing.span("crawl", folder=folder):
+        ...
+
+    @papis.tracing.traced("yaml.parse")
+    def yaml_to_data(yaml_path: str) -> Dict[str, Any]:
+        ...
+
+When tracing is disabled both of these only check a global flag. Note that
+only events from the main process are recorded, so work done in a
+multiprocessing pool (e.g. through :func:`papis.utils.parmap`) only shows up
+in the span enclosing the pool.
+"""
+
+import os
+import time
+import functools
+import threading
+from typing import (Any, Callable, Dict, Iterator, List, Optional, TypeVar,
+                    cast)
+from contextlib import contextmanager
+
+import papis.logging
+
+logger = papis.logging.get_logger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+#: Environment variable used to enable tracing
+TRACE_ENV_VARIABLE = "PAPIS_TRACE"
+
+_TRACE_FILE = None  # type: Optional[str]
+_EVENTS = []  # type: List[Dict[str, Any]]
+_STATS = {}  # type: Dict[str, Dict[str, float]]
+_START_TIME = 0.0
+
+
+def _now() -> float:
+    """
+    :returns: time since tracing started in microseconds.
+    """
+    return 1.0e6 * (time.perf_counter() - _START_TIME)
+
+
+def is_enabled() -> bool:
+    return _TRACE_FILE is not None
+
+
+def enable(filename: str) -> None:
+    """Start recording events that will be written to *filename* on exit.
+    """
+    global _TRACE_FILE, _START_TIME
+    if _TRACE_FILE is not None:
+        _TRACE_FILE = filename
+        return
+
+    import atexit
+
+    logger.debug("Writing trace events to '%s'", filename)
+    _TRACE_FILE = filename
+    _START_TIME = time.perf_counter()
+    atexit.register(save)
+
+
+def disable() -> None:
+    """Stop recording events and discard the recorded ones."""
+    global _TRACE_FILE
+    _TRACE_FILE = None
+    _EVENTS.clear()
+    _STATS.clear()
+
+
+def enable_from_environment() -> None:
+    """Enable tracing if the ``PAPIS_TRACE`` environment variable is set."""
+    filename = os.environ.get(TRACE_ENV_VARIABLE)
+    if filename:
+        enable(filename)
+
+
+def _add_event(name: str, start: float, args: Dict[str, Any]) -> None:
+    duration = _now() - start
+    event = {
+        "name": name,
+        "cat": name.split(".")[0],
+        "ph": "X",
+        "ts": start,
+        "dur": duration,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        }
+    if args:
+        event["args"] = {key: str(value) for key, value in args.items()}
+
+    _EVENTS.append(event)
+
+    stats = _STATS.setdefault(name, {"count": 0, "total_ms": 0.0})
+    stats["count"] += 1
+    stats["total_ms"] += duration / 1000.0
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """Record the duration of the enclosed block under *name*.
+
+    :param name: name of the span. The part before the first dot is used as
+        the category of the event, e.g. ``cache.load`` is in ``cache``.
+    :param args: additional information stored with the event.
+    """
+    if _TRACE_FILE is None:
+        yield
+        return
+
+    start = _now()
+    try:
+        yield
+    finally:
+        _add_event(name, start, args)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator recording the duration of every call to the function
+    under *name* (see :func:`span`).
+    """
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _TRACE_FILE is None:
+                return fn(*args, **kwargs)
+
+            start = _now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _add_event(name, start, {})
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def get_stats() -> Dict[str, Dict[str, float]]:
+    """
+    :returns: a dictionary with the number of calls (``count``) and the total
+        time in milliseconds (``total_ms``) spent in each span.
+    """
+    return {name: dict(stats) for name, stats in _STATS.items()}
+
+
+def save(filename: Optional[str] = None) -> None:
+    """Write the recorded events to *filename* in the Chrome trace event
+    format. The per-span statistics from :func:`get_stats` are written to
+    the ``otherData`` field.
+    """
+    filename = filename or _TRACE_FILE
+    if filename is None:
+        return
+
+    import json
+    import papis
+
+    data = {
+        "traceEvents": _EVENTS,
+        "displayTimeUnit": "ms",
+        "otherData": {
+            "version": papis.__version__,
+            "stats": get_stats(),
+            },
+        }
+
+    logger.debug("Saving %d trace events to '%s'", len(_EVENTS), filename)
+    with open(filename, "w") as fd:
+        json.dump(data, fd)
+
+
+enable_from_environment()
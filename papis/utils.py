@@ -3,8 +3,8 @@ import sys
 import re
 import pathlib
 from itertools import count, product
-from typing import (Optional, List, Iterator, Any, Dict,
-                    Union, Callable, TypeVar)
+from typing import (Optional, List, Iterable, Iterator, Any, Dict,
+                    Union, Callable, TypeVar, Deque)
 
 try:
     import multiprocessing.synchronize  # noqa: F401
@@ -21,12 +21,15 @@ import papis.document
 import papis.database
 import papis.defaults
 import papis.logging
+import papis.tracing
 
 logger = papis.logging.get_logger(__name__)
 
 A = TypeVar("A")
 B = TypeVar("B")
 
+_DOI_PREFIX_RE = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:)\s*", re.I)
+
 
 def has_multiprocessing() -> bool:
     return HAS_MULTIPROCESSING
@@ -48,6 +51,32 @@ def parmap(f: Callable[[A], B],
         return list(map(f, xs))
 
 
+def parmap_iter(f: Callable[[A], B],
+                xs: Iterable[A],
+                np: Optional[int] = None) -> Iterator[B]:
+    """Similar to :func:`parmap`, but the results are yielded in order as
+    soon as they are available instead of being collected in a list.
+
+    Only a few items per process are taken from *xs* ahead of the results,
+    so that it can be a lazy iterator over large inputs.
+    """
+    if has_multiprocessing() and sys.platform != "darwin":
+        np = np or os.cpu_count() or 1
+        np = int(os.environ.get("PAPIS_NP", str(np)))
+        with Pool(np) as pool:
+            import collections
+            pending = collections.deque()  # type: Deque[Any]
+            for x in xs:
+                pending.append(pool.apply_async(f, (x,)))
+                if len(pending) >= 2 * np:
+                    yield pending.popleft().get()
+
+            while pending:
+                yield pending.popleft().get()
+    else:
+        yield from map(f, xs)
+
+
 def general_open(file_name: str,
                  key: str,
                  default_opener: Optional[str] = None,
@@ -107,6 +136,7 @@ def open_file(file_path: str, wait: bool = True) -> None:
     general_open(file_name=file_path, key="opentool", wait=wait)
 
 
+@papis.tracing.traced("crawl")
 def get_folders(folder: str) -> List[str]:
     """This is the main indexing routine. It looks inside ``folder`` and crawls
     the whole directory structure in search for subfolders containing an info
@@ -210,6 +240,7 @@ def locate_document(
     return None
 
 
+@papis.tracing.traced("crawl.documents")
 def folders_to_documents(folders: List[str]) -> List[papis.document.Document]:
     """Turn folders into documents, this step is quite critical for performance
 
@@ -248,31 +279,34 @@ def get_cache_home() -> str:
 
 def get_matching_importer_or_downloader(matching_string: str
                                         ) -> List[papis.importer.Importer]:
-    importers = []  # type: List[papis.importer.Importer]
+    """Find the importers and downloaders matching *matching_string* and
+    fetch them concurrently (see
+    :func:`papis.importer.fetch_matching_importers`).
+
+    :returns: the fetched importers, sorted by decreasing priority.
+    """
+    # NOTE: only the downloaders whose declarations match are tried, so that
+    # the cost does not depend on the number of installed downloaders
     _imps = papis.importer.get_importers()
-    _downs = papis.downloaders.get_available_downloaders()
+    _downs = papis.downloaders.get_candidate_downloaders(matching_string)
     _all_importers = list(_imps) + list(_downs)
-    for importer_cls in _all_importers:
-        logger.debug("trying with importer "
-                     "{c.Back.BLACK}{c.Fore.YELLOW}%s{c.Style.RESET_ALL}",
-                     importer_cls)
-        try:
-            importer = importer_cls.match(
-                matching_string)  # type: Optional[papis.importer.Importer]
-        except Exception as e:
-            logger.error(e)
-            continue
-        if importer:
-            logger.info(
-                "%s {c.Back.BLACK}{c.Fore.GREEN}matches %s{c.Style.RESET_ALL}",
-                matching_string, importer.name)
-            try:
-                importer.fetch()
-            except Exception as e:
-                logger.error(e)
-            else:
-                importers.append(importer)
-    return importers
+
+    results = papis.importer.fetch_matching_importers(
+        _all_importers, lambda cls: cls.match(matching_string))
+    papis.importer.log_timings(results)
+
+    return [r.importer for r in results if r.importer is not None]
+
+
+def normalize_doi(value: Any) -> Optional[str]:
+    """
+    :returns: the lower case DOI without any ``https://doi.org/`` or ``doi:``
+        prefixes.
+    """
+    if not value:
+        return None
+
+    return _DOI_PREFIX_RE.sub("", str(value).strip()).lower() or None
 
 
 def update_doc_from_data_interactively(
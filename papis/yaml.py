@@ -1,5 +1,5 @@
 import os
-from typing import Optional, List, Dict, Any, Sequence
+from typing import Optional, Dict, Any, Sequence, Iterable, Iterator
 
 import yaml                                 # lgtm [py/import-and-import-from]
 import click
@@ -8,7 +8,9 @@ import papis.utils
 import papis.config
 import papis.importer
 import papis.document
+import papis.exporter
 import papis.logging
+import papis.tracing
 
 # NOTE: try to use the CLoader when possible, as it's a lot faster than the
 # python version, at least at the time of writing
@@ -57,16 +59,19 @@ def list_to_path(data: Sequence[Dict[str, Any]], filepath: str) -> None:
         yaml.dump_all(data, fdd, allow_unicode=True)
 
 
-def exporter(documents: List[papis.document.Document]) -> str:
+@papis.exporter.streaming
+def exporter(documents: Iterable[papis.document.Document]) -> Iterator[str]:
     """
     Returns a yaml string containing all documents in the input list.
     """
-    string = yaml.dump_all(
-        [papis.document.to_dict(document) for document in documents],
-        allow_unicode=True)
-    return str(string)
+    # NOTE: this produces the same output as dumping the whole list at once
+    for i, document in enumerate(documents):
+        yield str(yaml.dump(papis.document.to_dict(document),
+                            allow_unicode=True,
+                            explicit_start=i > 0))
 
 
+@papis.tracing.traced("yaml.parse")
 def yaml_to_data(
         yaml_path: str,
         raise_exception: bool = False) -> Dict[str, Any]:
@@ -88,8 +88,6 @@ setup(
         "bibtexparser<1.4.0; python_version<'3.6'",
         "bibtexparser>=0.6.2; python_version>='3.6'",
         "click>=7.0.0",
-        "habanero<1.2.0; python_version<'3.6'",
-        "habanero>=0.6.0; python_version>='3.6'",
         "isbnlib>=3.9.1",
         "prompt_toolkit>=2.0.5",
         "tqdm>=4.1",
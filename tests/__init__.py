@@ -19,6 +19,7 @@ class MockDownloader(Downloader):
             document_data: Optional[bytes] = None):
         self.bibtex_data = bibtex_data
         self.document_data = document_data
+        self.document_file = None
 
 
 def create_random_pdf(suffix: str = "", prefix: str = "") -> str:
@@ -9,8 +9,11 @@ import papis.config
 import papis.crossref
 from papis.commands.add import (
     run, cli,
+    run_from_list,
     get_file_name,
-    get_hash_folder
+    get_hash_folder,
+    get_list_state_path,
+    _load_list_state,
 )
 from tests import (
     create_random_pdf, create_random_file, create_random_epub,
@@ -151,6 +154,76 @@ class TestRun(tests.cli.TestWithLibrary):
             self.assertIsNot(doc, None)
             self.assertEqual(len(doc.get_files()), number_of_files)
 
+    @patch("papis.utils.get_matching_importer_or_downloader", lambda x: [])
+    def test_from_list(self):
+        pdfs = [create_random_pdf() for _ in range(3)]
+        missing = "/path/does/not/exist.pdf"
+        items = pdfs + [missing]
+
+        summary = run_from_list(
+            items, data=dict(author="Leibniz", title="Monadology"))
+        self.assertEqual(summary.added, 3)
+        self.assertEqual(summary.failed, 1)
+        self.assertTrue(os.path.exists(get_list_state_path(items)))
+
+        db = papis.database.get()
+        docs = db.query_dict(dict(author="Leibniz"))
+        self.assertEqual(len(docs), 3)
+        self.assertEqual(len({doc.get_main_folder() for doc in docs}), 3)
+
+        # only the failed item is retried
+        summary = run_from_list(
+            items, data=dict(author="Leibniz", title="Monadology"))
+        self.assertEqual(summary.skipped, 3)
+        self.assertEqual(summary.added, 0)
+        self.assertEqual(summary.failed, 1)
+        self.assertEqual(len(db.query_dict(dict(author="Leibniz"))), 3)
+
+    @patch("papis.utils.get_matching_importer_or_downloader", lambda x: [])
+    def test_from_list_duplicates(self):
+        pdfs = [create_random_pdf() for _ in range(2)]
+
+        summary = run_from_list(
+            pdfs, data=dict(author="Spinoza", doi="10.1000/ethics"))
+        self.assertEqual(summary.added, 1)
+        self.assertEqual(summary.duplicates, 1)
+        self.assertFalse(os.path.exists(get_list_state_path(pdfs)))
+
+        db = papis.database.get()
+        self.assertEqual(len(db.query_dict(dict(author="Spinoza"))), 1)
+
+    def test_from_list_interrupt(self):
+        pdfs = [create_random_pdf() for _ in range(10)]
+        fetched = []
+
+        def get_importers(item):
+            fetched.append(item)
+            if item == pdfs[1]:
+                raise KeyboardInterrupt
+            return []
+
+        with patch("papis.utils.get_matching_importer_or_downloader",
+                   get_importers):
+            with self.assertRaises(KeyboardInterrupt):
+                run_from_list(pdfs, data=dict(author="Hume"), max_workers=1)
+
+        # NOTE: only a few items are fetched ahead of the interruption
+        self.assertLess(len(fetched), 5)
+
+        # NOTE: the documents added before the interruption are committed
+        status, pending = _load_list_state(get_list_state_path(pdfs))
+        self.assertEqual(pending, [])
+        self.assertEqual(
+            len(papis.database.get().query_dict(dict(author="Hume"))),
+            list(status.values()).count("added"))
+
+        with patch("papis.utils.get_matching_importer_or_downloader",
+                   lambda x: []):
+            summary = run_from_list(pdfs, data=dict(author="Hume"))
+        self.assertEqual(summary.skipped + summary.added, 10)
+        self.assertEqual(
+            len(papis.database.get().query_dict(dict(author="Hume"))), 10)
+
 
 class TestCli(tests.cli.TestCli):
 
@@ -172,6 +245,25 @@ class TestCli(tests.cli.TestCli):
         self.assertEqual(len(docs), 1)
         self.assertEqual(len(docs[0].get_files()), 0)
 
+    @patch("papis.utils.get_matching_importer_or_downloader", lambda x: [])
+    def test_from_list(self):
+        pdfs = [create_random_pdf() for _ in range(2)]
+        result = self.invoke([
+            "-s", "author", "Descartes",
+            "--from-list", "-"
+        ], input="# meditations\n{}\n\n{}\n".format(*pdfs))
+        self.assertEqual(result.exit_code, 0)
+
+        db = papis.database.get()
+        docs = db.query_dict(dict(author="Descartes"))
+        self.assertEqual(len(docs), 2)
+
+    def test_from_list_options(self):
+        for flag in ("--git", "--fetch-citations", "--open", "--edit"):
+            result = self.invoke([flag, "--from-list", "-"], input="")
+            self.assertEqual(result.exit_code, 2)
+            self.assertIn(flag, result.output)
+
     def test_link(self):
         pdf = create_random_pdf()
         result = self.invoke([
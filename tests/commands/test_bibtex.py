@@ -0,0 +1,146 @@
+import os
+import tempfile
+
+import papis.bibtex
+import papis.database
+from papis.commands.bibtex import cli
+
+import tests.cli
+
+UNIQUE_BIBTEX = """
+@article{Einstein1905,
+  title = {On the Electrodynamics of Moving Bodies},
+  doi = {10.1002/andp.19053221004},
+  year = {1905},
+}
+
+@article{Einstein1905a,
+  title = {On the  electrodynamics of {Moving} Bodies},
+  doi = {https://doi.org/10.1002/ANDP.19053221004},
+  year = {1905},
+}
+
+@article{Einstein1905b,
+  title = {Does the Inertia of a Body Depend Upon Its Energy Content?},
+  doi = {10.1002/andp.19053231314},
+  year = {1905},
+}
+"""
+
+
+class TestCli(tests.cli.TestCli):
+
+    cli = cli
+
+    def test_main(self):
+        self.do_test_cli_function_exists()
+        self.do_test_help()
+
+    def _run_unique(self, *args):
+        with tempfile.TemporaryDirectory() as d:
+            bibfile = os.path.join(d, "refs.bib")
+            with open(bibfile, "w") as fd:
+                fd.write(UNIQUE_BIBTEX)
+
+            outfile = os.path.join(d, "unique.bib")
+            dupfile = os.path.join(d, "duplicates.bib")
+            result = self.invoke([
+                "--no-auto-read", "read", bibfile,
+                "unique", *args, "-o", dupfile,
+                "save", "--force", outfile])
+            self.assertEqual(result.exit_code, 0)
+
+            return (
+                [d["ref"] for d in papis.bibtex.bibtex_to_dict(outfile)],
+                [d["ref"] for d in papis.bibtex.bibtex_to_dict(dupfile)])
+
+    def test_unique(self):
+        unique, duplicates = self._run_unique("-k", "doi")
+        self.assertEqual(len(unique), 3)
+        self.assertEqual(duplicates, [])
+
+        unique, duplicates = self._run_unique("-k", "doi", "--normalize")
+        self.assertEqual(unique, ["Einstein1905", "Einstein1905b"])
+        self.assertEqual(duplicates, ["Einstein1905a"])
+
+        unique, duplicates = self._run_unique(
+            "-k", "title", "-k", "year", "--normalize")
+        self.assertEqual(unique, ["Einstein1905", "Einstein1905b"])
+        self.assertEqual(duplicates, ["Einstein1905a"])
+
+        unique, duplicates = self._run_unique("-k", "year")
+        self.assertEqual(unique, ["Einstein1905"])
+        self.assertEqual(len(duplicates), 2)
+
+    def test_filter_cited(self):
+        with tempfile.TemporaryDirectory() as d:
+            bibfile = os.path.join(d, "refs.bib")
+            with open(bibfile, "w") as fd:
+                fd.write(UNIQUE_BIBTEX)
+
+            texfile = os.path.join(d, "main.tex")
+            with open(texfile, "w") as fd:
+                fd.write("\\cite{Einstein1905b}\n% \\cite{Einstein1905}\n")
+
+            outfile = os.path.join(d, "cited.bib")
+            result = self.invoke([
+                "--no-auto-read", "read", bibfile,
+                "filter-cited", "-f", texfile,
+                "save", "--force", outfile])
+            self.assertEqual(result.exit_code, 0)
+
+            refs = [d["ref"] for d in papis.bibtex.bibtex_to_dict(outfile)]
+            self.assertEqual(refs, ["Einstein1905b"])
+
+    def test_sync(self):
+        db = papis.database.get()
+        doc, = db.query_dict({"title": "The open society"})
+        doc["ref"] = "Popper1945"
+        doc.save()
+        db.update(doc)
+
+        # NOTE: documents without a ref are cited by their generated key
+        other, = db.query_dict({"title": "Freedom from the known"})
+        self.assertNotIn("ref", other)
+        other_ref = papis.bibtex.create_reference(other)
+
+        with tempfile.TemporaryDirectory() as d:
+            auxfile = os.path.join(d, "main.aux")
+            with open(auxfile, "w") as fd:
+                fd.write("\\relax\n\\@input{chapter.aux}\n\\citation{Missing}\n")
+
+            with open(os.path.join(d, "chapter.aux"), "w") as fd:
+                fd.write("\\relax\n\\citation{Popper1945}\n"
+                         "\\citation{%s}\n" % other_ref)
+
+            bibfile = os.path.join(d, "refs.bib")
+            result = self.invoke([
+                "--no-auto-read", "sync", "-o", bibfile, auxfile])
+            self.assertEqual(result.exit_code, 0)
+
+            refs = [d["ref"] for d in papis.bibtex.bibtex_to_dict(bibfile)]
+            self.assertEqual(sorted(refs), sorted(["Popper1945", other_ref]))
+
+            # NOTE: the file is not rewritten if nothing changed
+            mtime = os.path.getmtime(bibfile)
+            with open(bibfile, "a") as fd:
+                fd.write("% modified\n")
+            os.utime(bibfile, (mtime, mtime))
+
+            result = self.invoke([
+                "--no-auto-read", "sync", "-o", bibfile, auxfile])
+            self.assertEqual(result.exit_code, 0)
+            with open(bibfile) as fd:
+                self.assertIn("% modified", fd.read())
+
+            doc["volume"] = "II"
+            doc.save()
+            db.update(doc)
+
+            result = self.invoke([
+                "--no-auto-read", "sync", "-o", bibfile, auxfile])
+            self.assertEqual(result.exit_code, 0)
+
+            bib, = [d for d in papis.bibtex.bibtex_to_dict(bibfile)
+                    if d["ref"] == "Popper1945"]
+            self.assertEqual(bib["volume"], "II")
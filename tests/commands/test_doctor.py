@@ -0,0 +1,96 @@
+import unittest.mock
+
+import papis.database
+import papis.commands.doctor
+from papis.commands.doctor import cli, run_many
+
+import tests.cli
+
+
+class TestRun(tests.cli.TestWithLibrary):
+
+    def test_run_many_cache(self) -> None:
+        checks = ["files", "keys-exist", "key-type-check"]
+        docs = papis.database.get().get_all_documents()
+        papis.commands.doctor.clear_results()
+
+        with unittest.mock.patch.object(
+                papis.commands.doctor, "_get_check_errors",
+                wraps=papis.commands.doctor._get_check_errors) as mock, \
+                unittest.mock.patch.object(
+                    papis.commands.doctor, "run",
+                    wraps=papis.commands.doctor.run) as run_mock:
+            errors = run_many(docs, checks)
+            self.assertEqual(mock.call_count, len(docs))
+            # NOTE: the failing documents are not checked again
+            self.assertEqual(run_mock.call_count, 0)
+
+            mock.reset_mock()
+            self.assertEqual(
+                [(e.name, e.path) for e in run_many(docs, checks)],
+                [(e.name, e.path) for e in errors])
+            self.assertEqual(mock.call_count, 0)
+
+            doc = docs[0]
+            doc["ref"] = "DoctorTest2023"
+            doc["year"] = 2023
+            doc.save()
+
+            mock.reset_mock()
+            new_errors = run_many(docs, checks)
+            self.assertEqual(mock.call_count, 1)
+            self.assertFalse([e for e in new_errors
+                              if e.path == doc.get_main_folder()])
+
+    def test_run_many_cache_checks(self) -> None:
+        import pickle
+
+        docs = papis.database.get().get_all_documents()
+        papis.commands.doctor.clear_results()
+        run_many(docs, ["files", "keys-exist"])
+
+        # add results for a removed document
+        path = papis.commands.doctor.get_results_path()
+        with open(path, "rb") as fd:
+            results = pickle.load(fd)
+        results["documents"]["/removed/document"] = ((1, 2, 3), {"files": True})
+        with open(path, "wb") as fd:
+            pickle.dump(results, fd)
+
+        with unittest.mock.patch.object(
+                papis.commands.doctor, "_get_check_errors",
+                wraps=papis.commands.doctor._get_check_errors) as mock:
+            run_many(docs, ["files", "refs"])
+            self.assertEqual(mock.call_count, len(docs))
+            self.assertTrue(all(args[0][1] == ["refs"]
+                                for args, _ in mock.call_args_list))
+
+        with open(path, "rb") as fd:
+            results = pickle.load(fd)
+        self.assertNotIn("/removed/document", results["documents"])
+        self.assertEqual(set(results["checks"]), {"files", "keys-exist", "refs"})
+
+    def test_run_many_parallel(self) -> None:
+        checks = ["files", "keys-exist", "key-type-check"]
+        docs = papis.database.get().get_all_documents()
+
+        papis.commands.doctor.clear_results()
+        errors = run_many(docs, checks, use_cache=False)
+
+        with unittest.mock.patch.object(
+                papis.commands.doctor, "PARALLEL_THRESHOLD", 0):
+            parallel_errors = run_many(docs, checks, use_cache=False)
+
+        self.assertTrue(errors)
+        self.assertEqual(
+            [(e.name, e.path, e.payload, e.doc) for e in parallel_errors],
+            [(e.name, e.path, e.payload, e.doc) for e in errors])
+
+
+class TestCli(tests.cli.TestCli):
+
+    cli = cli
+
+    def test_main(self):
+        self.do_test_cli_function_exists()
+        self.do_test_help()
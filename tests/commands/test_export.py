@@ -57,6 +57,25 @@ class TestRun(tests.cli.TestWithLibrary):
         self.assertTrue(data)
         os.unlink(path)
 
+    def test_stream(self) -> None:
+        import papis.json
+        from papis.commands.export import run_stream
+
+        docs = self.get_docs()
+        for fmt in ("bibtex", "json", "yaml"):
+            chunks = list(run_stream(docs, to_format=fmt))
+            self.assertGreater(len(chunks), 1)
+            self.assertEqual("".join(chunks), run(docs, to_format=fmt))
+
+        # NOTE: the streamed output is the same as dumping everything at once
+        self.assertEqual(
+            papis.json.exporter(docs),
+            json.dumps([papis.document.to_dict(d) for d in docs]))
+        self.assertEqual(
+            papis.yaml.exporter(docs),
+            yaml.dump_all([papis.document.to_dict(d) for d in docs],
+                          allow_unicode=True))
+
 
 class TestCli(tests.cli.TestCli):
 
@@ -17,3 +17,108 @@ def test_get_downloader():
     assert down is not None
     assert len(down) >= 1
     assert down[0].name == "arxiv"
+
+
+def test_get_candidate_downloaders():
+    from papis.downloaders import get_candidate_downloaders
+
+    def names(url):
+        return {cls.__module__.split(".")[-1]
+                for cls in get_candidate_downloaders(url)}
+
+    candidates = names("https://journals.aps.org/prl/abstract/10.1103/1")
+    assert "aps" in candidates
+    assert "fallback" in candidates
+    assert "acs" not in candidates
+    assert "get" not in candidates
+
+    candidates = names("https://example.com/paper.PDF")
+    assert "get" in candidates
+    assert "aps" not in candidates
+
+    assert "ieee" in names("ieee:1234")
+    assert "hal" in names("https://theses.hal.science/tel-02083632v1")
+    assert "hal" not in names("https://data.hal.science/hal-02285492")
+
+
+def test_get_dispatch_table_patterns(monkeypatch):
+    import papis.downloaders
+
+    def make(name, pattern):
+        return type(name, (papis.downloaders.Downloader,),
+                    {"URL_PATTERN": pattern})
+
+    classes = [
+        make("Named", r"https?://(?P<host>a\.org)/"),
+        make("SameName", r"https?://(?P<host>b\.org)/"),
+        make("Backref", r"https?://(\w+)\.\1\.org/"),
+        make("Plain", r"https?://(www\.)?c\.org/"),
+        make("Invalid", r"https?://(d\.org/"),
+        ]
+    monkeypatch.setattr(papis.downloaders, "_DISPATCH_TABLE", None)
+    monkeypatch.setattr(papis.downloaders, "get_available_downloaders",
+                        lambda: classes)
+
+    table = papis.downloaders.get_dispatch_table()
+    assert [cls.__name__ for cls in table.pattern_downloaders.values()] == [
+        "Plain"]
+    assert [cls.__name__ for _, cls in table.separate_patterns] == [
+        "Named", "SameName", "Backref"]
+
+    def names(url):
+        return [cls.__name__
+                for cls in papis.downloaders.get_candidate_downloaders(url)]
+
+    assert names("https://a.org/1") == ["Named"]
+    assert names("https://b.org/1") == ["SameName"]
+    assert names("https://x.x.org/1") == ["Backref"]
+    assert names("https://x.y.org/1") == []
+    assert names("https://www.c.org/1") == ["Plain"]
+
+
+def test_get_matching_downloaders_priority():
+    down = get_matching_downloaders("https://journals.aps.org/prl/abstract/1")
+    assert [d.name for d in down][-1] == "fallback"
+    assert down[0].name == "aps"
+
+
+def test_download_document(monkeypatch):
+    import os
+    import papis.httpclient
+    import papis.downloaders.get
+    from tests import create_random_pdf, create_random_file
+
+    for make_file, nfiles in ((create_random_pdf, 1), (create_random_file, 0)):
+        path = make_file()
+        monkeypatch.setattr(
+            papis.httpclient, "download",
+            lambda url, **kwargs: papis.httpclient.Download(
+                path=path, size=os.path.getsize(path), sha256="",
+                content_type=None))
+
+        down = papis.downloaders.get.Downloader.match("https://example.com/a.pdf")
+        assert down is not None
+        down.fetch_files()
+
+        assert len(down.ctx.files) == nfiles
+        assert os.path.exists(path) == bool(nfiles)
+
+
+def test_download_document_error(monkeypatch):
+    import requests
+    import papis.httpclient
+    import papis.downloaders.get
+
+    def download(url, **kwargs):
+        response = requests.Response()
+        response.status_code = 403
+        raise requests.HTTPError("403 Forbidden", response=response)
+
+    monkeypatch.setattr(papis.httpclient, "download", download)
+
+    down = papis.downloaders.get.Downloader.match("https://example.com/a.pdf")
+    assert down is not None
+    down.fetch_files()
+
+    assert down.document_file is None
+    assert not down.ctx.files
@@ -1,9 +1,88 @@
+import threading
+import collections
+import http.server
+import socketserver
+import urllib.parse
+
+import pytest
+
+import papis.config
 import papis.downloaders
 from papis.arxiv import (
     Downloader, get_data, find_arxivid_in_text, validate_arxivid
 )
+import papis.arxiv
 import papis.bibtex
 
+ARXIV_STUB_TOTAL = 45
+ARXIV_STUB_ENTRY = """
+<entry>
+  <id>http://arxiv.org/abs/2101.{index:05d}v1</id>
+  <published>2021-01-01T00:00:00Z</published>
+  <title>Paper
+    number {index}</title>
+  <summary>Abstract of
+    paper {index}</summary>
+  <author><name>Ada Lovelace</name></author>
+  <author><name>Alan Turing</name></author>
+</entry>
+"""
+
+
+class _ArxivStubHandler(http.server.BaseHTTPRequestHandler):
+    requests = []  # type: list
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        start = int(query["start"][0])
+        max_results = int(query["max_results"][0])
+        self.requests.append((start, max_results))
+
+        entries = "".join(
+            ARXIV_STUB_ENTRY.format(index=i)
+            for i in range(start, min(start + max_results, ARXIV_STUB_TOTAL)))
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+            "<title>query</title>"
+            "<opensearch:totalResults>{}</opensearch:totalResults>"
+            "{}</feed>".format(ARXIV_STUB_TOTAL, entries)).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/atom+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def arxiv_stub(monkeypatch):
+    server = _ThreadingHTTPServer(("127.0.0.1", 0), _ArxivStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(papis.arxiv, "ARXIV_API_URL",
+                        "http://127.0.0.1:{}/api/query".format(
+                            server.server_address[1]))
+    monkeypatch.setattr(papis.arxiv, "_LIMITER", None)
+    papis.config.set("arxiv-delay", 0)
+    _ArxivStubHandler.requests.clear()
+
+    try:
+        yield _ArxivStubHandler.requests
+    finally:
+        papis.config.set("arxiv-delay", 3.0)
+        server.shutdown()
+        server.server_close()
+
 
 def test_general():
     data = get_data(
@@ -15,6 +94,36 @@ def test_general():
     assert len(data) == 1
 
 
+def test_iter_data(arxiv_stub):
+    data = list(papis.arxiv.iter_data(
+        author="Lovelace", max_results=100, page_size=10, max_workers=2))
+
+    assert len(data) == ARXIV_STUB_TOTAL
+    assert [d["url"] for d in data] == [
+        "http://arxiv.org/abs/2101.{:05d}v1".format(i)
+        for i in range(ARXIV_STUB_TOTAL)]
+    assert data[3]["title"] == "Paper number 3"
+    assert data[3]["abstract"] == "Abstract of paper 3"
+    assert data[3]["author"] == "Ada Lovelace, Alan Turing"
+    assert data[3]["year"] == "2021"
+
+    # NOTE: the total number of results is used to stop paging
+    assert sorted(arxiv_stub) == [(0, 10), (10, 10), (20, 10), (30, 10), (40, 5)]
+
+
+def test_iter_data_max_results(arxiv_stub):
+    data = get_data(query="turing", page=5, max_results=12)
+    assert len(data) == 12
+    assert data[0]["url"].endswith("00005v1")
+    assert arxiv_stub == [(5, 12)]
+
+    arxiv_stub.clear()
+    data = list(papis.arxiv.iter_data(
+        query="turing", page=5, max_results=12, page_size=5))
+    assert len(data) == 12
+    assert sorted(arxiv_stub) == [(5, 5), (10, 5), (15, 2)]
+
+
 def test_find_arxiv_id():
     test_data = [
         ("/URI(http://arxiv.org/abs/1305.2291v2)>>", "1305.2291v2"),
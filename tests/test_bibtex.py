@@ -137,3 +137,131 @@ def test_to_bibtex_formatting() -> None:
         )
 
     assert papis.bibtex.to_bibtex(doc) == expected_bibtex
+
+
+def test_unicode_to_latex() -> None:
+    assert papis.bibtex.unicode_to_latex("Schrödinger & Co") == (
+        'Schr\\"{o}dinger \\& Co')
+
+
+def test_to_bibtex_multiple_cache(monkeypatch) -> None:
+    """Test that exported entries are cached and invalidated on changes."""
+    import tempfile
+
+    docs = [papis.document.from_data({
+        "type": "article",
+        "author": "Albert Einstein",
+        "title": "The Theory of Everything {}".format(i),
+        "year": 2350 + i,
+        "ref": "MyDocument{}".format(i)
+        }) for i in range(3)]
+    expected = [papis.bibtex.to_bibtex(doc) for doc in docs]
+
+    with tempfile.TemporaryDirectory() as d:
+        monkeypatch.setenv("XDG_CACHE_HOME", d)
+
+        # NOTE: small exports do not use the cache
+        assert list(papis.bibtex.to_bibtex_multiple(docs)) == expected
+        assert not os.path.exists(papis.bibtex.get_export_cache_path())
+
+        monkeypatch.setattr(papis.bibtex, "EXPORT_CACHE_MIN_DOCUMENTS", 3)
+        monkeypatch.setattr(papis.bibtex, "EXPORT_CACHE_MIN_CHANGES", 2)
+
+        rendered = []
+        to_bibtex = papis.bibtex.to_bibtex
+
+        def counting_to_bibtex(doc, **kwargs):
+            rendered.append(doc["ref"])
+            return to_bibtex(doc, **kwargs)
+
+        monkeypatch.setattr(papis.bibtex, "to_bibtex", counting_to_bibtex)
+
+        assert list(papis.bibtex.to_bibtex_multiple(docs)) == expected
+        assert len(rendered) == 3
+        assert os.path.exists(papis.bibtex.get_export_cache_path())
+
+        del rendered[:]
+        assert list(papis.bibtex.to_bibtex_multiple(docs)) == expected
+        assert not rendered
+
+        # NOTE: too few changes to write back the cache
+        docs[1]["title"] = "The Theory of Nothing"
+        result = list(papis.bibtex.to_bibtex_multiple(docs))
+        assert rendered == ["MyDocument1"]
+        assert "The Theory of Nothing" in result[1]
+
+        del rendered[:]
+        docs[2]["title"] = "The Theory of Something"
+        list(papis.bibtex.to_bibtex_multiple(docs))
+        assert rendered == ["MyDocument1", "MyDocument2"]
+
+        del rendered[:]
+        list(papis.bibtex.to_bibtex_multiple(docs))
+        assert not rendered
+
+        papis.bibtex.clear_export_cache()
+        assert not os.path.exists(papis.bibtex.get_export_cache_path())
+
+
+def test_iter_bibtex_entries_chunks() -> None:
+    """Test that parsing in chunks gives the same result as a single pass."""
+    bib = "\n".join([
+        "% a comment before the entries",
+        "@string{nat = {Nature}}",
+        ] + [
+        "@article{ref%d,\n"
+        "  title = {Title @ {%d}},\n"
+        "  journal = nat,\n"
+        "  abstract = {Text\n@misc{notanentry, title = {}}},\n"
+        "  year = {%d},\n"
+        "}" % (i, i, 2000 + i) for i in range(20)
+        ])
+
+    expected = papis.bibtex.bibtex_to_dict(bib)
+    assert len(expected) == 20
+    assert expected[5]["journal"] == "Nature"
+
+    result = list(papis.bibtex.iter_bibtex_entries(bib, chunk_size=256))
+    assert result == expected
+
+
+def test_iter_bibtex_entries_file(tmp_path) -> None:
+    """Test that large files are read and split incrementally."""
+    bib = "\n".join([
+        "@string{nat = {Nature}}",
+        ] + [
+        "@article{ref%d,\n"
+        "  title = {Title {%d}\n@book{notanentry, title = {}}},\n"
+        "  journal = nat,\n"
+        "}" % (i, i) for i in range(50)
+        ])
+
+    filename = tmp_path / "lib.bib"
+    filename.write_text(bib)
+
+    expected = papis.bibtex.bibtex_to_dict(bib)
+    assert len(expected) == 50
+
+    # NOTE: the file is read in parts that split lines and entry markers
+    result = list(papis.bibtex.iter_bibtex_entries(str(filename), chunk_size=37))
+    assert result == expected
+    assert all(entry["journal"] == "Nature" for entry in result)
+
+
+def test_get_cited_keys() -> None:
+    text = r"""
+    As in \cite{Einstein1905,Bohr1913} and \citep[p.~3]{Planck.1900+}, see
+    \autocite[see][12]{Dirac1928} and \cites[1]{Born1926}[2]{Pauli1925}.
+    % \cite{Commented1900}
+    Done to 50\% \textcite*{Heisenberg1925} {\bf not a key}.
+    \citation{Fermi1934}
+    \abx@aux@cite{0}{Curie1898}
+    """
+
+    assert papis.bibtex.get_cited_keys(text) == {
+        "Einstein1905", "Bohr1913", "Planck.1900+", "Dirac1928", "Born1926",
+        "Pauli1925", "Heisenberg1925", "Fermi1934", "Curie1898"}
+
+    keys = ["Planck.1900+", "Planck.1900", "Bohr1913", "Bohr"]
+    assert papis.bibtex.find_keys_in_text(
+        keys, "Planck.1900+ and Bohr1913.") == {"Planck.1900+", "Bohr1913"}
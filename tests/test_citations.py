@@ -0,0 +1,127 @@
+import os
+
+import papis.database
+import papis.citations
+import papis.yaml
+
+import tests.cli
+
+
+class TestCitations(tests.cli.TestWithLibrary):
+
+    def test_get_documents_by_doi(self) -> None:
+        dois = ["10.1021/CT5004252",
+                "https://doi.org/10.1112/plms/s2-42.1.230",
+                "10.1000/not-in-library"]
+        found = papis.citations.get_documents_by_doi(dois)
+
+        self.assertEqual(set(found), set(dois[:2]))
+        self.assertEqual(found[dois[0]]["doi"], "10.1021/ct5004252")
+
+    def test_update_citations_from_database(self) -> None:
+        citations = [
+            {"doi": "10.1000/not-in-library", "title": "Missing"},
+            {"doi": "10.1021/ct5004252", "citations": []},
+            {"title": "No DOI"},
+            ]
+        index = papis.citations.get_doi_index()
+        new_citations = papis.citations.update_citations_from_database(
+            citations, index=index)
+
+        self.assertEqual(len(new_citations), 3)
+        self.assertEqual(new_citations[0]["title"], "Missing")
+        self.assertEqual(new_citations[1]["doi"], "10.1021/ct5004252")
+        self.assertIn("author", new_citations[1])
+        self.assertNotIn("citations", new_citations[1])
+        self.assertEqual(new_citations[2]["title"], "No DOI")
+
+    def test_save_cited_by(self) -> None:
+        doc = papis.database.get().get_all_documents()[0]
+        citations = [{"doi": "10.1000/citation", "title": "Citation"}]
+        cited_by = [{"doi": "10.1000/cited-by", "title": "Cited by"}]
+
+        # NOTE: the cited-by list must not overwrite the citations of the doc
+        papis.citations.save_citations(doc, citations)
+        papis.citations.save_cited_by(doc, cited_by)
+        self.assertEqual(papis.citations.get_citations(doc), citations)
+        self.assertEqual(papis.citations.get_cited_by(doc), cited_by)
+
+        os.remove(papis.citations.get_citations_file(doc))
+        os.remove(papis.citations.get_cited_by_file(doc))
+
+    def test_fetch_cited_by_from_database(self) -> None:
+        papis.citations.clear_citation_graph()
+
+        docs = papis.database.get().get_all_documents()
+        cited = next(d for d in docs if d.get("doi") == "10.1021/ct5004252")
+        citing = [d for d in docs if d is not cited][:2]
+
+        for doc in citing:
+            papis.citations.save_citations(doc, [])
+
+        self.assertEqual(
+            papis.citations.fetch_cited_by_from_database(cited), [])
+
+        # NOTE: the graph is updated incrementally after it was built
+        papis.citations.save_citations(
+            citing[0], [{"doi": "https://doi.org/10.1021/CT5004252"}])
+        result = papis.citations.fetch_cited_by_from_database(cited)
+        self.assertEqual([r["title"] for r in result], [citing[0]["title"]])
+
+        # NOTE: files changed outside of papis are picked up when the graph
+        # is built again
+        papis.yaml.list_to_path(
+            [{"doi": "10.1021/ct5004252", "title": "Cited"}],
+            papis.citations.get_citations_file(citing[1]))
+        os.utime(papis.citations.get_citations_file(citing[1]),
+                 ns=(0, 0))
+        result = papis.citations.fetch_cited_by_from_database(cited)
+        self.assertEqual(len(result), 1)
+
+        papis.citations.get_citation_graph()
+        result = papis.citations.fetch_cited_by_from_database(cited)
+        self.assertEqual({r["title"] for r in result},
+                         {d["title"] for d in citing})
+
+        papis.citations.save_cited_by(cited, result)
+        self.assertTrue(papis.citations.has_cited_by(cited))
+        self.assertFalse(papis.citations.has_citations(cited))
+
+        for doc in citing:
+            os.remove(papis.citations.get_citations_file(doc))
+        os.remove(papis.citations.get_cited_by_file(cited))
+
+    def test_update_library_citations(self) -> None:
+        papis.citations.clear_citation_graph()
+
+        docs = papis.database.get().get_all_documents()
+        cited = next(d for d in docs if d.get("doi") == "10.1021/ct5004252")
+        citing = next(d for d in docs if d is not cited)
+        other = next(d for d in docs if d is not cited and d is not citing)
+
+        papis.citations.save_citations(citing, [{"doi": "10.1021/CT5004252"}])
+        papis.citations.save_citations(other, [{"doi": "10.1000/missing"}])
+
+        result = papis.citations.update_library_citations(docs, cited_by=True)
+        self.assertEqual(result, (len(docs), 1, 1))
+
+        citations = papis.citations.get_citations(citing)
+        self.assertEqual(citations[0]["title"], cited["title"])
+        cited_by = papis.citations.get_cited_by(cited)
+        self.assertEqual([c["title"] for c in cited_by], [citing["title"]])
+
+        # NOTE: nothing changed, so nothing is written again
+        result = papis.citations.update_library_citations(
+            docs, cited_by=True, force=True)
+        self.assertEqual(result, (len(docs), 0, 0))
+
+        # NOTE: the cited-by file is emptied when the citation is removed
+        papis.citations.save_citations(citing, [])
+        result = papis.citations.update_library_citations(
+            docs, cited_by=True, force=True)
+        self.assertEqual(result, (len(docs), 0, 1))
+        self.assertEqual(papis.citations.get_cited_by(cited), [])
+
+        for doc in (citing, other):
+            os.remove(papis.citations.get_citations_file(doc))
+        os.remove(papis.citations.get_cited_by_file(cited))
@@ -288,3 +288,21 @@ def test_get_list() -> None:
                 "The key 'super-key-list' must be a valid python list"
             )
         )
+
+
+def test_general_get_cache() -> None:
+    papis.config.set("test-general-get-cache", "shire")
+    info = papis.config.get_cache_info()
+
+    assert papis.config.get("test-general-get-cache") == "shire"
+    assert papis.config.get("test-general-get-cache") == "shire"
+    new_info = papis.config.get_cache_info()
+    assert new_info["misses"] == info["misses"] + 1
+    assert new_info["hits"] == info["hits"] + 1
+
+    papis.config.set("test-general-get-cache", "mordor")
+    assert papis.config.get_cache_info()["invalidations"] > info["invalidations"]
+    assert papis.config.get("test-general-get-cache") == "mordor"
+
+    papis.config.get_configuration()["settings"]["test-general-get-cache"] = "rohan"
+    assert papis.config.get("test-general-get-cache") == "rohan"
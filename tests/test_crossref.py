@@ -1,8 +1,13 @@
 import os
+import json
+import threading
+import collections
+import http.server
+import socketserver
+import urllib.parse
 import pytest
 
 from unittest.mock import patch
-import json
 from papis.crossref import (
     get_data, doi_to_data
 )
@@ -59,3 +64,152 @@ def test_doi_to_data_conference():
     assert isinstance(data, dict)
     result = _get_test_json("test_conference_out.json")
     assert result == data
+
+
+class _CrossrefStubHandler(http.server.BaseHTTPRequestHandler):
+    # NOTE: number of requests received for each DOI
+    requests = collections.Counter()
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_search(self):
+        # NOTE: each year has 25 results and the cursor is the next offset
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        rows = int(query["rows"][0])
+        cursor = query["cursor"][0]
+        offset = 0 if cursor == "*" else int(cursor)
+        year = query.get("filter", ["from-pub-date:2000"])[0].split(",")[0][-4:]
+        self.requests["search", year] += 1
+
+        items = []
+        for i in range(offset, min(offset + rows, 25)):
+            item = _get_test_json("test1.json")["message"]
+            item["DOI"] = "10.1000/{}.{}".format(year, i)
+            items.append(item)
+
+        self.send_json({"message": {
+            "items": items,
+            "next-cursor": str(offset + rows),
+            "total-results": 25,
+            }})
+
+    def do_GET(self):
+        if self.path.startswith("/works?"):
+            self.do_search()
+            return
+
+        doi = urllib.parse.unquote(self.path.split("?")[0][len("/works/"):])
+        self.requests[doi] += 1
+
+        if doi.startswith("10.9999/flaky") and self.requests[doi] == 1:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        if doi.startswith("10.9999/missing"):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        data = _get_test_json("test1.json")
+        data["message"]["DOI"] = doi
+        self.send_json(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def crossref_stub():
+    import papis.config
+
+    server = _ThreadingHTTPServer(("127.0.0.1", 0), _CrossrefStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = papis.config.getstring("crossref-base-url")
+    papis.config.set("crossref-base-url",
+                     "http://127.0.0.1:{}".format(server.server_address[1]))
+    papis.config.set("crossref-rate-limit", 0)
+    _CrossrefStubHandler.requests.clear()
+
+    try:
+        yield _CrossrefStubHandler.requests
+    finally:
+        papis.config.set("crossref-base-url", base_url)
+        papis.config.set("crossref-rate-limit", 10)
+        server.shutdown()
+        server.server_close()
+
+
+def test_dois_to_data(crossref_stub):
+    from papis.crossref import dois_to_data
+
+    dois = ["10.1000/doc{}".format(i) for i in range(20)]
+    dois += ["10.9999/flaky", "10.9999/missing"]
+
+    completed = []
+    results = list(dois_to_data(dois + dois[:5], max_workers=4,
+                                callback=lambda d, _: completed.append(d)))
+    assert [d for d, _ in results] == dois
+    assert sorted(completed) == sorted(dois)
+
+    results = dict(results)
+    assert set(results) == set(dois)
+    assert results["10.9999/missing"] is None
+    assert results["10.9999/flaky"]["doi"] == "10.9999/flaky"
+    assert all(results[d]["doi"] == d for d in dois[:20])
+
+    # NOTE: duplicates are only fetched once and failures are retried
+    assert crossref_stub["10.1000/doc0"] == 1
+    assert crossref_stub["10.9999/flaky"] == 2
+    assert crossref_stub["10.9999/missing"] == 1
+
+
+def test_iter_works(crossref_stub):
+    from papis.crossref import iter_works
+
+    data = list(iter_works(query="test", page_size=10))
+    assert [d["doi"] for d in data] == [
+        "10.1000/2000.{}".format(i) for i in range(25)]
+    assert crossref_stub["search", "2000"] == 3
+
+    data = list(iter_works(query="test", max_results=12, page_size=10))
+    assert len(data) == 12
+
+
+def test_iter_works_shards(crossref_stub):
+    from papis.crossref import iter_works, get_year_shards
+
+    data = list(iter_works(query="test", page_size=10, max_workers=3,
+                           shards=get_year_shards(2001, 2004)))
+    assert len(data) == 4 * 25
+    assert {d["doi"] for d in data} == {
+        "10.1000/{}.{}".format(year, i)
+        for year in range(2001, 2005) for i in range(25)}
+
+    data = list(iter_works(query="test", max_results=30, page_size=10,
+                           shards=get_year_shards(2001, 2004)))
+    assert len(data) == 30
+
+
+def test_get_filter():
+    from papis.crossref import _get_filter
+
+    assert _get_filter({}) == ""
+    assert (_get_filter({"from_pub_date": "2020", "has_abstract": True,
+                         "license_url": ["a", "b"]})
+            == "from-pub-date:2020,has-abstract:true,"
+               "license.url:a,license.url:b")
@@ -0,0 +1,40 @@
+import papis.document
+import papis.duplicates
+
+
+def test_normalize() -> None:
+    assert (papis.duplicates.normalize_arxivid("arXiv:1234.5678v2")
+            == "1234.5678")
+    assert (papis.duplicates.normalize_arxivid(
+            "https://arxiv.org/pdf/1234.5678v1.pdf") == "1234.5678")
+    assert (papis.duplicates.normalize_isbn("0-306-40615-2")
+            == papis.duplicates.normalize_isbn("978-0-306-40615-7")
+            == "9780306406157")
+    assert papis.duplicates.normalize_title("The {Theory} of Everything.") == [
+        "the", "theory", "of", "everything"]
+
+
+def test_find_duplicates() -> None:
+    docs = [papis.document.from_data(data) for data in [
+        {"title": "On the Electrodynamics of Moving Bodies",
+         "author": "Einstein, Albert", "year": 1905},
+        {"title": "On the electrodynamics of moving bodies.",
+         "author": "A. Einstein", "year": "1905"},
+        {"title": "Does the Inertia of a Body Depend Upon Its Energy Content?",
+         "author": "Einstein, Albert", "year": 1905,
+         "doi": "10.1002/andp.19053231314"},
+        {"title": "Ist die Trägheit eines Körpers von seinem Energieinhalt "
+                  "abhängig?",
+         "author": "Einstein, Albert", "year": 1905,
+         "doi": "https://doi.org/10.1002/ANDP.19053231314"},
+        {"title": "The Theory of Everything",
+         "author": "Hawking, Stephen", "year": 2002},
+        {"title": "The Theory of Everything",
+         "author": "Nobody, Else", "year": 1950},
+        ]]
+
+    duplicates = papis.duplicates.find_duplicates(docs, threshold=0.8)
+    pairs = {(docs.index(d.a), docs.index(d.b)): d.reason for d in duplicates}
+    assert pairs == {(0, 1): "similar title, authors and year",
+                     (2, 3): "same doi"}
+    assert all(0.8 <= d.score <= 1.0 for d in duplicates)
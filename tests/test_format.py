@@ -1,3 +1,5 @@
+import pytest
+
 import papis.document
 import papis.format
 import papis.config
@@ -15,3 +17,32 @@ def test_basic():
         "{doc[author]}{doc[title]}{doc[blahblah]}", document) == "FulanoSomething"
     assert papis.format.format(
         "{doc[author]}{doc[title]}{doc[blahblah]}", {"title": "hell"}) == "hell"
+
+
+def test_format_many():
+    setup_test_library()
+    docs = [papis.document.from_data(dict(author="Fulano", title="Something")),
+            {"title": "hell"}]
+
+    assert list(papis.format.format_many("{doc[author]}{doc[title]}", docs)) == [
+        "FulanoSomething", "hell"]
+
+
+def test_jinja2_template_cache():
+    pytest.importorskip("jinja2")
+
+    formater = papis.format.Jinja2Formater()
+    document = papis.document.from_data(dict(author="Fulano", title="Something"))
+
+    fmt = "{{ doc.author }}-{{ doc.title }}"
+    assert formater.format(fmt, document, doc_key="doc") == "Fulano-Something"
+    template = formater.get_template(fmt)
+    assert formater.get_template(fmt) is template
+
+    assert list(formater.format_many(fmt, [document, document], doc_key="doc")) == [
+        "Fulano-Something", "Fulano-Something"]
+
+    # invalid templates return the error for every document
+    result = list(formater.format_many("{{ doc.author", [document], doc_key="doc"))
+    assert len(result) == 1
+    assert result[0] != ""
@@ -0,0 +1,161 @@
+import os
+import threading
+import collections
+import http.server
+import socketserver
+from unittest.mock import patch
+
+import pytest
+import requests
+
+import papis.httpcache
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    requests = collections.Counter()
+    conditional = collections.Counter()
+
+    def do_GET(self):
+        self.requests[self.path] += 1
+
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.conditional[self.path] += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = ("content of {}".format(self.path)).encode() * 64
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        if self.path == "/no-store":
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = _ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubHandler.requests.clear()
+    _StubHandler.conditional.clear()
+
+    with patch("papis.httpcache.get_cache_dir", lambda: str(tmp_path)):
+        yield "http://127.0.0.1:{}".format(server.server_address[1])
+
+    server.shutdown()
+    server.server_close()
+
+
+def _get_session(ttl):
+    session = requests.Session()
+    adapter = papis.httpcache.CachingAdapter(ttl=ttl)
+    session.mount("http://", adapter)
+    return session
+
+
+def test_ttl(server):
+    session = _get_session(ttl=3600)
+
+    first = session.get(server + "/page")
+    second = session.get(server + "/page")
+    assert not getattr(first, "from_cache", False)
+    assert getattr(second, "from_cache", False)
+    assert second.text == first.text
+    assert second.encoding == "utf-8"
+    assert _StubHandler.requests["/page"] == 1
+
+    session.get(server + "/no-store")
+    session.get(server + "/no-store")
+    assert _StubHandler.requests["/no-store"] == 2
+
+
+def test_conditional_request(server):
+    session = _get_session(ttl=0)
+
+    first = session.get(server + "/etag")
+    second = session.get(server + "/etag")
+    assert getattr(second, "from_cache", False)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert _StubHandler.requests["/etag"] == 2
+    assert _StubHandler.conditional["/etag"] == 1
+
+
+def test_evict(server, tmp_path):
+    session = _get_session(ttl=3600)
+
+    for i in range(4):
+        session.get(server + "/page{}".format(i))
+        path = sorted(tmp_path.iterdir(), key=os.path.getmtime)[-1]
+        os.utime(str(path), (i, i))
+
+    # NOTE: using a cached response makes it the most recently used
+    session.get(server + "/page0")
+    sizes = [p.stat().st_size for p in tmp_path.iterdir()]
+
+    assert papis.httpcache.evict(max_size=sum(sizes[:2]) / 1024 / 1024) == 2
+
+    for i in (0, 3):
+        session.get(server + "/page{}".format(i))
+        assert _StubHandler.requests["/page{}".format(i)] == 1
+
+    session.get(server + "/page1")
+    assert _StubHandler.requests["/page1"] == 2
+
+
+def test_evict_on_save(server, tmp_path):
+    session = _get_session(ttl=3600)
+    session.get(server + "/page0")
+    size = next(tmp_path.iterdir()).stat().st_size
+
+    max_size = 3.5 * size / 1024 / 1024
+    with patch("papis.config.getfloat", return_value=max_size), \
+            patch("papis.httpcache.evict", wraps=papis.httpcache.evict) as mock:
+        # NOTE: the folder is only scanned when it grows over the maximum size
+        for i in range(1, 3):
+            session.get(server + "/page{}".format(i))
+        assert mock.call_count == 0
+
+        session.get(server + "/page3")
+        assert mock.call_count == 1
+
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 3.5 * size
+
+
+def test_save_errors(server, tmp_path):
+    session = _get_session(ttl=3600)
+
+    with patch("os.replace", side_effect=PermissionError):
+        response = session.get(server + "/page0", headers={"Accept": b"*/*"})
+    assert response.status_code == 200
+    assert not list(tmp_path.iterdir())
+
+    session.get(server + "/page0", headers={"Accept": b"*/*"})
+    response = session.get(server + "/page0", headers={"Accept": "*/*"})
+    assert getattr(response, "from_cache", False)
+    assert _StubHandler.requests["/page0"] == 2
+
+
+def test_no_store_request(server, tmp_path):
+    session = _get_session(ttl=3600)
+    session.get(server + "/page0")
+
+    for _ in range(2):
+        response = session.get(server + "/page0",
+                               headers={"Cache-Control": "no-store"})
+        assert not getattr(response, "from_cache", False)
+
+    assert _StubHandler.requests["/page0"] == 3
+    assert len(list(tmp_path.iterdir())) == 1
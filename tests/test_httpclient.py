@@ -0,0 +1,233 @@
+import os
+import time
+import hashlib
+import threading
+import collections
+import http.server
+import socketserver
+
+import pytest
+import requests
+
+import papis.config
+import papis.httpclient
+
+FILE_CONTENT = bytes(range(256)) * 1024
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    requests = collections.Counter()
+    ranges = []
+    etag = '"v1"'
+    protocol_version = "HTTP/1.1"
+
+    def send_file(self):
+        start = 0
+        if "Range" in self.headers:
+            self.ranges.append(self.headers["Range"])
+            if self.headers.get("If-Range") == self.etag:
+                start = int(self.headers["Range"][len("bytes="):].rstrip("-"))
+
+        body = FILE_CONTENT[start:]
+        self.send_response(206 if start else 200)
+        if start:
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(
+                start, len(FILE_CONTENT) - 1, len(FILE_CONTENT)))
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+
+        if self.path == "/truncated" and self.requests[self.path] == 1:
+            # NOTE: drop the connection in the middle of the body
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+        else:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.requests[self.path] += 1
+
+        if self.path in ("/file", "/truncated"):
+            self.send_file()
+            return
+
+        if self.path == "/forbidden":
+            self.send_response(403)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path == "/flaky" and self.requests[self.path] < 3:
+            status, body = 503, b""
+        else:
+            status, body = 200, self.headers.get("User-Agent", "").encode()
+
+        self.send_response(status)
+        self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server():
+    server = _ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubHandler.requests.clear()
+    _StubHandler.ranges.clear()
+    _StubHandler.etag = '"v1"'
+
+    yield "http://127.0.0.1:{}".format(server.server_address[1])
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_session():
+    papis.httpclient.reset_session()
+
+    session = papis.httpclient.get_session()
+    assert session is papis.httpclient.get_session()
+    assert session.timeout == papis.config.getfloat("http-timeout")
+    assert session.headers["User-Agent"] == papis.config.get("user-agent")
+
+    papis.httpclient.reset_session()
+    assert session is not papis.httpclient.get_session()
+
+
+def test_get(server):
+    response = papis.httpclient.get(server + "/page")
+    assert response.ok
+    assert response.text == papis.config.get("user-agent")
+
+    response = papis.httpclient.get(server + "/page",
+                                    headers={"User-Agent": "papis-test"})
+    assert response.text == "papis-test"
+
+
+def test_retry(server):
+    response = papis.httpclient.get(server + "/flaky")
+    assert response.ok
+    assert _StubHandler.requests["/flaky"] == 3
+
+
+def test_request_timeout(monkeypatch):
+    timeouts = []
+    monkeypatch.setattr("requests.Session.request",
+                        lambda self, method, url, **kwargs:
+                        timeouts.append(kwargs["timeout"]))
+
+    session = papis.httpclient.Session(timeout=10)
+    with papis.httpclient.request_timeout(2):
+        session.get("https://example.com")
+        session.get("https://example.com", timeout=1)
+        session.get("https://example.com", timeout=None)
+    session.get("https://example.com")
+
+    assert timeouts == [2, 1, 2, 10]
+
+
+def test_download(server):
+    result = papis.httpclient.download(server + "/file")
+    try:
+        assert result.size == len(FILE_CONTENT)
+        assert result.sha256 == hashlib.sha256(FILE_CONTENT).hexdigest()
+        assert result.content_type == "application/octet-stream"
+        with open(result.path, "rb") as fd:
+            assert fd.read() == FILE_CONTENT
+    finally:
+        os.remove(result.path)
+
+    assert not _StubHandler.ranges
+    assert not os.path.exists(
+        papis.httpclient.get_partial_download_path(server + "/file"))
+
+
+def test_download_resume(server):
+    url = server + "/truncated"
+    result = papis.httpclient.download(url, max_retries=1)
+    try:
+        assert _StubHandler.requests["/truncated"] == 2
+        assert _StubHandler.ranges == ["bytes={}-".format(len(FILE_CONTENT) // 2)]
+
+        assert result.size == len(FILE_CONTENT)
+        assert result.sha256 == hashlib.sha256(FILE_CONTENT).hexdigest()
+        with open(result.path, "rb") as fd:
+            assert fd.read() == FILE_CONTENT
+    finally:
+        os.remove(result.path)
+
+
+def test_download_partial(server):
+    url = server + "/file"
+    part_path = papis.httpclient.get_partial_download_path(url)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+
+    # NOTE: partial downloads without a version or of an older version of the
+    # file are downloaded again from the start
+    for validator in (None, '"v0"'):
+        with open(part_path, "wb") as fd:
+            fd.write(b"outdated content")
+        if validator is not None:
+            papis.httpclient._save_validator(part_path, url, validator)
+
+        result = papis.httpclient.download(url)
+        with open(result.path, "rb") as fd:
+            assert fd.read() == FILE_CONTENT
+        os.remove(result.path)
+
+    assert _StubHandler.ranges == ["bytes=16-"]
+    assert not os.path.exists(part_path)
+    assert not os.path.exists(part_path + ".json")
+
+
+def test_download_locked(server):
+    url = server + "/file"
+    part_path = papis.httpclient.get_partial_download_path(url)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+
+    # NOTE: another download of the same URL is in progress
+    with open(part_path, "wb") as fd:
+        fd.write(FILE_CONTENT[:1024])
+    papis.httpclient._save_validator(part_path, url, _StubHandler.etag)
+    open(part_path + ".lock", "w").close()
+
+    try:
+        result = papis.httpclient.download(url)
+        with open(result.path, "rb") as fd:
+            assert fd.read() == FILE_CONTENT
+        os.remove(result.path)
+
+        assert not _StubHandler.ranges
+        assert os.path.getsize(part_path) == 1024
+    finally:
+        papis.httpclient.clear_downloads()
+
+
+def test_download_error(server):
+    url = server + "/forbidden"
+    with pytest.raises(requests.HTTPError):
+        papis.httpclient.download(url, max_retries=1)
+
+    assert _StubHandler.requests["/forbidden"] == 1
+    assert not os.path.exists(
+        papis.httpclient.get_partial_download_path(url) + ".lock")
+
+
+def test_rate_limiter():
+    limiter = papis.httpclient.RateLimiter(100)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+
+    assert time.monotonic() - start >= 0.05
@@ -56,3 +56,76 @@ def test_get_importer():
     assert names
     for name in names:
         assert get_importer_by_name(name) is not None
+
+
+def _make_importer(name, priority=1, delay=0.0, matches=True, fails=False):
+    class DelayedImporter(Importer):
+
+        def __init__(self, uri=""):
+            super().__init__(uri=uri, name=name)
+            if priority is not None:
+                self.priority = priority
+
+        @classmethod
+        def match(cls, uri):
+            return cls(uri=uri) if matches else None
+
+        def fetch(self):
+            time.sleep(delay)
+            if fails:
+                raise ValueError("failed to fetch")
+            self.ctx.data = {"title": name}
+
+    DelayedImporter.__name__ = name
+    return DelayedImporter
+
+
+def test_fetch_matching_importers():
+    from papis.importer import fetch_matching_importers
+
+    classes = [
+        _make_importer("generic", priority=0, delay=0.5),
+        _make_importer("slow", priority=1, delay=2.0),
+        _make_importer("specific", priority=10, delay=0.1),
+        _make_importer("doi", priority=None, delay=0.3),
+        _make_importer("broken", fails=True),
+        _make_importer("other", matches=False),
+        ]
+
+    start = time.perf_counter()
+    results = fetch_matching_importers(
+        classes, lambda cls: cls.match("uri"), timeout=1.0, max_workers=8)
+
+    # NOTE: the slow and generic downloaders are cancelled by the specific
+    # one, but not the importers, which have no priority
+    assert time.perf_counter() - start < 1.0
+    assert [r.importer.name for r in results if r.importer] == [
+        "specific", "doi"]
+
+    status = {r.name: r.status for r in results}
+    assert status == {
+        "generic": "cancelled",
+        "slow": "cancelled",
+        "specific": "fetched",
+        "doi": "fetched",
+        "broken": "failed",
+        "tests.test_importer.other": "no match",
+        }
+
+
+def test_fetch_matching_importers_timeout():
+    from papis.importer import fetch_matching_importers
+
+    classes = [
+        _make_importer("fast", delay=0.1),
+        _make_importer("slow", delay=2.0),
+        ]
+
+    start = time.perf_counter()
+    results = fetch_matching_importers(
+        classes, lambda cls: cls.match("uri"), timeout=0.5)
+
+    assert time.perf_counter() - start < 1.0
+    assert [(r.name, r.status) for r in results] == [
+        ("fast", "fetched"), ("slow", "timeout")]
+    assert results[1].elapsed >= 0.5
@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+import papis.json
+import papis.plugin
+import papis.config
+import papis.yaml
+
+
+def test_get_entrypoints(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        monkeypatch.setenv("XDG_CACHE_HOME", d)
+        papis.plugin.clear_registry()
+
+        names = papis.plugin.get_available_entrypoints("papis.exporter")
+        assert sorted(names) == ["bibtex", "json", "yaml"]
+        assert os.path.exists(papis.plugin.get_registry_path())
+
+        plugin = papis.plugin.get_plugin("papis.exporter", "yaml")
+        assert plugin is papis.yaml.exporter
+
+        papis.plugin.clear_registry()
+        assert not os.path.exists(papis.plugin.get_registry_path())
+
+
+def test_get_plugin_stale_registry(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        monkeypatch.setenv("XDG_CACHE_HOME", d)
+        papis.plugin.clear_registry()
+
+        # NOTE: simulate a registry that is out of date and matches the key
+        registry = papis.plugin._get_registry()
+        registry["entrypoints"]["papis.exporter"].pop("yaml")
+        registry["entrypoints"]["papis.exporter"]["json"] = "papis.json:missing"
+        papis.plugin._save_registry(registry)
+
+        plugin = papis.plugin.get_plugin("papis.exporter", "yaml")
+        assert plugin is papis.yaml.exporter
+
+        plugin = papis.plugin.get_plugin("papis.exporter", "json")
+        assert plugin is papis.json.exporter
+
+        papis.plugin.clear_registry()
+
+
+def test_get_executables(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        monkeypatch.setenv("XDG_CACHE_HOME", d)
+        papis.plugin.clear_registry()
+
+        bindir = os.path.join(d, "bin")
+        os.makedirs(bindir)
+        assert papis.plugin.get_executables([bindir], "papis-*") == []
+
+        script = os.path.join(bindir, "papis-hello")
+        with open(script, "w") as fd:
+            fd.write("#!/bin/sh\n")
+
+        # NOTE: make sure the folder looks modified on coarse filesystems
+        st = os.stat(bindir)
+        os.utime(bindir, (st.st_atime, st.st_mtime + 1))
+
+        assert papis.plugin.get_executables([bindir], "papis-*") == [script]
@@ -0,0 +1,51 @@
+import os
+import json
+import tempfile
+
+import papis.tracing
+
+
+def test_span_disabled() -> None:
+    papis.tracing.disable()
+    assert not papis.tracing.is_enabled()
+
+    with papis.tracing.span("test"):
+        pass
+
+    assert papis.tracing.get_stats() == {}
+
+
+def test_trace_file() -> None:
+    @papis.tracing.traced("test.decorator")
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    with tempfile.TemporaryDirectory() as d:
+        filename = os.path.join(d, "trace.json")
+        papis.tracing.enable(filename)
+
+        try:
+            with papis.tracing.span("test.span", key="value"):
+                assert add(1, 2) == 3
+            assert add(2, 3) == 5
+
+            stats = papis.tracing.get_stats()
+            assert stats["test.span"]["count"] == 1
+            assert stats["test.decorator"]["count"] == 2
+
+            papis.tracing.save()
+        finally:
+            papis.tracing.disable()
+
+        with open(filename) as fd:
+            data = json.load(fd)
+
+    events = data["traceEvents"]
+    assert len(events) == 3
+    assert all(e["ph"] == "X" for e in events)
+    # NOTE: spans are recorded when they finish
+    assert [e["name"] for e in events] == [
+        "test.decorator", "test.span", "test.decorator"]
+    assert events[1]["args"] == {"key": "value"}
+    assert events[1]["cat"] == "test"
+    assert data["otherData"]["stats"]["test.span"]["count"] == 1
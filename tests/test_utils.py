@@ -9,7 +9,7 @@ import papis.document
 import papis.commands.add
 from papis.utils import (
     get_cache_home, create_identifier, locate_document,
-    general_open, clean_document_name,
+    general_open, clean_document_name, normalize_doi,
 )
 from papis.filetype import get_document_extension
 
@@ -58,6 +58,12 @@ def test_create_identifier():
         assert output[i] == value
 
 
+def test_normalize_doi():
+    assert normalize_doi("https://doi.org/10.1103/PhysRevB.1") == "10.1103/physrevb.1"
+    assert normalize_doi("doi:10.1103/X") == "10.1103/x"
+    assert normalize_doi("") is None
+
+
 @pytest.mark.skipif(sys.platform != "linux", reason="uses linux tools")
 def test_general_open_with_spaces():
     suffix = "File with at least a couple of spaces"